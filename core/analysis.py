@@ -0,0 +1,189 @@
+"""
+core/analysis.py
+
+Compact, immutable morphological analysis objects.
+An Analysis stores its lemma and segmentation as interned strings and its tags as a tuple of
+ids from data/tag_vocab.json (tags outside the vocabulary get ids past the end of it), and
+identical analyses are shared through a flyweight cache. Analysis is a read-only Mapping with
+the keys of the dicts it replaces ('lemma' / 'root', 'gloss', 'analysis', 'tags' and, for
+guesses, 'confidence'), so existing readers keep working; use to_dict() for JSON and edits.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+TAG_VOCAB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'tag_vocab.json')
+MAX_CACHE = 1 << 20  # flyweight cache is cleared when it grows past this many analyses
+
+
+def _load_tag_names(path: str = TAG_VOCAB_PATH) -> List[str]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            vocab = json.load(f)
+        return [tag for tag, _ in sorted(vocab.items(), key=lambda item: item[1])]
+    except Exception as e:
+        logging.error(f"Failed to load tag vocab from {path}: {e}")
+        return []
+
+
+_tag_names: List[str] = _load_tag_names()
+_tag_ids: Dict[str, int] = {tag: i for i, tag in enumerate(_tag_names)}
+_tag_lock = threading.Lock()
+
+
+def tag_id(tag: str) -> int:
+    """
+    Id of a tag; tags outside data/tag_vocab.json are assigned the next free id.
+    """
+    i = _tag_ids.get(tag)
+    if i is None:
+        with _tag_lock:
+            i = _tag_ids.get(tag)
+            if i is None:
+                i = len(_tag_names)
+                _tag_names.append(sys.intern(tag))
+                _tag_ids[tag] = i
+    return i
+
+
+def tag_name(i: int) -> str:
+    return _tag_names[i]
+
+
+_KEYS = ('lemma', 'root', 'gloss', 'analysis', 'tags')
+_cache: Dict[Tuple, 'Analysis'] = {}
+
+
+class Analysis(Mapping):
+    """
+    Immutable analysis; build instances with Analysis.make to share identical ones.
+    Instances are read-only and shared between callers, so they are not drop-in dicts: item
+    assignment raises, the list returned for 'tags' is a fresh copy (editing it changes nothing),
+    dict(analysis) has both 'lemma' and 'root', and json cannot serialize them. Use to_dict()
+    for a plain, editable copy and when serializing (or json_default as json's default hook).
+    """
+    __slots__ = ('lemma', 'analysis', 'tag_ids', 'gloss', 'confidence')
+
+    def __init__(self, lemma: str, tag_ids: Tuple[int, ...], analysis: str, gloss: str = '',
+                 confidence: Optional[float] = None):
+        set_slot = object.__setattr__
+        set_slot(self, 'lemma', sys.intern(lemma))
+        set_slot(self, 'tag_ids', tag_ids)
+        set_slot(self, 'analysis', sys.intern(analysis))
+        set_slot(self, 'gloss', gloss)
+        set_slot(self, 'confidence', confidence)
+
+    @classmethod
+    def make(cls, lemma: str, tags: Iterable[str], analysis: Optional[str] = None, gloss: str = '',
+             confidence: Optional[float] = None) -> 'Analysis':
+        """
+        Return the shared Analysis for these fields, creating it on first use.
+        """
+        ids = tuple(tag_id(tag) for tag in tags)
+        analysis = analysis if analysis is not None else lemma
+        key = (lemma, ids, analysis, gloss, confidence)
+        cached = _cache.get(key)
+        if cached is None:
+            if len(_cache) >= MAX_CACHE:
+                _cache.clear()
+            cached = _cache.setdefault(key, cls(lemma, ids, analysis, gloss, confidence))
+        return cached
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'Analysis':
+        """
+        Build from an analyzer ('lemma') or engine ('root') style dict.
+        """
+        if isinstance(data, Analysis):
+            return data
+        return cls.make(data.get('lemma', data.get('root', '')), data.get('tags', []),
+                        data.get('analysis'), data.get('gloss', ''), data.get('confidence'))
+
+    @property
+    def tags(self) -> List[str]:
+        return [_tag_names[i] for i in self.tag_ids]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Plain dict for JSON: lemma, tags and analysis, plus gloss and confidence when set.
+        """
+        data = {'lemma': self.lemma, 'tags': self.tags, 'analysis': self.analysis}
+        if self.gloss:
+            data['gloss'] = self.gloss
+        if self.confidence is not None:
+            data['confidence'] = self.confidence
+        return data
+
+    def _key(self) -> Tuple:
+        return (self.lemma, self.tag_ids, self.analysis, self.gloss, self.confidence)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'tags':
+            return self.tags
+        if key == 'root':
+            return self.lemma
+        if key in ('lemma', 'analysis', 'gloss') or (key == 'confidence' and self.confidence is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _KEYS
+        if self.confidence is not None:
+            yield 'confidence'
+
+    def __len__(self) -> int:
+        return len(_KEYS) + (self.confidence is not None)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Analysis):
+            return self is other or self._key() == other._key()
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        # Equal to a dict in either legacy shape: analyzer {'lemma', 'tags', 'analysis'} or
+        # engine {'root', 'gloss', 'analysis', 'tags'}, with 'confidence' for guesses
+        keys = set(other)
+        if not keys <= set(self) or not {'tags', 'analysis'} <= keys or not keys & {'lemma', 'root'}:
+            return False
+        if (self.confidence is not None and 'confidence' not in keys) or (self.gloss and 'gloss' not in keys):
+            return False
+        return all(self[key] == other[key] for key in keys)
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('Analysis is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('Analysis is immutable')
+
+    def __reduce__(self):
+        return (Analysis.make, (self.lemma, self.tags, self.analysis, self.gloss, self.confidence))
+
+    def __repr__(self) -> str:
+        extra = f", confidence={self.confidence}" if self.confidence is not None else ''
+        return f"Analysis(lemma={self.lemma!r}, tags={self.tags!r}, analysis={self.analysis!r}{extra})"
+
+
+def json_default(obj: Any) -> Any:
+    """
+    default hook for json.dump(s): writes Analysis objects as their to_dict().
+    """
+    if isinstance(obj, Analysis):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def cache_size() -> int:
+    return len(_cache)
+
+
+def clear_cache() -> None:
+    """
+    Drop the flyweight cache (existing Analysis objects stay valid).
+    """
+    _cache.clear()
@@ -0,0 +1,246 @@
+"""
+core/async_engine.py
+
+asyncio counterparts of the analysis entry points, for async web and queue consumers.
+AsyncFSTEngine keeps a pool of persistent hfst-lookup processes and talks to them over asyncio
+subprocess pipes: one word is written per request and its result block is read back up to the
+terminating blank line, so no thread is held while a lookup is in flight. A lookup that times out
+or is cancelled kills its process (its output would be out of step with the next request) and the
+pool spawns a fresh one on the next use. Without an FST binary, or without hfst-lookup on PATH,
+FSTEngine.analyze runs in the executor instead. CPU-bound GNN scoring and the lexicon / guesser
+fallbacks also run in the executor; note that cancelling a call cannot interrupt work already
+started on an executor thread, it only stops waiting for it.
+The module-level functions keep one engine per event loop; when the resource snapshot changes,
+the loop's engine is replaced and the old one is closed in the background.
+"""
+import asyncio
+import logging
+import shutil
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from core.analysis import Analysis
+from core.fst_engine import FSTEngine, parse_lookup_output
+
+LOOKUP_COMMAND = ('hfst-lookup',)
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 5.0  # seconds per FST lookup
+
+
+class LookupWorker:
+    """
+    One persistent hfst-lookup process serving one request at a time.
+    """
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self._stderr = asyncio.ensure_future(self._log_stderr())
+
+    @classmethod
+    async def spawn(cls, command: Sequence[str], fst_bin_path: str) -> 'LookupWorker':
+        proc = await asyncio.create_subprocess_exec(
+            *command, fst_bin_path,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        logging.info(f"Started FST lookup worker (pid {proc.pid}) for {fst_bin_path}")
+        return cls(proc)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def _log_stderr(self) -> None:
+        # Drain stderr so a chatty process cannot block on a full pipe
+        async for line in self.proc.stderr:
+            logging.error(f"HFST error (pid {self.proc.pid}): {line.decode('utf-8', 'replace').rstrip()}")
+
+    async def lookup(self, word: str) -> str:
+        """
+        Raw output block for word (the lines before the terminating blank line).
+        """
+        self.proc.stdin.write(word.encode('utf-8') + b'\n')
+        await self.proc.stdin.drain()
+        lines = []
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"FST lookup worker (pid {self.proc.pid}) exited")
+            line = line.decode('utf-8').rstrip('\n')
+            if not line.strip():
+                return '\n'.join(lines)
+            lines.append(line)
+
+    def kill(self) -> None:
+        self._stderr.cancel()
+        if self.alive:
+            try:
+                self.proc.kill()
+            except (ProcessLookupError, RuntimeError):
+                pass  # already gone, or its event loop is closed
+
+
+class AsyncFSTEngine:
+    """
+    Async wrapper around an FSTEngine: full-form index first, then a pool of lookup workers
+    (or the blocking engine in the executor when hfst-lookup cannot be used).
+    """
+    def __init__(self, engine: FSTEngine, workers: int = DEFAULT_WORKERS, timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 command: Sequence[str] = LOOKUP_COMMAND, executor=None):
+        self.engine = engine
+        self.timeout = timeout
+        self.command = tuple(command)
+        self.executor = executor
+        self.use_workers = bool(engine.fst_bin_path) and shutil.which(self.command[0]) is not None
+        if engine.fst_bin_path and not self.use_workers:
+            logging.warning(f"'{self.command[0]}' not found on PATH; running FST lookups in the executor")
+        self.restarts = 0
+        self._closed = False
+        # Idle workers; None marks a slot whose process has not been started (or was killed)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(workers):
+            self._idle.put_nowait(None)
+
+    async def analyze(self, word: str, timeout: Optional[float] = None) -> List[Analysis]:
+        """
+        Same result as FSTEngine.analyze. Raises asyncio.TimeoutError if the lookup takes longer
+        than timeout (default: the engine timeout); other lookup failures give [UNK] as there.
+        """
+        if self.engine.fullform_index is not None:
+            indexed = self.engine.fullform_index.lookup(word)
+            if indexed:
+                return indexed
+        if not self.use_workers:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.engine.analyze, word)
+        try:
+            out = await asyncio.wait_for(self._lookup(word), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            logging.error(f"FST lookup for '{word}' timed out")
+            raise
+        except (OSError, RuntimeError) as e:
+            logging.error(f"Exception in AsyncFSTEngine.analyze for '{word}': {e}")
+            return [Analysis.make(word, ["UNK"], word)]
+        return parse_lookup_output(word, out)
+
+    async def batch_analyze(self, words: List[str], timeout: Optional[float] = None) -> List[List[Analysis]]:
+        return list(await asyncio.gather(*(self.analyze(w, timeout) for w in words)))
+
+    async def _lookup(self, word: str) -> str:
+        worker = await self._idle.get()
+        done = False
+        try:
+            if worker is None or not worker.alive:
+                if worker is not None:
+                    self.restarts += 1
+                worker = None
+                worker = await LookupWorker.spawn(self.command, self.engine.fst_bin_path)
+            out = await worker.lookup(word)
+            done = True
+            return out
+        finally:
+            if not done and worker is not None:
+                # Timed out, cancelled or broken mid-request: the process is out of step, replace it
+                worker.kill()
+                self.restarts += 1
+                worker = None
+            if self._closed and worker is not None:
+                worker.kill()
+            else:
+                self._idle.put_nowait(worker)
+
+    def shutdown(self) -> List[LookupWorker]:
+        """
+        Stop idle workers now and busy ones when their request finishes; returns those stopped.
+        """
+        self._closed = True
+        stopped = []
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None:
+                worker.kill()
+                stopped.append(worker)
+        return stopped
+
+    async def close(self) -> None:
+        """
+        shutdown() and wait for the stopped processes to exit.
+        """
+        await asyncio.gather(*(worker.proc.wait() for worker in self.shutdown()))
+
+
+# One async engine per event loop (its workers' pipes belong to that loop), for the current
+# resource snapshot; dropped with its loop
+_engines: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncFSTEngine]' = weakref.WeakKeyDictionary()
+# Background close() of engines replaced after a snapshot change (referenced until done)
+_closing: Set['asyncio.Task[None]'] = set()
+
+
+def _fst_for(snapshot) -> AsyncFSTEngine:
+    loop = asyncio.get_running_loop()
+    fst = _engines.get(loop)
+    if fst is None or fst.engine is not snapshot.fst_engine:
+        if fst is not None:
+            # Requests in flight finish on the old engine; its workers stop as they become idle
+            task = loop.create_task(fst.close())
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+        fst = _engines[loop] = AsyncFSTEngine(snapshot.fst_engine)
+    return fst
+
+
+async def _analyze(word: str) -> Tuple[List[Analysis], str, float]:
+    from core.engine import resources, _fst_is_final, _resolve
+    snapshot = resources.current()
+    fst_results = await _fst_for(snapshot).analyze(word)
+    if _fst_is_final(snapshot, fst_results):
+        return list(fst_results), 'fst', 1.0 - 1.0 / len(fst_results)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _resolve, word, snapshot, fst_results)
+
+
+async def analyze_word(word: str, timeout: Optional[float] = None) -> List[Analysis]:
+    """
+    Async core.engine.analyze_word. Raises asyncio.TimeoutError if the whole analysis takes
+    longer than timeout (or an FST lookup longer than DEFAULT_TIMEOUT).
+    """
+    from core.engine import stage_hits
+    analyses, stage, _ = await asyncio.wait_for(_analyze(word), timeout)
+    stage_hits[stage] += 1
+    return analyses
+
+
+async def analyze_word_with_uncertainty(word: str, timeout: Optional[float] = None) -> Tuple[List[Analysis], float]:
+    """
+    Async core.engine.analyze_word_with_uncertainty.
+    """
+    from core.engine import stage_hits
+    analyses, stage, uncertainty = await asyncio.wait_for(_analyze(word), timeout)
+    stage_hits[stage] += 1
+    return analyses, uncertainty
+
+
+async def analyze_words(words: List[str], timeout: Optional[float] = None) -> List[List[Analysis]]:
+    """
+    Analyze words concurrently; timeout applies to each word.
+    """
+    return list(await asyncio.gather(*(analyze_word(w, timeout) for w in words)))
+
+
+async def disambiguate(gnn, analyses: List[Dict[str, Any]], context: List[str] = None) -> Dict[str, Any]:
+    """
+    GNNDisambiguator.disambiguate in the executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, gnn.disambiguate, analyses, context)
+
+
+async def close() -> None:
+    """
+    Stop the lookup workers of the running loop's async engine, and wait for engines replaced
+    earlier on this loop to stop (call before the event loop ends).
+    """
+    loop = asyncio.get_running_loop()
+    fst = _engines.pop(loop, None)
+    pending = [task for task in _closing if task.get_loop() is loop]
+    if fst is not None:
+        pending.append(loop.create_task(fst.close()))
+    await asyncio.gather(*pending)
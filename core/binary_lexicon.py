@@ -0,0 +1,135 @@
+"""
+core/binary_lexicon.py
+
+Compiler and memory-mapped loader for binary word dictionaries.
+A JSON dictionary (dictionaries/<lang>.json: word -> {"POS": ..., "Features": {...}}) is compiled
+into a sorted string table (core.sstable) where every POS, feature name and feature value is
+interned once in a string table and each entry is a packed uint16 array:
+    [pos id, feature name id, feature value id, ...]
+Loading maps the file and decodes only the entries that are looked up.
+"""
+import json
+import logging
+import os
+import struct
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from core.sstable import SSTable, write_sstable
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DICTIONARY_DIR = os.path.join(BASE_DIR, 'dictionaries')
+_MAX_STRINGS = 0xFFFF
+
+
+def json_path(lang_code: str, directory: str = DICTIONARY_DIR) -> str:
+    return os.path.join(directory, f"{lang_code}.json")
+
+
+def binary_path(lang_code: str, directory: str = DICTIONARY_DIR) -> str:
+    return os.path.join(directory, f"{lang_code}.bin")
+
+
+def _source_stat(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def compile_dictionary(lang_code: str, directory: str = DICTIONARY_DIR, out_path: Optional[str] = None) -> str:
+    """
+    Compile dictionaries/<lang_code>.json into its binary form. Returns the output path.
+    """
+    src = json_path(lang_code, directory)
+    out_path = out_path or binary_path(lang_code, directory)
+    with open(src, encoding='utf-8') as f:
+        dictionary = json.load(f)
+    strings, ids = [], {}
+
+    def intern(value: Any) -> int:
+        value = str(value)
+        if value not in ids:
+            if len(strings) >= _MAX_STRINGS:
+                raise ValueError(f"Too many distinct POS/feature strings in {src}")
+            ids[value] = len(strings)
+            strings.append(value)
+        return ids[value]
+
+    items = []
+    for word, entry in dictionary.items():
+        if not isinstance(entry, dict):
+            logging.warning(f"Skipping malformed dictionary entry '{word}' in {src}")
+            continue
+        packed = [intern(entry.get('POS', 'UNK'))]
+        for name, value in entry.get('Features', {}).items():
+            packed += [intern(name), intern(value)]
+        items.append((word.encode('utf-8'), struct.pack(f'<{len(packed)}H', *packed)))
+    meta = {'lang': lang_code, 'strings': strings, 'source_stat': _source_stat(src)}
+    write_sstable(out_path, items, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+    logging.info(f"Compiled dictionary '{lang_code}': {len(items)} entries, {len(strings)} strings -> {out_path}")
+    return out_path
+
+
+class BinaryLexicon:
+    """
+    Memory-mapped compiled dictionary with the lookup interface of the JSON dictionaries.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._table = SSTable(path)
+        meta = json.loads(self._table.meta)
+        self.lang = meta.get('lang')
+        self.strings = meta['strings']
+        self.source_stat = meta.get('source_stat')
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, word: str) -> bool:
+        return word.encode('utf-8') in self._table
+
+    def _decode(self, value: bytes) -> Dict[str, Any]:
+        ids = struct.unpack(f'<{len(value) // 2}H', value)
+        strings = self.strings
+        return {
+            'POS': strings[ids[0]],
+            'Features': {strings[ids[i]]: strings[ids[i + 1]] for i in range(1, len(ids) - 1, 2)}
+        }
+
+    def get(self, word: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return {'POS': ..., 'Features': {...}} for word, or default.
+        """
+        value = self._table.get(word.encode('utf-8'))
+        return self._decode(value) if value is not None else default
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for key, value in self._table.items():
+            yield key.decode('utf-8'), self._decode(value)
+
+    def is_stale(self, directory: str = DICTIONARY_DIR) -> bool:
+        """
+        True if the source JSON changed since this lexicon was compiled.
+        """
+        src = json_path(self.lang, directory)
+        return os.path.exists(src) and _source_stat(src) != self.source_stat
+
+    def close(self) -> None:
+        self._table.close()
+
+
+def load_binary_lexicon(lang_code: str, directory: str = DICTIONARY_DIR) -> Optional[BinaryLexicon]:
+    """
+    Open the compiled dictionary for lang_code if it exists and matches its JSON source.
+    """
+    path = binary_path(lang_code, directory)
+    if not os.path.exists(path):
+        return None
+    try:
+        lexicon = BinaryLexicon(path)
+    except Exception as e:
+        logging.error(f"Failed to load compiled dictionary {path}: {e}")
+        return None
+    if lexicon.is_stale(directory):
+        logging.warning(f"Compiled dictionary {path} is older than its JSON source; ignoring it.")
+        lexicon.close()
+        return None
+    return lexicon
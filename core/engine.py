@@ -2,64 +2,137 @@
 """
 Rule-based morphological engine for Azerbaijani.
 """
-from typing import List, Dict
-from loaders.dictionary_loader import load_roots, load_affixes, load_rules
+from typing import List, Dict, Optional, Tuple
 from core.lexical_tagger import analyze_word_lexical
-from core.fst_engine import FSTEngine
-from core.gnn_disambiguator import GNNDisambiguator
-import os, json
+from core.resources import ResourceManager
+from core.analysis import Analysis
+from collections import Counter
+import math
+import time
 
 import logging
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-fst_path = os.path.join(os.path.dirname(__file__), '..', 'fst', 'az.hfst')
-if os.path.exists(fst_path):
-    logging.info(f"Using compiled FST: {fst_path}")
-    fst_engine = FSTEngine(fst_bin_path=fst_path)
-else:
-    logging.warning("Compiled FST not found, using simulated FST engine.")
-    fst_engine = FSTEngine(fst_bin_path=None)
-
-# Load tag vocab for GNNDisambiguator (assume it's at data/tag_vocab.json)
-tag_vocab_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'tag_vocab.json')
-if os.path.exists(tag_vocab_path):
-    with open(tag_vocab_path, encoding='utf-8') as f:
-        tag_vocab = json.load(f)
-    gnn_disamb = GNNDisambiguator(tag_vocab)
-    logging.info("GNNDisambiguator loaded with tag vocab.")
-else:
-    gnn_disamb = None
-    logging.warning("No tag vocab found; GNN disambiguator not available.")
-
-
-def analyze_word(word: str) -> List[Dict]:
-    """Perform FST-based morphological analysis of a single word, use GNN for disambiguation, fallback to lexical if needed."""
-    fst_results = fst_engine.analyze(word)
+# Analyzer resources (FST engine, full-form index, GNN, lexicons), built on first use. Long-running
+# entry points call resources.start() to rebuild and swap them in the background when data/,
+# dictionaries/, fst/ or models/ change (see core/resources.py)
+resources = ResourceManager()
+
+# Number of words answered by each pipeline stage: fst, gnn, lexical, guesser, unk
+stage_hits = Counter()
+
+
+def __getattr__(name: str):
+    """Module attributes fst_engine, fullform_index, gnn_disamb and tag_vocab resolve to the current resources."""
+    if name in ('fst_engine', 'fullform_index', 'gnn_disamb', 'tag_vocab'):
+        return getattr(resources.current(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_guesser():
+    """Return the unknown-word guesser of the current resources, building it on first use."""
+    return resources.current().get_guesser()
+
+
+def get_stage_stats() -> Dict[str, int]:
+    """Return how many words each pipeline stage has answered in this process."""
+    return dict(stage_hits)
+
+
+def _margin_uncertainty(scores: List[float]) -> float:
+    """1 - (p1 - p2) over the softmax of candidate scores: 0 for a clear winner, 1 for a tie."""
+    top = max(scores)
+    probs = sorted((math.exp(s - top) for s in scores), reverse=True)
+    total = sum(probs)
+    return 1.0 - (probs[0] - probs[1]) / total
+
+
+def _analyze(word: str, timings: Optional[Dict[str, float]] = None) -> Tuple[List[Analysis], str, float]:
+    """Run the pipeline for one word; returns (analyses, answering stage, uncertainty in [0, 1]).
+    If timings is given, the seconds spent in each stage that ran are recorded in it."""
+    clock = time.perf_counter if timings is not None else None
+    snapshot = resources.current()
+    if clock:
+        start = clock()
+    fst_results = snapshot.fst_engine.analyze(word)
+    if clock:
+        timings['fst'] = clock() - start
+    return _resolve(word, snapshot, fst_results, timings)
+
+
+def _fst_is_final(snapshot, fst_results: List[Analysis]) -> bool:
+    """True if the FST candidates are the answer as they are (one candidate, or no GNN to choose)."""
+    return bool(fst_results) and fst_results[0]['tags'][0] != 'UNK' and (
+        len(fst_results) == 1 or snapshot.gnn_disamb is None)
+
+
+def _resolve(word: str, snapshot, fst_results: List[Analysis],
+             timings: Optional[Dict[str, float]] = None) -> Tuple[List[Analysis], str, float]:
+    """The pipeline stages after the FST lookup (GNN, lexicon, guesser), on the FST candidates."""
+    clock = time.perf_counter if timings is not None else None
     if fst_results and fst_results[0]['tags'][0] != 'UNK':
-        if len(fst_results) == 1 or gnn_disamb is None:
+        if _fst_is_final(snapshot, fst_results):
             # Only one candidate or no GNN available
-            return [
-                {
-                    "root": res['lemma'],
-                    "gloss": "",
-                    "analysis": res['analysis'],
-                    "tags": res['tags']
-                } for res in fst_results
-            ]
+            return list(fst_results), 'fst', 1.0 - 1.0 / len(fst_results)
         # Use GNN to select best candidate
-        best = gnn_disamb.disambiguate(fst_results)
-        return [{
-            "root": best['lemma'],
-            "gloss": "",
-            "analysis": best['analysis'],
-            "tags": best['tags']
-        }]
+        if clock:
+            start = clock()
+        scores = snapshot.gnn_disamb.score(fst_results)
+        if clock:
+            timings['gnn'] = clock() - start
+        if scores is None:
+            return [fst_results[0]], 'gnn', 1.0
+        best = max(range(len(scores)), key=scores.__getitem__)
+        logging.info(f"GNN disambiguation scores: {scores}, best idx: {best}")
+        return [Analysis.from_dict(fst_results[best])], 'gnn', _margin_uncertainty(scores)
     # Fallback to lexical dictionary lookup
-    lex = analyze_word_lexical(word)
+    if clock:
+        start = clock()
+    lex = analyze_word_lexical(word, lexicon=snapshot.lexicons.get('az'))
+    if clock:
+        timings['lexical'] = clock() - start
+    if lex.get('POS', 'UNK') != 'UNK':
+        stage, uncertainty = 'lexical', 0.0
+    else:
+        # Last resort: guess from the endings of known words
+        if clock:
+            start = clock()
+        guesses = snapshot.get_guesser().guess(word)
+        if clock:
+            timings['guesser'] = clock() - start
+        if guesses:
+            return [
+                Analysis.make(g['lemma'], g['tags'], g['analysis'], confidence=g['confidence'])
+                for g in guesses
+            ], 'guesser', 1.0 - guesses[0]['confidence']
+        stage, uncertainty = 'unk', 1.0
     tags = [lex.get('POS', 'UNK')] + [f"{k}={v}" for k, v in lex.get('features', {}).items()]
-    return [{
-        "root": word,
-        "gloss": "",
-        "analysis": word,
-        "tags": tags
-    }]
+    return [Analysis.make(word, tags, word)], stage, uncertainty
+
+
+def analyze_word(word: str) -> List[Analysis]:
+    """Perform FST-based morphological analysis of a single word, use GNN for disambiguation, fallback to lexical if needed.
+    Words unknown to every analyzer get ranked guesses (with a 'confidence') from the suffix guesser.
+    Results are shared read-only Analysis objects (core/analysis.py), readable like the former dicts
+    ('root', 'gloss', 'analysis', 'tags').
+    The whole lookup uses one resource snapshot, even if a reload is published meanwhile."""
+    analyses, stage, _ = _analyze(word)
+    stage_hits[stage] += 1
+    return analyses
+
+
+def analyze_word_with_uncertainty(word: str) -> Tuple[List[Analysis], float]:
+    """Like analyze_word, plus how unsure the answering stage is (0 = certain, 1 = no idea):
+    the GNN score margin, the guesser confidence, the number of undisambiguated FST candidates."""
+    analyses, stage, uncertainty = _analyze(word)
+    stage_hits[stage] += 1
+    return analyses, uncertainty
+
+
+def analyze_word_traced(word: str) -> Tuple[List[Analysis], str, Dict[str, float]]:
+    """Like analyze_word, plus the answering stage (fst, gnn, lexical, guesser, unk) and the
+    seconds spent in each stage that ran, for evaluation and profiling."""
+    timings: Dict[str, float] = {}
+    analyses, stage, _ = _analyze(word, timings)
+    stage_hits[stage] += 1
+    return analyses, stage, timings
@@ -0,0 +1,166 @@
+"""
+core/evaluation.py
+
+Parallel evaluation of the analysis pipeline against a gold corpus (the corpus store or a
+CoNLL-U file). Sentences are analyzed in worker processes with core.engine.analyze_word_traced;
+the report gives lemma / UPOS / full-tag accuracy of the top analysis (and whether the gold
+tags were among the candidates), ambiguity and UNK rates, the stage that answered each token
+with its accuracy, latency percentiles per answering stage and per stage run, and, if one is
+trained, the accuracy and latency of the ML tag predictor on the same tokens.
+"""
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from db.index import entry_tokens
+
+PERCENTILES = (50, 90, 95, 99)
+CHUNK_SENTENCES = 64
+
+
+def load_gold(path: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Gold sentences as token lists ({'word', 'lemma', 'tags'}): from a CoNLL-U file if path is
+    given, otherwise from the corpus store.
+    """
+    if path:
+        from db.importers import iter_conllu
+        return [entry['tokens'] for entry in iter_conllu(path)]
+    from db.corpus import load_corpus
+    return [tokens for tokens in (entry_tokens(entry) for entry in load_corpus()) if tokens]
+
+
+def _warm_up() -> None:
+    # Load analyzers and build the guesser up front so cold starts do not skew the latencies
+    import core.engine
+    core.engine.resources.current().get_guesser()
+
+
+def _init_worker() -> None:
+    # Pool workers only: per-word pipeline logging would flood the output of every process
+    logging.getLogger().setLevel(logging.WARNING)
+    _warm_up()
+
+
+def _evaluate_chunk(sentences: List[List[Dict[str, Any]]]) -> List[tuple]:
+    """
+    One record per gold token: (stage, lemma_ok, upos_ok, tags_ok, oracle_ok, n_analyses, unk,
+    total seconds, {stage: seconds}); *_ok are None when the gold field is missing.
+    """
+    from core.engine import analyze_word_traced
+    records = []
+    for tokens in sentences:
+        for tok in tokens:
+            word = tok.get('word', '')
+            start = time.perf_counter()
+            analyses, stage, timings = analyze_word_traced(word)
+            elapsed = time.perf_counter() - start
+            best = analyses[0].to_dict() if analyses else {'lemma': word, 'tags': []}
+            tags = best['tags']
+            gold_lemma, gold_tags = tok.get('lemma'), tok.get('tags') or []
+            lemma_ok = best['lemma'].lower() == gold_lemma.lower() if gold_lemma else None
+            upos_ok = (tags[:1] == gold_tags[:1]) if gold_tags else None
+            tags_ok = (tags == gold_tags) if gold_tags else None
+            oracle_ok = any(list(a['tags']) == gold_tags for a in analyses) if gold_tags else None
+            unk = stage == 'unk' or tags[:1] == ['UNK']
+            records.append((stage, lemma_ok, upos_ok, tags_ok, oracle_ok, len(analyses), unk, elapsed, timings))
+    return records
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, float]:
+    if not seconds:
+        return {}
+    ms = np.asarray(seconds) * 1000.0
+    result = {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))}
+    result['mean'] = round(float(ms.mean()), 4)
+    return result
+
+
+def _accuracy(values: Iterable[Optional[bool]]) -> Optional[float]:
+    scored = [v for v in values if v is not None]
+    return round(sum(scored) / len(scored), 4) if scored else None
+
+
+def _tagger_report(sentences: List[List[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """
+    Accuracy and per-token latency of the trained tag predictor, or None without a model.
+    """
+    from core.models import load_tag_predictor
+    model = load_tag_predictor()
+    gold = [(tok['word'], '+'.join(tok['tags'])) for tokens in sentences for tok in tokens if tok.get('tags')]
+    if model is None or not gold:
+        return None
+    words = [word for word, _ in gold]
+    start = time.perf_counter()
+    predicted = model.predict(words)
+    elapsed = time.perf_counter() - start
+    tags = np.array([t for _, t in gold])
+    return {
+        'tokens': len(gold),
+        'accuracy': {'upos': round(float(np.mean([p.split('+')[0] == t.split('+')[0] for p, t in zip(predicted, tags)])), 4),
+                     'tags': round(float(np.mean(predicted == tags)), 4)},
+        'latency_ms_per_token': round(elapsed * 1000.0 / len(gold), 4)
+    }
+
+
+def evaluate(sentences: List[List[Dict[str, Any]]], workers: Optional[int] = None,
+             include_tagger: bool = True) -> Dict[str, Any]:
+    """
+    Run the pipeline over gold sentences in workers processes (in this process if workers == 1)
+    and return the evaluation report.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [sentences[i:i + CHUNK_SENTENCES] for i in range(0, len(sentences), CHUNK_SENTENCES)]
+    start = time.perf_counter()
+    if workers == 1:
+        _warm_up()
+        results = map(_evaluate_chunk, chunks)
+        records = [r for chunk in results for r in chunk]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            records = [r for chunk in pool.map(_evaluate_chunk, chunks) for r in chunk]
+    elapsed = time.perf_counter() - start
+
+    by_stage = defaultdict(list)
+    stage_runs = defaultdict(list)
+    for record in records:
+        by_stage[record[0]].append(record)
+        for stage, seconds in record[8].items():
+            stage_runs[stage].append(seconds)
+    n = len(records)
+    report = {
+        'sentences': len(sentences),
+        'tokens': n,
+        'workers': workers,
+        'elapsed_sec': round(elapsed, 3),
+        'tokens_per_sec': round(n / elapsed, 1) if elapsed else None,
+        'accuracy': {
+            'lemma': _accuracy(r[1] for r in records),
+            'upos': _accuracy(r[2] for r in records),
+            'tags': _accuracy(r[3] for r in records),
+            'tags_in_candidates': _accuracy(r[4] for r in records)
+        },
+        'ambiguity_rate': round(sum(r[5] > 1 for r in records) / n, 4) if n else None,
+        'mean_candidates': round(sum(r[5] for r in records) / n, 3) if n else None,
+        'unk_rate': round(sum(r[6] for r in records) / n, 4) if n else None,
+        'latency_ms': _percentiles([r[7] for r in records]),
+        'stages': {
+            stage: {
+                'tokens': len(rs),
+                'share': round(len(rs) / n, 4),
+                'accuracy': {'lemma': _accuracy(r[1] for r in rs), 'upos': _accuracy(r[2] for r in rs),
+                             'tags': _accuracy(r[3] for r in rs)},
+                'latency_ms': _percentiles([r[7] for r in rs])
+            } for stage, rs in sorted(by_stage.items())
+        },
+        'stage_latency_ms': {stage: _percentiles(seconds) for stage, seconds in sorted(stage_runs.items())}
+    }
+    if include_tagger:
+        report['tagger'] = _tagger_report(sentences)
+    logging.info(f"Evaluated {n} tokens in {elapsed:.2f}s with {workers} workers: {report['accuracy']}")
+    return report
@@ -6,25 +6,65 @@ This module will interface with external FST tools (HFST/Foma) and provide a Pyt
 """
 import subprocess
 import logging
-from typing import List, Dict, Optional
+from typing import Dict, List, Optional
+
+from core.analysis import Analysis
+from core.morphotactics import AffixAutomaton, harmony_context
+from loaders.dictionary_loader import load_roots, load_affixes, load_rules
+
+
+def parse_lookup_output(word: str, out: str) -> List[Analysis]:
+    """
+    Analyses of word from the hfst-lookup output for it ([UNK] if there are none).
+    """
+    analyses = []
+    for line in out.splitlines():
+        if '\t' in line:
+            try:
+                surface, analysis = line.split('\t', 1)
+            except ValueError:
+                logging.warning(f"Malformed FST output line (expected one tab): {line}")
+                continue
+            if analysis.strip() == '':
+                continue
+            parts = analysis.strip().replace('\t', '+').split('+')
+            lemma = parts[0] if parts else word
+            tags = parts[1:] if len(parts) > 1 else []
+            analyses.append(Analysis.make(lemma, tags, analysis.strip().replace('\t', '+')))
+    if not analyses:
+        logging.info(f"No FST analysis for '{word}', returning UNK.")
+        return [Analysis.make(word, ["UNK"], word)]
+    logging.info(f"FST analysis for '{word}': {analyses}")
+    return analyses
+
 
 class FSTEngine:
     """
     Wrapper for FST-based morphological analyzer.
     Uses HFST subprocess if available, otherwise falls back to simulated logic.
     """
-    def __init__(self, fst_bin_path: Optional[str]):
+    def __init__(self, fst_bin_path: Optional[str], fullform_index=None, roots: Optional[Dict] = None,
+                 automaton: Optional[AffixAutomaton] = None):
         self.fst_bin_path = fst_bin_path  # Path to compiled FST analyzer
+        self.fullform_index = fullform_index  # Optional core.fullform_index.FullFormIndex, consulted first
+        self._roots = roots
+        self._automaton = automaton  # Compiled affix automaton for the simulated analyzer (built lazily if None)
         if self.fst_bin_path:
             logging.info(f"FSTEngine initialized with binary: {self.fst_bin_path}")
         else:
             logging.warning("FSTEngine initialized in simulated mode (no FST binary)")
 
-    def analyze(self, word: str) -> List[Dict]:
+    def analyze(self, word: str) -> List[Analysis]:
         """
         Analyze a word using HFST via subprocess if fst_bin_path is set; otherwise, use simulated logic.
-        Returns a list of analyses (lemma, tags, segmentation).
+        Returns a list of shared, read-only analyses (lemma, tags, segmentation; see core/analysis.py).
+        Words present in the full-form index are answered from it without running the analyzer.
         """
+        if self.fullform_index is not None:
+            indexed = self.fullform_index.lookup(word)
+            if indexed:
+                logging.info(f"Full-form index analysis for '{word}': {indexed}")
+                return indexed
         if self.fst_bin_path:
             try:
                 proc = subprocess.Popen(
@@ -35,73 +75,45 @@ class FSTEngine:
                 out, err = proc.communicate(word + '\n')
                 if err:
                     logging.error(f"HFST error for '{word}': {err}")
-                analyses = []
-                for line in out.splitlines():
-                    if '\t' in line:
-                        try:
-                            surface, analysis = line.split('\t', 1)
-                        except ValueError:
-                            logging.warning(f"Malformed FST output line (expected one tab): {line}")
-                            continue
-                        if analysis.strip() == '':
-                            continue
-                        parts = analysis.strip().replace('\t', '+').split('+')
-                        lemma = parts[0] if parts else word
-                        tags = parts[1:] if len(parts) > 1 else []
-                        analyses.append({'lemma': lemma, 'tags': tags, 'analysis': analysis.strip().replace('\t', '+')})
-                if not analyses:
-                    logging.info(f"No FST analysis for '{word}', returning UNK.")
-                    return [{"lemma": word, "tags": ["UNK"], "analysis": word}]
-                logging.info(f"FST analysis for '{word}': {analyses}")
-                return analyses
+                return parse_lookup_output(word, out)
             except Exception as e:
                 logging.error(f"Exception in FSTEngine.analyze for '{word}': {e}")
-                return [{"lemma": word, "tags": ["UNK"], "analysis": word}]
+                return [Analysis.make(word, ["UNK"], word)]
         # fallback: simulated logic
         try:
-            import os, json
-            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
-            roots = json.load(open(os.path.join(base_dir, 'roots.json'), encoding='utf-8'))
-            affixes = json.load(open(os.path.join(base_dir, 'affixes.json'), encoding='utf-8'))
-            rules = json.load(open(os.path.join(base_dir, 'rules.json'), encoding='utf-8'))['valid_order']
+            roots, automaton = self._simulated_resources()
             results = []
-            for root, rdata in roots.items():
-                if word.startswith(root):
-                    remaining = word[len(root):]
-                    seg = root
-                    tags = [rdata['pos']]
-                    affix_seq = []
-                    # Try to greedily match affixes in valid order
-                    i = 0
-                    while remaining and i < len(rules):
-                        found = False
-                        for affix, adata in affixes.items():
-                            if remaining.startswith(affix) and adata['tag'] == rules[i]:
-                                seg += '+' + affix
-                                tags.append(adata['tag'])
-                                affix_seq.append(affix)
-                                remaining = remaining[len(affix):]
-                                found = True
-                                break
-                        if not found:
-                            i += 1
-                    if not remaining:
-                        results.append({
-                            'lemma': root,
-                            'tags': tags,
-                            'analysis': seg
-                        })
+            for end in range(1, len(word) + 1):
+                root = word[:end]
+                rdata = roots.get(root)
+                if rdata is None:
+                    continue
+                # Affix variants are checked against the harmony context of the root
+                for affixes in automaton.parse(word[end:], harmony_context(root), pos=rdata['pos']):
+                    results.append(Analysis.make(
+                        root,
+                        [rdata['pos']] + [tag for _, tag in affixes],
+                        '+'.join([root] + [surface for surface, _ in affixes])
+                    ))
             if not results:
                 logging.info(f"No simulated FST analysis for '{word}', returning UNK.")
-                return [{"lemma": word, "tags": ["UNK"], "analysis": word}]
+                return [Analysis.make(word, ["UNK"], word)]
             logging.info(f"Simulated FST analysis for '{word}': {results}")
             return results
         except Exception as e:
             logging.error(f"Exception in simulated FSTEngine.analyze for '{word}': {e}")
-            return [{"lemma": word, "tags": ["UNK"], "analysis": word}]
+            return [Analysis.make(word, ["UNK"], word)]
 
+    def _simulated_resources(self):
+        """
+        Load roots and compile the harmony-aware affix automaton once, on first simulated lookup.
+        """
+        if self._automaton is None or self._roots is None:
+            self._roots = load_roots()
+            self._automaton = AffixAutomaton(load_affixes(), load_rules())
+        return self._roots, self._automaton
 
-    def batch_analyze(self, words: List[str]) -> List[List[Dict]]:
+    def batch_analyze(self, words: List[str]) -> List[List[Analysis]]:
         """
         Analyze a batch of words.
         Returns a list of analyses for each word.
@@ -0,0 +1,178 @@
+"""
+core/fullform_index.py
+
+Precompiled full-form analysis index: surface -> analyses for every form reachable from the
+root/affix lexicons (via core.generator) and the lexc lexicon, stored as a memory-mapped
+sorted string table (core.sstable). FSTEngine consults it before running the analyzer.
+"""
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from core.analysis import Analysis
+from core.generator import MorphGenerator, DEFAULT_MAX_DEPTH
+from core.sstable import SSTable, write_sstable
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FULLFORM_INDEX_PATH = os.path.join(BASE_DIR, 'data', 'fullform.idx')
+LEXC_PATH = os.path.join(BASE_DIR, 'fst', 'az.lexc')
+
+# Separators inside an encoded value: analyses are joined by RS, their fields by US
+_RS, _US = '\x1e', '\x1f'
+
+_LEXC_ENTRY = re.compile(r'^(\S+)\s+(\S+)\s*;')
+
+# POS of lexc root continuation classes, for roots missing from roots.json
+LEXC_CLASS_POS = {'V': 'VERB', 'N': 'NOUN', 'ADJ': 'ADJ'}
+
+
+def parse_lexc(path: str = LEXC_PATH) -> Dict[str, List[tuple]]:
+    """
+    Parse a simple lexc file into {lexicon name: [(upper, lower, continuation), ...]}.
+    Supports 'upper:lower Cont ;' and 'word Cont ;' entries; other statements are ignored.
+    """
+    lexicons: Dict[str, List[tuple]] = {}
+    current = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('!', 1)[0].strip()
+            if not line or line.startswith('Multichar_Symbols'):
+                continue
+            if line.startswith('LEXICON'):
+                current = line.split()[1]
+                lexicons.setdefault(current, [])
+                continue
+            match = _LEXC_ENTRY.match(line)
+            if current is None or not match:
+                continue
+            form, cont = match.groups()
+            upper, sep, lower = form.partition(':')
+            lexicons[current].append((upper, lower if sep else upper, cont))
+    return lexicons
+
+
+def enumerate_lexc(path: str = LEXC_PATH, max_depth: int = DEFAULT_MAX_DEPTH,
+                   roots: Optional[Dict] = None) -> Dict[str, List[Dict]]:
+    """
+    Enumerate surface -> analyses reachable in the lexc lexicon with at most max_depth
+    affix entries after the root, in the analyzer's format: the root's POS (from roots, else
+    its continuation class) followed by the affix tags, and the segmented surface as analysis.
+    """
+    lexicons = parse_lexc(path)
+    roots = roots or {}
+    table: Dict[str, List[Dict]] = {}
+
+    def walk(lexicon: str, lemma: str, tags: List[str], pieces: List[str], depth: int) -> None:
+        for up, low, cont in lexicons.get(lexicon, []):
+            new_tags = tags + [t for t in up.split('+') if t]
+            new_pieces = pieces + [low]
+            if cont == '#':
+                table.setdefault(''.join(new_pieces), []).append(
+                    {'lemma': lemma, 'tags': new_tags, 'analysis': '+'.join(new_pieces)}
+                )
+            elif depth < max_depth:
+                walk(cont, lemma, new_tags, new_pieces, depth + 1)
+
+    for root, lower, cont in lexicons.get('Root', []):
+        pos = roots.get(root, {}).get('pos') or LEXC_CLASS_POS.get(cont, cont)
+        walk(cont, root, [pos], [lower], 0)
+    logging.info(f"Enumerated {len(table)} surface forms from lexc lexicon {path}")
+    return table
+
+
+def _dedupe(analyses: List[Dict]) -> List[Dict]:
+    """
+    Keep the first analysis of each (lemma, tags).
+    """
+    seen, unique = set(), []
+    for a in analyses:
+        key = (a['lemma'], tuple(a['tags']))
+        if key not in seen:
+            seen.add(key)
+            unique.append(a)
+    return unique
+
+
+def _encode(analyses: List[Dict]) -> bytes:
+    return _RS.join(
+        _US.join((a['lemma'], '+'.join(a['tags']), a['analysis'])) for a in analyses
+    ).encode('utf-8')
+
+
+def _decode(value: bytes) -> List[Analysis]:
+    analyses = []
+    for record in value.decode('utf-8').split(_RS):
+        lemma, tags, analysis = record.split(_US)
+        analyses.append(Analysis.make(lemma, tags.split('+') if tags else [], analysis))
+    return analyses
+
+
+def build_fullform_index(out_path: str = FULLFORM_INDEX_PATH, max_depth: int = DEFAULT_MAX_DEPTH,
+                         include_lexc: bool = True, lexc_path: str = LEXC_PATH,
+                         generator: Optional[MorphGenerator] = None, input_key: Optional[str] = None) -> int:
+    """
+    Enumerate all surface forms up to max_depth affixes and write the index to out_path.
+    Both sources give analyses in the analyzer's format; analyses of the same surface are
+    merged and deduplicated by (lemma, tags), the generator's coming first.
+    input_key (core.resources.fullform_inputs_key) is recorded in the meta so that the resource
+    manager only uses the index while its inputs are unchanged.
+    Returns the number of indexed surface forms.
+    """
+    generator = generator or MorphGenerator(max_depth=max_depth)
+    table = generator.build_fullform_table()
+    sources = ['lexicon']
+    if include_lexc and os.path.exists(lexc_path):
+        for surface, analyses in enumerate_lexc(lexc_path, max_depth, generator.roots).items():
+            table.setdefault(surface, []).extend(analyses)
+        sources.append('lexc')
+    for surface, analyses in table.items():
+        table[surface] = _dedupe(analyses)
+    meta = json.dumps({'max_depth': max_depth, 'sources': sources, 'input_key': input_key}).encode('utf-8')
+    count = write_sstable(
+        out_path, ((surface.encode('utf-8'), _encode(a)) for surface, a in table.items()), meta
+    )
+    logging.info(f"Built full-form index with {count} surface forms at {out_path}")
+    return count
+
+
+class FullFormIndex:
+    """
+    Memory-mapped surface -> analyses lookup table built by build_fullform_index.
+    """
+    def __init__(self, path: str = FULLFORM_INDEX_PATH):
+        self.path = path
+        self._table = SSTable(path)
+        self.meta = json.loads(self._table.meta or b'{}')
+        logging.info(f"Loaded full-form index from {path} ({len(self._table)} forms)")
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, word: str) -> bool:
+        return word.encode('utf-8') in self._table
+
+    def lookup(self, word: str) -> Optional[List[Analysis]]:
+        """
+        Return the analyses of word, or None if the form is not indexed.
+        """
+        value = self._table.get(word.encode('utf-8'))
+        return _decode(value) if value is not None else None
+
+    def close(self) -> None:
+        self._table.close()
+
+
+def load_fullform_index(path: str = FULLFORM_INDEX_PATH) -> Optional[FullFormIndex]:
+    """
+    Open the full-form index if it has been built. Logs and returns None otherwise.
+    """
+    if not os.path.exists(path):
+        logging.info(f"No full-form index at {path}")
+        return None
+    try:
+        return FullFormIndex(path)
+    except Exception as e:
+        logging.error(f"Failed to load full-form index from {path}: {e}")
+        return None
@@ -0,0 +1,173 @@
+"""
+core/generator.py
+
+Morphological generator for Azerbaijani: lemma + tags -> surface form(s).
+This is the inverse of the simulated FST analyzer in core/fst_engine.py and uses the same
+resources (roots.json, affixes.json and the affix order from rules.json), including the
+vowel-harmony templates compiled by core.morphotactics.
+"""
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.morphotactics import AffixAutomaton, Context, harmony_context
+from loaders.dictionary_loader import load_roots, load_affixes, load_rules
+
+# Maximum number of affixes stacked on a root when enumerating paradigms
+DEFAULT_MAX_DEPTH = 2
+
+
+class MorphGenerator:
+    """
+    Generates surface forms from a lemma and a tag sequence ordered by rules.json.
+    The affix chains of a paradigm depend on the root only through its harmony context and part
+    of speech, so they are built once per (context, POS) (the suffix table) and every root's paradigm is the root
+    prepended to its context's table. Paradigms are cached per root after the first request.
+    """
+    def __init__(self, roots: Optional[Dict] = None, affixes: Optional[Dict] = None,
+                 rules: Optional[Dict] = None, max_depth: int = DEFAULT_MAX_DEPTH):
+        self.roots = roots if roots is not None else load_roots()
+        affixes = affixes if affixes is not None else load_affixes()
+        rules = rules if rules is not None else load_rules()
+        self.automaton = AffixAutomaton(affixes, rules)
+        self.order = self.automaton.order
+        self.rank = self.automaton.rank
+        self.max_depth = max_depth
+        self._suffix_tables: Dict[Tuple[Context, str], List[Tuple[str, Tuple[str, ...], str]]] = {}
+        self._paradigms: Dict[str, List[Dict]] = {}
+        logging.info(f"MorphGenerator initialized: {len(self.roots)} roots, "
+                     f"{len(self.automaton.by_tag)} affix tags, max_depth={max_depth}")
+
+    def _split_tags(self, lemma: str, tags: List[str]) -> Optional[List[str]]:
+        """
+        Strip a leading POS tag and check that the remaining tags follow the valid order and are
+        taken by the lemma's POS (from roots.json, else the leading tag).
+        Returns the affix tags, or None if the sequence cannot be generated.
+        """
+        tags = list(tags)
+        pos = self.roots.get(lemma, {}).get('pos')
+        if tags and tags[0] not in self.rank:
+            if pos and tags[0] != pos:
+                logging.warning(f"POS mismatch for '{lemma}': expected {pos}, got {tags[0]}")
+                return None
+            pos = tags[0]
+            tags = tags[1:]
+        ranks = []
+        for i, tag in enumerate(tags):
+            if tag not in self.rank or tag not in self.automaton.by_tag:
+                logging.warning(f"Cannot generate tag '{tag}' for '{lemma}'")
+                return None
+            if not self.automaton.allows(pos, tuple(tags[:i]), tag):
+                logging.warning(f"'{lemma}' ({pos}) does not take tag '{tag}' after {tags[:i]}")
+                return None
+            ranks.append(self.rank[tag])
+        if any(a >= b for a, b in zip(ranks, ranks[1:])):
+            logging.warning(f"Tags {tags} for '{lemma}' do not follow the valid affix order")
+            return None
+        return tags
+
+    def generate(self, lemma: str, tags: List[str]) -> List[str]:
+        """
+        Generate all surface forms of lemma with the given tags.
+        Tags may start with the root's POS (as produced by the analyzer). Returns [] if the
+        tag sequence is invalid.
+        """
+        affix_tags = self._split_tags(lemma, tags)
+        if affix_tags is None:
+            return []
+        suffixes = self.automaton.realize_tags(harmony_context(lemma), affix_tags)
+        return [lemma + suffix for suffix in suffixes]
+
+    def validate(self, word: str, lemma: str, tags: List[str]) -> bool:
+        """
+        Check that word is a surface form of lemma with the given tags (e.g. an annotator edit).
+        """
+        return word in self.generate(lemma, tags)
+
+    def suffix_table(self, context: Context, pos: str) -> List[Tuple[str, Tuple[str, ...], str]]:
+        """
+        Build (once per harmony context and POS) every affix chain up to max_depth that the
+        POS takes (rules.json pos_affixes) as (surface suffix, tags, analysis suffix).
+        """
+        table = self._suffix_tables.get((context, pos))
+        if table is None:
+            table = [('', (), '')]
+            tags = [tag for tag in self.order if tag in self.automaton.by_tag]
+            # frontier: (suffix, tags, analysis suffix, context after suffix, next tag position)
+            frontier = [('', (), '', context, 0)]
+            for _ in range(self.max_depth):
+                extended = []
+                for suffix, chain, analysis, ctx, start in frontier:
+                    for i in range(start, len(tags)):
+                        if not self.automaton.allows(pos, chain, tags[i]):
+                            continue
+                        for _, variants in self.automaton.by_tag[tags[i]]:
+                            surface = variants[ctx]
+                            extended.append((suffix + surface, chain + (tags[i],),
+                                             f"{analysis}+{surface}", harmony_context(surface, ctx), i + 1))
+                table.extend(row[:3] for row in extended)
+                frontier = extended
+            self._suffix_tables[(context, pos)] = table
+            logging.info(f"Built {pos} suffix table for context {context} with {len(table)} affix chains")
+        return table
+
+    def _build_paradigm(self, lemma: str) -> List[Dict]:
+        pos = self.roots.get(lemma, {}).get('pos', 'UNK')
+        return [
+            {
+                'surface': lemma + suffix,
+                'lemma': lemma,
+                'tags': [pos, *tags],
+                'analysis': lemma + analysis
+            } for suffix, tags, analysis in self.suffix_table(harmony_context(lemma), pos)
+        ]
+
+    def paradigm(self, lemma: str) -> List[Dict]:
+        """
+        Return the full paradigm table of lemma (cached).
+        Each row: {'surface', 'lemma', 'tags', 'analysis'} in the analyzer's format.
+        """
+        table = self._paradigms.get(lemma)
+        if table is None:
+            table = self._build_paradigm(lemma)
+            self._paradigms[lemma] = table
+        return table
+
+    def precompute(self, lemmas: Optional[Iterable[str]] = None) -> int:
+        """
+        Fill the paradigm cache for the given lemmas (default: all roots).
+        Returns the number of cached paradigms.
+        """
+        for lemma in (self.roots if lemmas is None else lemmas):
+            self.paradigm(lemma)
+        logging.info(f"Precomputed paradigms for {len(self._paradigms)} roots")
+        return len(self._paradigms)
+
+    def iter_paradigms(self, lemmas: Optional[Iterable[str]] = None,
+                       cache: bool = False) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Stream (lemma, paradigm) pairs for a whole lexicon (default: all roots).
+        With cache=False paradigms are not kept, so memory stays flat for large lexicons.
+        """
+        for lemma in (self.roots if lemmas is None else lemmas):
+            if cache or lemma in self._paradigms:
+                yield lemma, self.paradigm(lemma)
+            else:
+                yield lemma, self._build_paradigm(lemma)
+
+    def build_fullform_table(self, lemmas: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Build a surface -> analyses table over all generated forms, for use as an
+        analyzer lookup table. Analyses have the analyzer's keys (lemma, tags, analysis).
+        """
+        table: Dict[str, List[Dict]] = {}
+        for lemma, paradigm in self.iter_paradigms(lemmas):
+            for row in paradigm:
+                table.setdefault(row['surface'], []).append(
+                    {'lemma': row['lemma'], 'tags': row['tags'], 'analysis': row['analysis']}
+                )
+        logging.info(f"Built full-form table with {len(table)} surface forms")
+        return table
+
+# Example usage:
+# gen = MorphGenerator()
+# print(gen.generate('kitab', ['NOUN', 'PLUR', 'LOC']))  # ['kitablarda']
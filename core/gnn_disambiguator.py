@@ -8,7 +8,7 @@ import torch
 import torch.nn as nn
 import logging
 from torch_geometric.data import Data, Batch
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class MorphoGNN(nn.Module):
     """
@@ -64,21 +64,30 @@ class GNNDisambiguator:
         edge_index = torch.stack([row, col], dim=0)
         return edge_index
 
-    def disambiguate(self, analyses: List[Dict[str, Any]], context: List[str] = None) -> Dict[str, Any]:
+    def score(self, analyses: List[Dict[str, Any]], context: List[str] = None) -> Optional[List[float]]:
         """
-        Given candidate analyses, return the most probable one.
-        Logs the process and result.
+        Score candidate analyses (higher is better). Returns None if scoring fails.
         """
         try:
             graph = self.build_graph(analyses, context)
             with torch.no_grad():
                 scores = self.model(graph.x, graph.edge_index)
-            best_idx = scores.argmax().item()
-            logging.info(f"GNN disambiguation scores: {scores.tolist()}, best idx: {best_idx}")
-            return analyses[best_idx]
+            return scores.tolist()
         except Exception as e:
-            logging.error(f"Error during GNN disambiguation: {e}")
+            logging.error(f"Error during GNN scoring: {e}")
+            return None
+
+    def disambiguate(self, analyses: List[Dict[str, Any]], context: List[str] = None) -> Dict[str, Any]:
+        """
+        Given candidate analyses, return the most probable one.
+        Logs the process and result.
+        """
+        scores = self.score(analyses, context)
+        if scores is None:
             return analyses[0]
+        best_idx = max(range(len(scores)), key=scores.__getitem__)
+        logging.info(f"GNN disambiguation scores: {scores}, best idx: {best_idx}")
+        return analyses[best_idx]
 
 # Example usage (with dummy tag vocab):
 # tag_vocab = {"VERB": 0, "NOUN": 1, "ADJ": 2, "PLUR": 3, ...}
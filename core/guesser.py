@@ -0,0 +1,211 @@
+"""
+core/guesser.py
+
+Unknown-word guesser for Azerbaijani.
+Known surface forms (corpus, dictionaries, generated paradigms) are indexed in a trie over their
+reversed suffixes. Each trie node counts the inflection patterns (ending, tags) seen below it, so
+an out-of-vocabulary word is guessed by walking its reversed suffix in O(suffix length) and
+reading the ranked patterns at the deepest matching node. The corpus forms, which change as
+annotations are saved, are indexed in a guesser layered over one holding the dictionary and
+paradigm forms, so only they are re-indexed when the corpus changes. Optionally backed by the
+char-ngram tag predictor from core.models, looked up on each call so a retrained model is used
+at once.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from db.index import entry_tokens
+
+DEFAULT_MAX_SUFFIX = 8
+# Pseudo-count of unseen words at every trie node: endings backed by few known words get a low
+# confidence (a single known word gives at most 1/3)
+SUPPORT_PRIOR = 2
+
+# Inflection pattern: (ending stripped from the surface to get the lemma, tags, analysis suffix)
+Pattern = Tuple[str, Tuple[str, ...], str]
+
+
+class _Node:
+    __slots__ = ('children', 'patterns', 'total')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.patterns: Dict[Pattern, int] = {}
+        self.total = 0
+
+
+class SuffixGuesser:
+    """
+    Ranks candidate analyses for unknown words by the endings of similar known words.
+    """
+    def __init__(self, max_suffix: int = DEFAULT_MAX_SUFFIX, model_loader: Optional[Callable[[], Any]] = None,
+                 base: Optional['SuffixGuesser'] = None):
+        # base: a guesser that is no longer added to, whose known forms count as this one's; lets
+        # a guesser over a changing word list reuse one built over a fixed, larger one
+        self.base = base
+        self.max_suffix = base.max_suffix if base is not None else max_suffix
+        # Returns the current fitted tag predictor (predict_proba, classes_) or None; e.g. load_tag_predictor
+        self.model_loader = model_loader
+        self.root = _Node()
+        self.size = base.size if base is not None else 0
+
+    def add(self, surface: str, lemma: str, tags: List[str], analysis: Optional[str] = None) -> None:
+        """
+        Index one known analysis. Forms whose lemma is not a prefix of the surface are skipped.
+        """
+        surface, lemma = surface.lower(), lemma.lower()
+        if not surface or not surface.startswith(lemma) or not tags:
+            return
+        ending = surface[len(lemma):]
+        analysis = analysis if analysis is not None else lemma
+        suffix = analysis[len(lemma):] if analysis.lower().startswith(lemma) else ''
+        pattern = (ending, tuple(tags), suffix)
+        node = self.root
+        for depth, ch in enumerate(reversed(surface[-self.max_suffix:]), start=1):
+            node = node.children.setdefault(ch, _Node())
+            # A pattern only applies below the point where the whole ending has been matched
+            if depth >= len(ending):
+                node.patterns[pattern] = node.patterns.get(pattern, 0) + 1
+                node.total += 1
+        self.size += 1
+
+    def add_analyses(self, forms: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> None:
+        """
+        Index (surface, analyses) pairs with analyzer-style analyses (lemma, tags, analysis).
+        """
+        for surface, analyses in forms:
+            for a in analyses:
+                self.add(surface, a.get('lemma', surface), a.get('tags', []), a.get('analysis'))
+
+    def guess(self, word: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Return up to top_k ranked guesses as {'lemma', 'tags', 'analysis', 'confidence'}.
+        Confidence is the pattern's share at the deepest usable node, discounted for short matches
+        and for endings shared by few known words (SUPPORT_PRIOR).
+        """
+        lower = word.lower()
+        paths = []
+        guesser = self
+        while guesser is not None:
+            node, path = guesser.root, []
+            for ch in reversed(lower[-self.max_suffix:]):
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                path.append(node)
+            paths.append(path)
+            guesser = guesser.base
+        guesses: List[Dict[str, Any]] = []
+        for depth in range(max(map(len, paths)), 0, -1):
+            patterns: Dict[Pattern, int] = {}
+            for path in paths:
+                if len(path) >= depth:
+                    for p, n in path[depth - 1].patterns.items():
+                        patterns[p] = patterns.get(p, 0) + n
+            usable = [(p, n) for p, n in patterns.items() if len(p[0]) < len(lower)]
+            if not usable:
+                continue
+            total = sum(n for _, n in usable)
+            support = total / (total + SUPPORT_PRIOR)
+            usable.sort(key=lambda item: -item[1])
+            for (ending, tags, suffix), count in usable[:top_k]:
+                lemma = word[:len(word) - len(ending)]
+                guesses.append({
+                    'lemma': lemma,
+                    'tags': list(tags),
+                    'analysis': lemma + suffix,
+                    'confidence': round(count / total * depth / (depth + 1) * support, 4)
+                })
+            break
+        model = self.model_loader() if self.model_loader is not None else None
+        if model is not None and len(guesses) < top_k:
+            guesses.extend(self._model_guess(model, word, top_k - len(guesses), guesses))
+        if guesses:
+            logging.info(f"Guesser candidates for '{word}': {guesses}")
+        return guesses
+
+    def _model_guess(self, model, word: str, top_k: int, seen: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ask the char-ngram tag predictor for tag sequences not already proposed by the trie.
+        """
+        try:
+            probs = model.predict_proba([word])[0]
+        except Exception as e:
+            logging.error(f"Tag predictor failed in guesser for '{word}': {e}")
+            return []
+        known = {tuple(g['tags']) for g in seen}
+        ranked = sorted(zip(model.classes_, probs), key=lambda item: -item[1])
+        guesses = []
+        for label, prob in ranked:
+            tags = label.split('+')
+            if tuple(tags) in known:
+                continue
+            guesses.append({'lemma': word, 'tags': tags, 'analysis': word, 'confidence': round(float(prob), 4)})
+            if len(guesses) >= top_k:
+                break
+        return guesses
+
+
+def _corpus_forms(corpus: List[Dict[str, Any]],
+                  roots: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterable[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Known analyses from the corpus store: annotated tokens with a lemma and tags. Legacy
+    word/analysis pairs are converted with the POS of their root (see db.index.entry_tokens).
+    """
+    for entry in corpus:
+        for tok in entry_tokens(entry, roots):
+            if tok.get('word') and tok.get('lemma') and tok.get('tags'):
+                yield tok['word'], [{'lemma': tok['lemma'], 'tags': tok['tags']}]
+
+
+def _dictionary_forms(dictionary: Dict[str, Any]) -> Iterable[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Known analyses from a lexical dictionary, in the lexical fallback's tag format.
+    """
+    for word, entry in dictionary.items():
+        if isinstance(entry, dict) and entry.get('POS'):
+            tags = [entry['POS']] + [f"{k}={v}" for k, v in entry.get('Features', {}).items()]
+            yield word, [{'lemma': word, 'tags': tags}]
+
+
+def build_lexicon_guesser(lang_code: str = 'az', max_suffix: int = DEFAULT_MAX_SUFFIX,
+                          generator=None, dictionary=None) -> SuffixGuesser:
+    """
+    Guesser over the lexical dictionary and generated paradigms only, to be used as the base of
+    build_guesser. generator (a MorphGenerator) and dictionary (a word -> entry mapping with
+    items(), e.g. a BinaryLexicon) default to ones loaded from data/ and dictionaries/.
+    """
+    from core.generator import MorphGenerator
+    from core.lexical_tagger import load_dictionary
+
+    guesser = SuffixGuesser(max_suffix)
+    try:
+        guesser.add_analyses(_dictionary_forms(dictionary if dictionary is not None else load_dictionary(lang_code)))
+        for _, paradigm in (generator or MorphGenerator()).iter_paradigms():
+            guesser.add_analyses((row['surface'], [row]) for row in paradigm)
+    except Exception as e:
+        logging.error(f"Failed to index dictionary and paradigm forms for guesser: {e}")
+    return guesser
+
+
+def build_guesser(lang_code: str = 'az', use_model: bool = True, max_suffix: int = DEFAULT_MAX_SUFFIX,
+                  generator=None, dictionary=None, base: Optional[SuffixGuesser] = None) -> SuffixGuesser:
+    """
+    Build a guesser over the corpus store, the lexical dictionary and generated paradigms.
+    The dictionary and paradigm forms come from base (see build_lexicon_guesser), built here
+    from generator and dictionary if not given; only the corpus is indexed when base is reused.
+    With use_model, the trained char-ngram tag predictor (if any) backs the trie.
+    """
+    from core.models import load_tag_predictor
+    from db.corpus import get_corpus
+
+    if base is None:
+        base = build_lexicon_guesser(lang_code, max_suffix, generator, dictionary)
+    guesser = SuffixGuesser(max_suffix, model_loader=load_tag_predictor if use_model else None, base=base)
+    try:
+        guesser.add_analyses(_corpus_forms(get_corpus(), generator.roots if generator is not None else None))
+    except Exception as e:
+        logging.error(f"Failed to index corpus forms for guesser: {e}")
+    logging.info(f"Built suffix guesser over {guesser.size} known analyses "
+                 f"(model {'enabled' if use_model else 'disabled'})")
+    return guesser
@@ -1,11 +1,16 @@
 # core/lexical_tagger.py
 """
 Lexicon-based POS tagger using user-provided dictionary files.
+Lookups are routed per lang_code to the compiled binary dictionary (core.binary_lexicon) when it
+is up to date, otherwise to the JSON dictionary. Loaded lexicons are kept per process and reloaded
+when either file changes.
 """
 import os
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+from core.binary_lexicon import binary_path, json_path, load_binary_lexicon
 
 # Base project directory
 env_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -31,7 +36,63 @@ def load_dictionary(lang_code: str = 'az') -> Dict[str, Any]:
         return {}
 
 
-def analyze_word_lexical(word: str, lang_code: str = 'az') -> Dict[str, Any]:
+# lang_code -> loaded lexicon (BinaryLexicon or JSON dict), and the source files' stamp it was loaded at
+_lexicons: Dict[str, Any] = {}
+_stamps: Dict[str, Tuple] = {}
+
+
+def _source_stamp(lang_code: str) -> Tuple:
+    """
+    (mtime_ns, size) of the JSON and compiled dictionaries of lang_code (None if missing).
+    """
+    stamp = []
+    for path in (json_path(lang_code, DICTIONARY_DIR), binary_path(lang_code, DICTIONARY_DIR)):
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def get_lexicon(lang_code: str = 'az'):
+    """
+    Return the lexicon for lang_code. It is loaded once and reused until the JSON or compiled
+    dictionary changes on disk (checked with one stat per file and call), then reloaded.
+    Prefers the memory-mapped compiled dictionary; falls back to the JSON dictionary.
+    """
+    stamp = _source_stamp(lang_code)
+    lexicon = _lexicons.get(lang_code)
+    if lexicon is None or _stamps.get(lang_code) != stamp:
+        lexicon = load_binary_lexicon(lang_code, DICTIONARY_DIR)
+        if lexicon is not None:
+            logging.info(f"Using compiled dictionary for '{lang_code}' ({len(lexicon)} entries).")
+        else:
+            lexicon = load_dictionary(lang_code)
+        _lexicons[lang_code] = lexicon
+        _stamps[lang_code] = stamp
+    return lexicon
+
+
+def set_lexicons(lexicons: Dict[str, Any]) -> None:
+    """
+    Replace the loaded lexicons as a whole (copy-on-write), e.g. after a hot reload.
+    Lookups that already hold a lexicon keep using it.
+    """
+    global _lexicons, _stamps
+    _stamps = {lang: _source_stamp(lang) for lang in lexicons}
+    _lexicons = dict(lexicons)
+
+
+def reset_lexicons() -> None:
+    """
+    Drop loaded lexicons so the next lookup reloads them (e.g. after recompiling).
+    """
+    _lexicons.clear()
+    _stamps.clear()
+
+
+def analyze_word_lexical(word: str, lang_code: str = 'az', lexicon: Any = None) -> Dict[str, Any]:
     """
     Lookup word in dictionary. Returns:
         {
@@ -39,9 +100,10 @@ def analyze_word_lexical(word: str, lang_code: str = 'az') -> Dict[str, Any]:
           'POS': part-of-speech tag or 'UNK',
           'features': morphological features dict or empty
         }
+    A lexicon (e.g. from a core.resources snapshot) can be passed instead of the process-wide one.
     Logs the analysis process.
     """
-    dictionary = load_dictionary(lang_code)
+    dictionary = lexicon if lexicon is not None else get_lexicon(lang_code)
     entry = dictionary.get(word.lower()) if dictionary else None
     if entry and isinstance(entry, dict):
         pos = entry.get('POS', 'UNK')
@@ -4,26 +4,40 @@ Machine learning-based morphological tagger.
 """
 import os
 import pickle
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 import logging
+import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
 from db.corpus import get_corpus
+from db.index import entry_tokens
 
 MODEL_PATH = "models/tag_predictor.pkl"
 
-def prepare_dataset() -> Tuple[List[str], List[str]]:
+def prepare_dataset(snapshot=None, exclude: Optional[Iterable[int]] = None) -> Tuple[List[str], List[str]]:
     """
-    Prepare training data from the annotated corpus.
+    Prepare training data from the annotated corpus, or from a columnar snapshot
+    (db.columnar) without walking the JSON. Sentences whose index is in exclude are left out.
     Returns X (words) and y (tag sequences).
     Logs the number of samples prepared.
     """
+    exclude = set(exclude or ())
+    if snapshot is not None:
+        tagged = snapshot.tag_offsets[1:] > snapshot.tag_offsets[:-1]
+        if exclude:
+            tagged &= ~np.isin(snapshot.sentence_ids(), list(exclude))
+        X = snapshot.decode('words', snapshot.word_ids[tagged]).tolist()
+        y = snapshot.decode('tagseqs', snapshot.tagseq_ids[tagged]).tolist()
+        logging.info(f"Prepared dataset from columnar snapshot: {len(X)} samples.")
+        return X, y
     corpus = get_corpus()
     X, y = [], []
-    for entry in corpus:
-        for token in entry["tokens"]:
+    for i, entry in enumerate(corpus):
+        if i in exclude:
+            continue
+        for token in entry_tokens(entry):
             word = token.get("word")
             tags = token.get("tags", [])
             if tags:
@@ -32,12 +46,15 @@ def prepare_dataset() -> Tuple[List[str], List[str]]:
     logging.info(f"Prepared dataset: {len(X)} samples.")
     return X, y
 
-def train_tag_predictor() -> Pipeline:
+def train_tag_predictor(snapshot=None) -> Pipeline:
     """
-    Train and save a morphological tagger on the corpus.
-    Logs progress and errors.
+    Train and save a morphological tagger on the corpus (or a columnar snapshot).
+    The frozen dev set of core.training_scheduler is held out of training and used to report
+    the model's accuracy. Logs progress and errors.
     """
-    X, y = prepare_dataset()
+    from core.training_scheduler import evaluate, load_dev_set
+    dev = load_dev_set(get_corpus())
+    X, y = prepare_dataset(snapshot, exclude=dev["indices"])
     if not X:
         logging.error("Corpus is empty. Cannot train model.")
         return None
@@ -46,6 +63,11 @@ def train_tag_predictor() -> Pipeline:
         ("clf", LogisticRegression(max_iter=500))
     ])
     pipeline.fit(X, y)
+    if dev["X"]:
+        logging.info(f"Trained tag predictor on {len(X)} samples; dev accuracy "
+                     f"{evaluate(pipeline, dev['X'], dev['y'])} ({len(dev['X'])} held-out tokens)")
+    else:
+        logging.info(f"Trained tag predictor on {len(X)} samples; no dev set yet (corpus too small)")
     try:
         os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
         with open(MODEL_PATH, "wb") as f:
@@ -56,6 +78,31 @@ def train_tag_predictor() -> Pipeline:
     return pipeline
 
 
+_model_cache = {}
+
+
+def load_tag_predictor() -> Optional[Pipeline]:
+    """
+    Load the trained tag predictor, reusing the unpickled model until the file changes.
+    Returns None if no model has been trained.
+    """
+    if not os.path.exists(MODEL_PATH):
+        logging.info(f"No trained tag predictor at {MODEL_PATH}")
+        return None
+    mtime = os.path.getmtime(MODEL_PATH)
+    cached = _model_cache.get(MODEL_PATH)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(MODEL_PATH, "rb") as f:
+            model = pickle.load(f)
+        _model_cache[MODEL_PATH] = (mtime, model)
+        return model
+    except Exception as e:
+        logging.error(f"Failed to load tag predictor from {MODEL_PATH}: {e}")
+        return None
+
+
 def predict_tags(word: str) -> List[str]:
     """
     Predict morphological tags for a single word using the trained model.
@@ -65,8 +112,7 @@ def predict_tags(word: str) -> List[str]:
         logging.error(f"Trained model not found at {MODEL_PATH}")
         raise FileNotFoundError("Model not trained. Call train_tag_predictor() first.")
     try:
-        with open(MODEL_PATH, "rb") as f:
-            model = pickle.load(f)
+        model = load_tag_predictor()
         predicted = model.predict([word])[0]
         logging.info(f"Predicted tags for '{word}': {predicted}")
         return predicted.split("+")
@@ -0,0 +1,153 @@
+"""
+core/morphotactics.py
+
+Vowel harmony and compiled affix automaton for Azerbaijani.
+Affixes in data/affixes.json may carry an archiphoneme "template" (e.g. "DI", "lAr", "(y)AcAQ")
+which is expanded at build time into one surface variant per harmony context:
+    A   -> a (back) / ə (front)
+    I   -> ı / i / u / ü (back-unrounded, front-unrounded, back-rounded, front-rounded)
+    Q   -> q (back) / k (front)
+    D   -> d
+    (x) -> optional segment: a consonant is kept only after a vowel, a vowel only after a consonant
+The harmony context of a stem is its last vowel's class plus whether it ends in a vowel.
+"""
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BACK_VOWELS = set('aıou')
+FRONT_VOWELS = set('əeiöü')
+ROUNDED_VOWELS = set('oöuü')
+VOWELS = BACK_VOWELS | FRONT_VOWELS
+
+# (front, rounded) -> realisation of each archiphoneme
+_ARCHIPHONEMES = {
+    'A': {(False, False): 'a', (False, True): 'a', (True, False): 'ə', (True, True): 'ə'},
+    'I': {(False, False): 'ı', (False, True): 'u', (True, False): 'i', (True, True): 'ü'},
+    'Q': {(False, False): 'q', (False, True): 'q', (True, False): 'k', (True, True): 'k'},
+    'D': {(False, False): 'd', (False, True): 'd', (True, False): 'd', (True, True): 'd'},
+}
+_OPTIONAL = re.compile(r'\(([^)]*)\)')
+
+# Harmony context: (front, rounded, vowel_final)
+Context = Tuple[bool, bool, bool]
+CONTEXTS: List[Context] = [(f, r, v) for f in (False, True) for r in (False, True) for v in (False, True)]
+
+
+def harmony_context(stem: str, previous: Optional[Context] = None) -> Context:
+    """
+    Harmony context after stem. If stem has no vowel, the vowel class of previous is kept
+    (default: back unrounded).
+    """
+    if not stem:
+        return previous or (False, False, False)
+    front, rounded = (previous[0], previous[1]) if previous else (False, False)
+    stem = stem.lower()
+    for ch in reversed(stem):
+        if ch in VOWELS:
+            front, rounded = ch in FRONT_VOWELS, ch in ROUNDED_VOWELS
+            break
+    return front, rounded, stem[-1] in VOWELS
+
+
+def realize(template: str, context: Context) -> str:
+    """
+    Realize an archiphoneme template in the given harmony context.
+    """
+    front, rounded, vowel_final = context
+
+    def optional(match: re.Match) -> str:
+        segment = match.group(1)
+        first = _ARCHIPHONEMES.get(segment[:1], {}).get((front, rounded), segment[:1])
+        keep = (first not in VOWELS) if vowel_final else (first in VOWELS)
+        return segment if keep else ''
+
+    expanded = _OPTIONAL.sub(optional, template)
+    return ''.join(_ARCHIPHONEMES[ch][(front, rounded)] if ch in _ARCHIPHONEMES else ch for ch in expanded)
+
+
+def expand_template(template: str) -> Dict[Context, str]:
+    """
+    Expand a template into its surface variant for every harmony context.
+    """
+    return {context: realize(template, context) for context in CONTEXTS}
+
+
+class AffixAutomaton:
+    """
+    Affix lexicon compiled per harmony context: surface -> [(affix id, tag, rank)].
+    Tags must appear in strictly increasing valid_order rank, and each affix's variant is chosen
+    by the harmony context of everything to its left.
+    """
+    def __init__(self, affixes: Dict[str, Dict], rules: Dict):
+        self.order = rules.get('valid_order', [])
+        self.rank = {tag: i for i, tag in enumerate(self.order)}
+        # POS -> affix tag -> tags of which one must precede it (see pos_affixes in data/README.md)
+        self.pos_affixes: Optional[Dict[str, Dict[str, frozenset]]] = None
+        if 'pos_affixes' in rules:
+            self.pos_affixes = {
+                pos: {tag: frozenset(required) for tag, required in tags.items()}
+                for pos, tags in rules['pos_affixes'].items()
+            }
+        # tag -> [(affix id, variants by context)]
+        self.by_tag: Dict[str, List[Tuple[str, Dict[Context, str]]]] = {}
+        # context -> surface -> [(affix id, tag, rank)]
+        self.arcs: Dict[Context, Dict[str, List[Tuple[str, str, int]]]] = {c: {} for c in CONTEXTS}
+        for affix, adata in affixes.items():
+            tag = adata.get('tag')
+            if tag not in self.rank:
+                continue
+            variants = expand_template(adata.get('template', affix))
+            self.by_tag.setdefault(tag, []).append((affix, variants))
+            for context, surface in variants.items():
+                if surface:
+                    self.arcs[context].setdefault(surface, []).append((affix, tag, self.rank[tag]))
+        self.lengths = {c: sorted({len(s) for s in arcs}) for c, arcs in self.arcs.items()}
+        logging.info(f"Compiled affix automaton: {len(self.by_tag)} tags, "
+                     f"{sum(len(a) for a in self.arcs.values())} arcs over {len(CONTEXTS)} contexts")
+
+    def allows(self, pos: Optional[str], chain: Tuple[str, ...], tag: str) -> bool:
+        """
+        Whether a root of part of speech pos takes tag after the affix tags in chain
+        (always true when pos is None or rules.json has no pos_affixes).
+        """
+        if pos is None or self.pos_affixes is None:
+            return True
+        required = self.pos_affixes.get(pos, {}).get(tag)
+        if required is None:
+            return False
+        return not required or any(t in required for t in chain)
+
+    def parse(self, remaining: str, context: Context, min_rank: int = 0, pos: Optional[str] = None,
+              chain: Tuple[str, ...] = ()) -> Iterator[List[Tuple[str, str]]]:
+        """
+        Yield every segmentation of remaining into affixes as [(surface, tag), ...].
+        If pos is given, only affixes that part of speech takes after chain are considered.
+        """
+        if not remaining:
+            yield []
+            return
+        arcs = self.arcs[context]
+        for length in self.lengths[context]:
+            surface = remaining[:length]
+            if len(surface) < length:
+                break
+            for _, tag, rank in arcs.get(surface, ()):
+                if rank < min_rank or not self.allows(pos, chain, tag):
+                    continue
+                next_context = harmony_context(surface, context)
+                for rest in self.parse(remaining[length:], next_context, rank + 1, pos, chain + (tag,)):
+                    yield [(surface, tag), *rest]
+
+    def realize_tags(self, context: Context, tags: List[str]) -> List[str]:
+        """
+        All surface suffixes for a tag sequence after a stem with the given context.
+        """
+        results = [('', context)]
+        for tag in tags:
+            results = [
+                (suffix + variants[ctx], harmony_context(variants[ctx], ctx))
+                for suffix, ctx in results
+                for _, variants in self.by_tag.get(tag, [])
+            ]
+        return [suffix for suffix, _ in results]
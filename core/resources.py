@@ -0,0 +1,484 @@
+"""
+core/resources.py
+
+Hot-reloadable analyzer resources.
+ResourceManager polls the analyzer inputs (data/roots.json, affixes.json, rules.json,
+tag_vocab.json, dictionaries/*.json, fst/az.hfst, fst/az.lexc and the GNN model) and, when
+their content changes, builds a new ResourceSnapshot in a background thread and swaps it in with
+a single reference assignment. Callers take current() once per request, so requests in flight
+finish on the snapshot they started with; old snapshots are never closed, only dropped.
+The first snapshot is built on first use; polling only runs once start() is called, which
+long-running entry points (the UIs, services) do and libraries and scripts do not.
+
+Compiled artifacts are cached by the content hash of their inputs, in memory and, for files
+(binary lexicons, full-form indexes, copies of the HFST binary and GNN weights), under cache/,
+so unchanged inputs are never rebuilt. A full-form index that is not built yet is built in a
+background thread while snapshots are served without it (by the HFST binary or the simulated
+analyzer); a snapshot with the index is published when it is done. prune() (run by the watcher) deletes cached files that no
+live snapshot uses and that no process has used for ARTIFACT_GRACE seconds; processes sharing
+cache/ keep the files they use fresh. The guesser of a snapshot is built from its own roots,
+affixes and rules; only its corpus layer is rebuilt, in the background, when the corpus store
+changes. The ML tagger (core.models) already
+reloads models/tag_predictor.pkl when it changes, and the guesser looks it up on every call.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from core.binary_lexicon import BinaryLexicon, compile_dictionary
+from core.fst_engine import FSTEngine
+from core.fullform_index import FULLFORM_INDEX_PATH, LEXC_PATH, FullFormIndex, build_fullform_index
+from core.generator import MorphGenerator, DEFAULT_MAX_DEPTH
+from core.guesser import build_guesser, build_lexicon_guesser
+from db.index import corpus_stamp
+from core.lexical_tagger import DICTIONARY_DIR, set_lexicons
+from core.morphotactics import AffixAutomaton
+from loaders.dictionary_loader import ROOTS_PATH, AFFIXES_PATH, RULES_PATH
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TAG_VOCAB_PATH = os.path.join(BASE_DIR, 'data', 'tag_vocab.json')
+FST_PATH = os.path.join(BASE_DIR, 'fst', 'az.hfst')
+GNN_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'gnn.pt')
+ARTIFACT_DIR = os.path.join(BASE_DIR, 'cache')
+DEFAULT_POLL_INTERVAL = 2.0
+# Seconds a cached file may go unused (by any process) before prune() deletes it
+ARTIFACT_GRACE = 3600.0
+
+
+def content_key(*parts: Optional[bytes]) -> str:
+    """
+    Hash of a sequence of file contents (None for a missing file).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if part is None:
+            h.update(b'\xff' * 8)
+        else:
+            h.update(len(part).to_bytes(8, 'little'))
+            h.update(part)
+    return h.hexdigest()
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def fullform_inputs_key(lexc_path: str = LEXC_PATH) -> str:
+    """
+    Content key of the full-form index inputs (roots, affixes, rules and the lexc lexicon), as
+    recorded in an index's meta by scripts/build_fullform_index.py.
+    """
+    return content_key(*(_read(path) for path in (ROOTS_PATH, AFFIXES_PATH, RULES_PATH, lexc_path)))
+
+
+class ResourceSnapshot:
+    """
+    One generation of analyzer resources. Treated as immutable once published.
+    """
+    def __init__(self, version: int, keys: Dict[str, str], fst_engine: FSTEngine, fullform_index=None,
+                 tag_vocab: Optional[Dict[str, int]] = None, gnn_disamb=None, lexicons: Optional[Dict[str, Any]] = None,
+                 morphology: Optional[Tuple[Dict, Dict, Dict]] = None, files: Iterable[str] = ()):
+        self.version = version
+        self.keys = keys  # component -> content key of its inputs
+        self.fst_engine = fst_engine
+        self.fullform_index = fullform_index
+        self.tag_vocab = tag_vocab
+        self.gnn_disamb = gnn_disamb
+        self.lexicons = lexicons or {}
+        self.morphology = morphology  # (roots, affixes, rules) the analyzer was built from
+        self.files: FrozenSet[str] = frozenset(files)  # cached artifact files in use
+        self._guesser = None
+        self._guesser_base = None
+        self._guesser_stamp = None
+        self._guesser_lock = threading.Lock()
+        self._guesser_refresh: Optional[threading.Thread] = None
+
+    def get_guesser(self):
+        """
+        Unknown-word guesser for this generation. Its dictionary and paradigm forms (from the
+        snapshot's lexicon and morphology) are indexed once, on first use; the corpus forms are a
+        layer over them, rebuilt in a background thread when the corpus store changes while the
+        previous guesser keeps answering.
+        """
+        stamp = corpus_stamp()
+        guesser = self._guesser
+        if guesser is None:
+            with self._guesser_lock:
+                if self._guesser is None:
+                    self._guesser = self._build_guesser()
+                    self._guesser_stamp = stamp
+                return self._guesser
+        if self._guesser_stamp != stamp:
+            with self._guesser_lock:
+                if self._guesser_stamp != stamp and self._guesser_refresh is None:
+                    self._guesser_refresh = threading.Thread(target=self._refresh_guesser, name='guesser-refresh',
+                                                             daemon=True)
+                    self._guesser_refresh.start()
+        return guesser
+
+    def wait_guesser(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a background rebuild of the guesser's corpus layer to finish.
+        """
+        thread = self._guesser_refresh
+        if thread is not None:
+            thread.join(timeout)
+
+    def _build_guesser(self):
+        generator = MorphGenerator(*self.morphology) if self.morphology is not None else None
+        if self._guesser_base is None:
+            self._guesser_base = build_lexicon_guesser(generator=generator, dictionary=self.lexicons.get('az'))
+        return build_guesser(generator=generator, base=self._guesser_base)
+
+    def _refresh_guesser(self) -> None:
+        # The stamp is taken before the corpus is read, so a change during the build triggers another one
+        stamp = corpus_stamp()
+        try:
+            guesser = self._build_guesser()
+            with self._guesser_lock:
+                self._guesser, self._guesser_stamp = guesser, stamp
+        except Exception as e:
+            # Retried only after the next change
+            logging.error(f"Failed to rebuild the guesser's corpus forms: {e}")
+            self._guesser_stamp = stamp
+        finally:
+            self._guesser_refresh = None
+
+
+class ResourceManager:
+    """
+    Watches analyzer inputs and publishes rebuilt ResourceSnapshots.
+    """
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL, artifact_dir: str = ARTIFACT_DIR,
+                 fullform: Optional[bool] = None, artifact_grace: float = ARTIFACT_GRACE):
+        self.poll_interval = poll_interval
+        self.artifact_dir = artifact_dir
+        self.artifact_grace = artifact_grace
+        # Maintain a full-form index only if one has been built (scripts/build_fullform_index.py)
+        self.fullform = os.path.exists(FULLFORM_INDEX_PATH) if fullform is None else fullform
+        self._fullform_params: Tuple[int, bool] = (DEFAULT_MAX_DEPTH, True)
+        self._fullform_builds: Dict[str, threading.Thread] = {}  # key -> background build
+        self._fullform_failed: set = set()
+        self._snapshot: Optional[ResourceSnapshot] = None
+        # (kind, key) -> (artifact, files under artifact_dir it uses)
+        self._artifacts: Dict[Tuple[str, str], Tuple[Any, Tuple[str, ...]]] = {}
+        self._written: List[str] = []
+        self._live: 'weakref.WeakSet[ResourceSnapshot]' = weakref.WeakSet()
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watched_files(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        """
+        Current (mtime_ns, size) of every input file, None for missing ones.
+        """
+        paths = [ROOTS_PATH, AFFIXES_PATH, RULES_PATH, TAG_VOCAB_PATH, FST_PATH, LEXC_PATH, GNN_MODEL_PATH]
+        paths += sorted(glob.glob(os.path.join(DICTIONARY_DIR, '*.json')))
+        stats = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stats[path] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                stats[path] = None
+        return stats
+
+    def current(self) -> ResourceSnapshot:
+        """
+        The published snapshot; built synchronously on first use.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.reload()
+            snapshot = self._snapshot
+        return snapshot
+
+    def check(self) -> bool:
+        """
+        Rebuild if any input changed since the last build. Returns True if a new snapshot was published.
+        """
+        if self._snapshot is not None and self.watched_files() == self._stats:
+            return False
+        return self.reload()
+
+    def reload(self) -> bool:
+        """
+        Build a snapshot from the current inputs and publish it if its content differs.
+        On failure the previous snapshot stays in place.
+        """
+        with self._build_lock:
+            # Stats are taken before reading, so a change during the build triggers another one.
+            # A failed build is retried only after the next change.
+            self._stats = self.watched_files()
+            try:
+                snapshot = self._build()
+            except Exception as e:
+                logging.error(f"Failed to rebuild analyzer resources, keeping version "
+                              f"{self._snapshot.version if self._snapshot else None}: {e}")
+                if self._snapshot is None:
+                    self._snapshot = ResourceSnapshot(0, {}, FSTEngine(fst_bin_path=None))
+                    self._live.add(self._snapshot)
+                return False
+            if self._snapshot is not None and snapshot.keys == self._snapshot.keys:
+                return False
+            set_lexicons(snapshot.lexicons)
+            self._snapshot = snapshot
+            self._live.add(snapshot)
+            logging.info(f"Published analyzer resources version {snapshot.version}")
+            return True
+
+    def start(self) -> None:
+        """
+        Start polling for changes in a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='resource-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        last_prune = 0.0
+        while not self._stop.wait(self.poll_interval):
+            try:
+                published = self.check()
+                if published or time.monotonic() - last_prune >= self.artifact_grace / 4:
+                    self.prune()
+                    last_prune = time.monotonic()
+            except Exception as e:
+                logging.error(f"Resource watcher error: {e}")
+
+    def prune(self) -> List[str]:
+        """
+        Refresh the modification time of the cached files used by live snapshots of this process,
+        then delete those no live snapshot uses and that were last written or used more than
+        artifact_grace seconds ago (so files other processes are using survive). Returns the
+        deleted paths.
+        """
+        live = set()
+        for snapshot in list(self._live):
+            live |= snapshot.files
+        for path in live:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        removed = []
+        try:
+            names = os.listdir(self.artifact_dir)
+        except FileNotFoundError:
+            return removed
+        cutoff = time.time() - self.artifact_grace
+        for name in names:
+            path = os.path.join(self.artifact_dir, name)
+            if path in live or name.endswith('.tmp') or not os.path.isfile(path):
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed.append(path)
+            except OSError as e:
+                logging.warning(f"Could not prune cached artifact {path}: {e}")
+        if removed:
+            logging.info(f"Pruned {len(removed)} unused cached artifacts from {self.artifact_dir}")
+        return removed
+
+    def _artifact(self, used: Dict, kind: str, key: str, build: Callable[[], Any]) -> Any:
+        entry = self._artifacts.get((kind, key))
+        if entry is None:
+            logging.info(f"Building {kind} artifact {key}")
+            self._written = []
+            value = build()
+            entry = (value, tuple(self._written))
+        used[(kind, key)] = entry
+        return entry[0]
+
+    def _cached_file(self, name: str, write: Callable[[str], Any]) -> str:
+        """
+        Path of a content-addressed file under the artifact directory, written on first use
+        (and marked as used, for prune(), when reused).
+        """
+        path = os.path.join(self.artifact_dir, name)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            self._write_file(path, write)
+        self._written.append(path)
+        return path
+
+    def _write_file(self, path: str, write: Callable[[str], Any]) -> None:
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _copy_file(self, name: str, data: bytes) -> str:
+        def write(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+        return self._cached_file(name, write)
+
+    def _build(self) -> ResourceSnapshot:
+        used: Dict[Tuple[str, str], Any] = {}
+        keys: Dict[str, str] = {}
+
+        # Roots, affixes and rules -> simulated analyzer (roots + compiled affix automaton)
+        sources = [_read(path) for path in (ROOTS_PATH, AFFIXES_PATH, RULES_PATH)]
+        keys['morphology'] = content_key(*sources)
+
+        def build_morphology():
+            roots, affixes, rules = (json.loads(data) if data is not None else {} for data in sources)
+            return roots, affixes, rules, AffixAutomaton(affixes, rules)
+        roots, affixes, rules, automaton = self._artifact(used, 'morphology', keys['morphology'], build_morphology)
+
+        # HFST binary, used through a content-addressed copy so in-flight lookups keep their version
+        fst_bin = None
+        fst_data = _read(FST_PATH)
+        if fst_data is not None:
+            keys['hfst'] = content_key(fst_data)
+            fst_bin = self._artifact(used, 'hfst', keys['hfst'],
+                                     lambda: self._copy_file(f"az-{keys['hfst']}.hfst", fst_data))
+
+        fullform_index = None
+        if self.fullform:
+            lexc = _read(LEXC_PATH)
+            key = content_key(*sources, lexc)
+            fullform_index = self._fullform(used, key, roots, affixes, rules, lexc)
+            # A snapshot without its index differs from the one published when the index is ready
+            keys['fullform'] = key if fullform_index is not None else f"pending-{key}"
+
+        fst_engine = FSTEngine(fst_bin_path=fst_bin, fullform_index=fullform_index, roots=roots, automaton=automaton)
+
+        # Tag vocabulary and GNN disambiguator
+        tag_vocab, gnn_disamb = None, None
+        vocab_data = _read(TAG_VOCAB_PATH)
+        if vocab_data is not None:
+            tag_vocab = json.loads(vocab_data)
+            gnn_data = _read(GNN_MODEL_PATH)
+            keys['gnn'] = content_key(vocab_data, gnn_data)
+
+            def build_gnn():
+                from core.gnn_disambiguator import GNNDisambiguator
+                model_path = self._copy_file(f"gnn-{content_key(gnn_data)}.pt", gnn_data) if gnn_data else None
+                return GNNDisambiguator(tag_vocab, model_path)
+            gnn_disamb = self._artifact(used, 'gnn', keys['gnn'], build_gnn)
+
+        # Lexical dictionaries -> memory-mapped binary lexicons
+        lexicons = {}
+        for path in sorted(glob.glob(os.path.join(DICTIONARY_DIR, '*.json'))):
+            lang = os.path.splitext(os.path.basename(path))[0]
+            data = _read(path)
+            if data is None:
+                continue
+            keys[f"lexicon:{lang}"] = key = content_key(data)
+            lexicons[lang] = self._artifact(used, 'lexicon', f"{lang}-{key}",
+                                            lambda: self._build_lexicon(lang, key, data))
+
+        self._artifacts = used
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        files = [path for _, paths in used.values() for path in paths]
+        return ResourceSnapshot(version, keys, fst_engine, fullform_index, tag_vocab, gnn_disamb, lexicons,
+                                morphology=(roots, affixes, rules), files=files)
+
+    def _build_lexicon(self, lang: str, key: str, data: bytes) -> BinaryLexicon:
+        def write(out_path):
+            # Compile from the bytes that were hashed, not from the (possibly changed) file
+            with tempfile.TemporaryDirectory(dir=self.artifact_dir) as src_dir:
+                with open(os.path.join(src_dir, f"{lang}.json"), 'wb') as f:
+                    f.write(data)
+                compile_dictionary(lang, src_dir, out_path)
+        return BinaryLexicon(self._cached_file(f"lexicon-{lang}-{key}.bin", write))
+
+    def _fullform(self, used: Dict, key: str, roots: Dict, affixes: Dict, rules: Dict,
+                  lexc: Optional[bytes]) -> Optional[FullFormIndex]:
+        """
+        The full-form index for the current inputs if it is available: already open, the built
+        data/fullform.idx if it matches them, or a cached build. Otherwise it is built in the
+        background and None is returned meanwhile.
+        """
+        entry = self._artifacts.get(('fullform', key))
+        if entry is None:
+            self._written = []
+            index = self._open_fullform(key)
+            if index is None:
+                self._build_fullform_async(key, roots, affixes, rules, lexc)
+                return None
+            entry = (index, tuple(self._written))
+        used[('fullform', key)] = entry
+        return entry[0]
+
+    def _open_fullform(self, key: str) -> Optional[FullFormIndex]:
+        if self._snapshot is None and os.path.exists(FULLFORM_INDEX_PATH):
+            # At startup the built index is used if it was built from the current inputs; either
+            # way its settings are used for the indexes built here
+            index = FullFormIndex(FULLFORM_INDEX_PATH)
+            self._fullform_params = (index.meta.get('max_depth', DEFAULT_MAX_DEPTH),
+                                     'lexc' in index.meta.get('sources', ['lexc']))
+            if index.meta.get('input_key') == key:
+                return index
+            logging.warning(f"Full-form index {FULLFORM_INDEX_PATH} does not match the current "
+                            f"inputs; serving analyses without it until an up-to-date one is built")
+            index.close()
+        name = f"fullform-{key}.idx"
+        if os.path.exists(os.path.join(self.artifact_dir, name)):
+            return FullFormIndex(self._cached_file(name, None))
+        return None
+
+    def _build_fullform_async(self, key: str, roots: Dict, affixes: Dict, rules: Dict,
+                              lexc: Optional[bytes]) -> None:
+        """
+        Build the full-form index for key under the artifact directory in a daemon thread, then
+        reload so a snapshot using it is published. A failed build is not retried.
+        """
+        if key in self._fullform_builds or key in self._fullform_failed:
+            return
+        max_depth, include_lexc = self._fullform_params
+
+        def write(out_path):
+            with tempfile.TemporaryDirectory(dir=self.artifact_dir) as src_dir:
+                lexc_path = os.path.join(src_dir, 'az.lexc')
+                if lexc is not None:
+                    with open(lexc_path, 'wb') as f:
+                        f.write(lexc)
+                generator = MorphGenerator(roots, affixes, rules, max_depth=max_depth)
+                build_fullform_index(out_path, max_depth, include_lexc, lexc_path, generator)
+
+        def run():
+            logging.info(f"Building fullform artifact {key} in the background")
+            try:
+                self._write_file(os.path.join(self.artifact_dir, f"fullform-{key}.idx"), write)
+                self.reload()
+            except Exception as e:
+                logging.error(f"Failed to build full-form index {key}: {e}")
+                self._fullform_failed.add(key)
+            finally:
+                self._fullform_builds.pop(key, None)
+
+        thread = threading.Thread(target=run, name='fullform-build', daemon=True)
+        self._fullform_builds[key] = thread
+        thread.start()
+
+    def wait_fullform(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for background full-form index builds (and the reloads publishing them) to finish.
+        """
+        for thread in list(self._fullform_builds.values()):
+            thread.join(timeout)
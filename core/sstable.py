@@ -0,0 +1,124 @@
+"""
+core/sstable.py
+
+Sorted string table: an immutable on-disk bytes -> bytes map that is memory-mapped for lookups.
+Opening a table only parses a small header, and every process that maps the same file shares
+its pages through the OS page cache.
+
+Layout (little-endian):
+    header        magic, version, entry count, meta length
+    meta          free-form bytes (e.g. JSON describing how the table was built)
+    key offsets   (count + 1) x uint32, relative to the key blob
+    value offsets (count + 1) x uint32, relative to the value blob
+    key blob      concatenated keys, sorted bytewise
+    value blob    concatenated values in key order
+"""
+import logging
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional, Tuple
+
+MAGIC = b'MSST'
+VERSION = 1
+_HEADER = struct.Struct('<4sHII')
+_OFFSET = struct.Struct('<I')
+_MAX_OFFSET = 0xFFFFFFFF
+
+
+def write_sstable(path: str, items: Iterable[Tuple[bytes, bytes]], meta: bytes = b'') -> int:
+    """
+    Write (key, value) pairs to path as a sorted string table. Keys must be unique.
+    The file is written next to its destination and renamed into place, so readers that
+    already mapped the old file keep a consistent view. Returns the number of entries.
+    """
+    items = sorted(items)
+    key_offsets, value_offsets = [0], [0]
+    for key, value in items:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+    if key_offsets[-1] > _MAX_OFFSET or value_offsets[-1] > _MAX_OFFSET:
+        raise ValueError(f"Sorted string table too large for 32-bit offsets: {path}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(items), len(meta)))
+            f.write(meta)
+            f.write(struct.pack(f'<{len(key_offsets)}I', *key_offsets))
+            f.write(struct.pack(f'<{len(value_offsets)}I', *value_offsets))
+            f.writelines(key for key, _ in items)
+            f.writelines(value for _, value in items)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logging.info(f"Wrote sorted string table with {len(items)} entries to {path}")
+    return len(items)
+
+
+class SSTable:
+    """
+    Read-only, memory-mapped view of a sorted string table. Lookups are binary searches
+    over the mapped key table and never load the whole file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a sorted string table (v{VERSION}): {path}")
+        self._count = count
+        start = _HEADER.size
+        self.meta = bytes(self._mm[start:start + meta_len])
+        self._key_offsets = start + meta_len
+        self._value_offsets = self._key_offsets + (count + 1) * _OFFSET.size
+        self._keys = self._value_offsets + (count + 1) * _OFFSET.size
+        self._values = self._keys + _OFFSET.unpack_from(self._mm, self._value_offsets - _OFFSET.size)[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key(self, i: int) -> bytes:
+        start, end = struct.unpack_from('<2I', self._mm, self._key_offsets + i * _OFFSET.size)
+        return self._mm[self._keys + start:self._keys + end]
+
+    def _value(self, i: int) -> bytes:
+        start, end = struct.unpack_from('<2I', self._mm, self._value_offsets + i * _OFFSET.size)
+        return self._mm[self._values + start:self._values + end]
+
+    def _find(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        """
+        Return the value stored for key, or default.
+        """
+        i = self._find(key)
+        if i < self._count and self._key(i) == key:
+            return self._value(i)
+        return default
+
+    def __contains__(self, key: bytes) -> bool:
+        i = self._find(key)
+        return i < self._count and self._key(i) == key
+
+    def items(self) -> Iterator[Tuple[bytes, bytes]]:
+        """
+        Iterate over all (key, value) pairs in key order.
+        """
+        for i in range(self._count):
+            yield self._key(i), self._value(i)
+
+    def close(self) -> None:
+        self._mm.close()
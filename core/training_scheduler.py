@@ -0,0 +1,351 @@
+"""
+core/training_scheduler.py
+
+Background retraining of the tag predictor (core.models).
+A scheduler process watches the corpus and retrains after a number of new entries or a time
+interval. Training warm-starts from the published model: a hashed character n-gram
+SGDClassifier is updated with partial_fit on the new entries only; when they bring tag
+sequences the model has never seen, its weights are carried over to an enlarged class set and it
+is trained on the new entries plus a bounded replay sample of older ones. Models of another kind
+(e.g. from train_tag_predictor) are replaced by a model trained from scratch.
+
+Every candidate is scored on a frozen dev set (sentences held out from training once the corpus
+is large enough for one) and published atomically to MODEL_PATH only if it is no worse than the
+current model; nothing is published before a dev set exists.
+Progress and results are written to a status file that the UI can read at any time.
+"""
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+import core.models as models
+import db.corpus
+from db.index import entry_tokens
+
+STATUS_PATH = "models/training_status.json"
+DEV_PATH = "models/tag_dev.json"
+N_FEATURES = 2 ** 15
+DEFAULT_MIN_NEW_ENTRIES = 200
+DEFAULT_INTERVAL_MINUTES = 30.0
+DEFAULT_REPLAY_SIZE = 5000
+DEFAULT_EPOCHS = 5
+DEV_FRACTION = 0.1
+DEV_MAX_SENTENCES = 500
+# No dev set is frozen (and no model published by retrain) until the corpus yields this many
+DEV_MIN_SENTENCES = 3
+
+
+def build_incremental_pipeline() -> Pipeline:
+    """
+    Tag predictor that supports partial_fit: stateless hashed char n-grams + logistic SGD.
+    """
+    return Pipeline([
+        ("vect", HashingVectorizer(analyzer="char", ngram_range=(2, 4), n_features=N_FEATURES, alternate_sign=False)),
+        ("clf", SGDClassifier(loss="log_loss", random_state=0))
+    ])
+
+
+def is_incremental(model: Any) -> bool:
+    return (isinstance(model, Pipeline) and isinstance(model.named_steps.get("vect"), HashingVectorizer)
+            and hasattr(model.named_steps.get("clf"), "partial_fit"))
+
+
+def sentence_examples(entries: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """
+    (words, tag sequences) of the tagged tokens of entries, as in core.models.prepare_dataset.
+    """
+    X, y = [], []
+    for entry in entries:
+        for token in entry_tokens(entry):
+            tags = token.get("tags", [])
+            if tags:
+                X.append(token.get("word"))
+                y.append("+".join(tags))
+    return X, y
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_status(path: str = STATUS_PATH) -> Dict[str, Any]:
+    """
+    Last status written by the scheduler; {} if it has never run.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.error(f"Failed to read training status from {path}: {e}")
+        return {}
+
+
+def _usable_dev_set(dev: Dict[str, Any]) -> bool:
+    return len(dev.get("indices", [])) >= DEV_MIN_SENTENCES and bool(dev.get("X"))
+
+
+def load_dev_set(corpus: List[Dict[str, Any]], path: str = DEV_PATH) -> Dict[str, Any]:
+    """
+    The frozen dev set: held-out sentence indices and their examples. Drawn from the corpus on
+    first use and never changed afterwards. While the corpus is too small for DEV_MIN_SENTENCES
+    sentences with tagged tokens, an empty dev set is returned and nothing is frozen (a smaller
+    one frozen by an earlier version is drawn again).
+    """
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            dev = json.load(f)
+        if _usable_dev_set(dev):
+            return dev
+        logging.warning(f"Ignoring dev set {path} with {len(dev.get('indices', []))} sentences")
+    size = min(int(len(corpus) * DEV_FRACTION), DEV_MAX_SENTENCES)
+    indices = sorted(random.Random(0).sample(range(len(corpus)), size)) if size else []
+    X, y = sentence_examples([corpus[i] for i in indices])
+    dev = {"indices": indices, "X": X, "y": y}
+    if not _usable_dev_set(dev):
+        logging.info(f"Corpus of {len(corpus)} sentences is too small for a dev set; not freezing one yet")
+        return {"indices": [], "X": [], "y": []}
+    _write_json(path, dev)
+    logging.info(f"Froze dev set: {len(indices)} sentences, {len(X)} tokens -> {path}")
+    return dev
+
+
+def evaluate(model: Any, X: List[str], y: List[str]) -> Optional[float]:
+    """
+    Token accuracy of model on (X, y); None without a model or data.
+    """
+    if model is None or not X:
+        return None
+    try:
+        return float(np.mean(model.predict(X) == np.array(y)))
+    except Exception as e:
+        logging.error(f"Failed to evaluate tag predictor: {e}")
+        return None
+
+
+def _expand_classes(clf: SGDClassifier, classes: np.ndarray, X, y: List[str]) -> SGDClassifier:
+    """
+    New classifier over classes that starts from clf's weights (zeros for new classes).
+    """
+    expanded = SGDClassifier(**clf.get_params())
+    expanded.partial_fit(X[:1], y[:1], classes=classes)
+    old = {c: i for i, c in enumerate(clf.classes_)}
+    coef, intercept = clf.coef_, clf.intercept_
+    if len(clf.classes_) == 2:
+        # Binary models keep one weight row (for the second class); split it into one-vs-rest rows
+        coef, intercept = np.vstack([-coef, coef]), np.concatenate([-intercept, intercept])
+    new_coef = np.zeros((len(classes), coef.shape[1]))
+    new_intercept = np.zeros(len(classes))
+    for j, c in enumerate(classes):
+        if c in old:
+            new_coef[j], new_intercept[j] = coef[old[c]], intercept[old[c]]
+    expanded.coef_, expanded.intercept_ = new_coef, new_intercept
+    expanded.t_ = clf.t_
+    return expanded
+
+
+def _fit_epochs(clf: SGDClassifier, X, y: np.ndarray, epochs: int, seed: int, classes=None, report=None) -> None:
+    rng = np.random.RandomState(seed)
+    for epoch in range(epochs):
+        order = rng.permutation(X.shape[0])
+        # classes must be given on the first partial_fit of a fresh classifier
+        clf.partial_fit(X[order], y[order], classes=classes if epoch == 0 else None)
+        if report:
+            report(epoch + 1, epochs)
+
+
+def retrain(corpus: List[Dict[str, Any]], trained_entries: int, dev: Dict[str, Any],
+            replay_size: int = DEFAULT_REPLAY_SIZE, epochs: int = DEFAULT_EPOCHS, report=None) -> Dict[str, Any]:
+    """
+    Train a candidate from the published model on corpus[trained_entries:], evaluate it against the
+    published model on the dev set and publish it if it is no worse. Returns a result dict.
+    """
+    held_out = set(dev["indices"])
+    previous = models.load_tag_predictor()
+    start = trained_entries if is_incremental(previous) else 0
+    new_X, new_y = sentence_examples([e for i, e in enumerate(corpus[start:], start) if i not in held_out])
+    result = {"new_examples": len(new_X), "trained_entries": len(corpus), "published": False}
+    if not dev["X"]:
+        # Nothing to score a candidate on: publish nothing and train on these entries later
+        result.update(mode="none", trained_entries=trained_entries,
+                      message="No dev set yet (corpus too small); not publishing.")
+        return result
+    if not new_X:
+        result.update(mode="none", message="No new tagged tokens.")
+        return result
+
+    classes = None
+    if start == 0:
+        mode, model = "full", build_incremental_pipeline()
+        clf = model.named_steps["clf"]
+        X, y = model.named_steps["vect"].transform(new_X), np.array(new_y)
+        classes = np.unique(y)
+        if len(classes) < 2:
+            result.update(mode="none", trained_entries=trained_entries, message="Need at least two tag sequences.")
+            return result
+    else:
+        model = copy.deepcopy(previous)
+        clf = model.named_steps["clf"]
+        vect = model.named_steps["vect"]
+        unseen = sorted(set(new_y) - set(clf.classes_))
+        if not unseen:
+            mode, X, y = "delta", vect.transform(new_X), np.array(new_y)
+        else:
+            # New tag sequences: enlarge the class set and mix in a bounded replay sample
+            mode = "replay"
+            old_X, old_y = sentence_examples([e for i, e in enumerate(corpus[:start]) if i not in held_out])
+            rng = random.Random(len(corpus))
+            sample = rng.sample(range(len(old_X)), min(replay_size, len(old_X)))
+            X = vect.transform(new_X + [old_X[i] for i in sample])
+            y = np.array(new_y + [old_y[i] for i in sample])
+            clf = _expand_classes(clf, np.union1d(clf.classes_, unseen), X, y)
+            model.steps[-1] = ("clf", clf)
+            result["new_classes"] = len(unseen)
+    _fit_epochs(clf, X, y, epochs, seed=len(corpus), classes=classes, report=report)
+
+    new_acc = evaluate(model, dev["X"], dev["y"])
+    old_acc = evaluate(previous, dev["X"], dev["y"])
+    result.update(mode=mode, dev_accuracy=new_acc, previous_accuracy=old_acc)
+    if old_acc is not None and (new_acc is None or new_acc < old_acc):
+        result["message"] = f"Rejected: dev accuracy {new_acc} < {old_acc}."
+        # The new entries were used; the next run trains from the still-published model again
+        result["trained_entries"] = trained_entries if is_incremental(previous) else 0
+        return result
+    publish(model)
+    result["published"] = True
+    result["message"] = f"Published ({mode}): dev accuracy {new_acc}."
+    return result
+
+
+def publish(model: Pipeline, path: Optional[str] = None) -> None:
+    """
+    Atomically replace the published tag predictor.
+    """
+    path = path or models.MODEL_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, path)
+    logging.info(f"Published tag predictor to {path}")
+
+
+def run_scheduler(min_new_entries: int = DEFAULT_MIN_NEW_ENTRIES, interval_minutes: float = DEFAULT_INTERVAL_MINUTES,
+                  replay_size: int = DEFAULT_REPLAY_SIZE, epochs: int = DEFAULT_EPOCHS, poll_seconds: float = 10.0,
+                  status_path: str = STATUS_PATH, stop_event=None, trigger_event=None) -> None:
+    """
+    Scheduler loop (run in its own process by TrainingScheduler, or in the foreground).
+    Retrains when min_new_entries entries were added since the last attempt, when interval_minutes
+    passed with at least one new entry, or when trigger_event is set.
+    """
+    status = read_status(status_path)
+    status.update(state="idle", pid=os.getpid(), progress=None)
+    status.setdefault("trained_entries", 0)
+    status.setdefault("attempted_entries", status["trained_entries"])
+    status.setdefault("history", [])
+
+    def save(**changes):
+        status.update(changes, updated=time.time())
+        _write_json(status_path, status)
+
+    save()
+    last_run = time.time()
+    corpus_mtime, corpus_size = None, 0
+    while not (stop_event is not None and stop_event.is_set()):
+        triggered = False
+        if trigger_event is not None:
+            triggered = trigger_event.wait(poll_seconds)
+            trigger_event.clear()
+        elif stop_event is not None:
+            stop_event.wait(poll_seconds)
+        else:
+            time.sleep(poll_seconds)
+        try:
+            mtime = os.path.getmtime(db.corpus.CORPUS_PATH) if os.path.exists(db.corpus.CORPUS_PATH) else None
+            if mtime != corpus_mtime:
+                corpus_mtime, corpus_size = mtime, len(db.corpus.load_corpus())
+            new_entries = corpus_size - status["trained_entries"]
+            # Thresholds count from the last attempt, so a rejected model is not retried every poll
+            since_attempt = corpus_size - status["attempted_entries"]
+            due = (triggered or since_attempt >= min_new_entries
+                   or (since_attempt > 0 and time.time() - last_run >= interval_minutes * 60))
+            save(new_entries=new_entries)
+            if not due:
+                continue
+            last_run = time.time()
+            save(state="training", progress=0.0, message=f"Training on {new_entries} new entries...")
+            corpus = db.corpus.load_corpus()
+            dev = load_dev_set(corpus)
+            result = retrain(corpus, status["trained_entries"], dev, replay_size, epochs,
+                             report=lambda done, total: save(progress=done / total))
+            result["finished"] = time.time()
+            save(state="idle", progress=None, message=result["message"], trained_entries=result["trained_entries"],
+                 attempted_entries=len(corpus), last_result=result, history=(status["history"] + [result])[-20:])
+            logging.info(f"Scheduled retraining: {result['message']}")
+        except Exception as e:
+            logging.error(f"Scheduled retraining failed: {e}")
+            save(state="error", progress=None, message=str(e))
+
+
+class TrainingScheduler:
+    """
+    Runs run_scheduler in a separate process; status() reads the status file without blocking.
+    """
+    def __init__(self, status_path: str = STATUS_PATH, **options):
+        self.status_path = status_path
+        self.options = options
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._trigger = self._ctx.Event()
+        self._process = None
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._process = self._ctx.Process(
+            target=run_scheduler, name="tag-trainer", daemon=True,
+            kwargs=dict(self.options, status_path=self.status_path, stop_event=self._stop, trigger_event=self._trigger)
+        )
+        self._process.start()
+        logging.info(f"Started training scheduler (pid {self._process.pid})")
+
+    def trigger(self) -> None:
+        """
+        Retrain at the next poll, regardless of the thresholds.
+        """
+        self._trigger.set()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        if self._process is None:
+            return
+        self._stop.set()
+        self._trigger.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        status = read_status(self.status_path)
+        status["running"] = self.is_running()
+        return status
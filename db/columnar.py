@@ -0,0 +1,121 @@
+"""
+db/columnar.py
+
+Columnar token snapshot of the annotated corpus.
+Tokens are stored as dictionary-encoded NumPy arrays, one .npy file per column, so snapshots
+can be memory-mapped and analysed with vectorized operations instead of walking nested dicts:
+    sent_offsets  (n_sentences + 1)  first token id of each sentence
+    word_ids, lemma_ids, upos_ids, tagseq_ids  (n_tokens)  ids into the vocabularies
+    tag_offsets   (n_tokens + 1), tag_ids  flattened per-token tag lists
+Vocabularies (words, lemmas, tags, tagseqs) and sentence texts are stored in vocab.json.
+"""
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from db.index import entry_tokens
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'corpus', 'columns')
+COLUMNS = ('sent_offsets', 'word_ids', 'lemma_ids', 'upos_ids', 'tagseq_ids', 'tag_offsets', 'tag_ids')
+VOCABS = ('words', 'lemmas', 'tags', 'tagseqs')
+
+
+class ColumnarSnapshot:
+    """
+    In-memory (or memory-mapped) columnar view of a corpus.
+    """
+    def __init__(self, columns: Dict[str, np.ndarray], vocab: Dict[str, List[str]], texts: List[str]):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        for name in VOCABS:
+            setattr(self, name, vocab[name])
+        self.texts = texts
+
+    @property
+    def num_sentences(self) -> int:
+        return len(self.sent_offsets) - 1
+
+    @property
+    def num_tokens(self) -> int:
+        return len(self.word_ids)
+
+    def sentence_ids(self) -> np.ndarray:
+        """
+        Sentence index of every token.
+        """
+        return np.repeat(np.arange(self.num_sentences), np.diff(self.sent_offsets))
+
+    def decode(self, vocab: str, ids: np.ndarray) -> np.ndarray:
+        """
+        Map ids back to strings (as an object array) using one of the vocabularies.
+        """
+        return np.array(getattr(self, vocab), dtype=object)[ids]
+
+
+def build_snapshot(corpus: Iterable[Dict[str, Any]]) -> ColumnarSnapshot:
+    """
+    Dictionary-encode a corpus (db.corpus format) into columns.
+    """
+    vocab = {name: [] for name in VOCABS}
+    ids = {name: {} for name in VOCABS}
+
+    def intern(name: str, value: str) -> int:
+        i = ids[name].get(value)
+        if i is None:
+            i = ids[name][value] = len(vocab[name])
+            vocab[name].append(value)
+        return i
+
+    cols = {name: [] for name in COLUMNS}
+    cols['sent_offsets'].append(0)
+    cols['tag_offsets'].append(0)
+    texts = []
+    for entry in corpus:
+        tokens = entry_tokens(entry)
+        texts.append(entry.get('text', ' '.join(t.get('word', '') for t in tokens)))
+        for tok in tokens:
+            word = tok.get('word', '')
+            tags = tok.get('tags') or []
+            cols['word_ids'].append(intern('words', word))
+            cols['lemma_ids'].append(intern('lemmas', tok.get('lemma') or word.lower()))
+            cols['upos_ids'].append(intern('tags', tags[0] if tags else 'X'))
+            cols['tagseq_ids'].append(intern('tagseqs', '+'.join(tags)))
+            cols['tag_ids'].extend(intern('tags', t) for t in tags)
+            cols['tag_offsets'].append(len(cols['tag_ids']))
+        cols['sent_offsets'].append(len(cols['word_ids']))
+    columns = {name: np.array(values, dtype=np.uint32) for name, values in cols.items()}
+    snapshot = ColumnarSnapshot(columns, vocab, texts)
+    logging.info(f"Built columnar snapshot: {snapshot.num_sentences} sentences, {snapshot.num_tokens} tokens")
+    return snapshot
+
+
+def write_snapshot(snapshot: ColumnarSnapshot, path: str = SNAPSHOT_DIR) -> str:
+    """
+    Write a snapshot as one .npy file per column plus vocab.json. Returns the directory.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name in COLUMNS:
+        np.save(os.path.join(path, f"{name}.npy"), getattr(snapshot, name))
+    vocab = {name: getattr(snapshot, name) for name in VOCABS}
+    vocab['texts'] = snapshot.texts
+    with open(os.path.join(path, 'vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    logging.info(f"Wrote columnar snapshot to {path}")
+    return path
+
+
+def load_snapshot(path: str = SNAPSHOT_DIR, mmap: bool = True) -> ColumnarSnapshot:
+    """
+    Load a snapshot written by write_snapshot; columns are memory-mapped by default.
+    """
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+               for name in COLUMNS}
+    with open(os.path.join(path, 'vocab.json'), encoding='utf-8') as f:
+        vocab = json.load(f)
+    snapshot = ColumnarSnapshot(columns, vocab, vocab.get('texts', []))
+    logging.info(f"Loaded columnar snapshot from {path}: {snapshot.num_tokens} tokens")
+    return snapshot
@@ -1,11 +1,15 @@
 # db/corpus.py
 """
 Corpus database storage and retrieval.
+Writers (add_entry, add_entries, save_corpus) hold a file lock on the corpus file, so saves from
+threads and processes (annotator tabs, the annotation queue, bulk imports) never lose each
+other's entries.
 """
 
 import os
 import json
-from typing import List, Dict, Any
+import tempfile
+from typing import List, Dict, Any, Optional
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 CORPUS_DIR = os.path.join(BASE_DIR, 'corpus')
@@ -13,6 +17,10 @@ CORPUS_PATH = os.path.join(CORPUS_DIR, 'corpus.json')
 
 import logging
 
+from core.analysis import json_default
+from db.index import corpus_stamp, update_index
+from db.locking import file_lock
+
 def load_corpus() -> List[Dict[str, Any]]:
     """
     Load the entire annotated corpus from disk.
@@ -32,25 +40,71 @@ def load_corpus() -> List[Dict[str, Any]]:
 
 def save_corpus(corpus: List[Dict[str, Any]]) -> None:
     """
-    Save the annotated corpus to disk. Logs success or errors.
+    Save the annotated corpus to disk. Logs success; logs and re-raises errors, in which case
+    the file on disk is unchanged.
     """
+    with file_lock(CORPUS_PATH):
+        _save_corpus(corpus)
+
+def _save_corpus(corpus: List[Dict[str, Any]]) -> None:
+    tmp_path = None
     try:
-        os.makedirs(os.path.dirname(CORPUS_PATH), exist_ok=True)
-        with open(CORPUS_PATH, 'w', encoding='utf-8') as f:
-            json.dump(corpus, f, ensure_ascii=False, indent=2)
+        corpus_dir = os.path.dirname(CORPUS_PATH)
+        os.makedirs(corpus_dir, exist_ok=True)
+        # Write to a temporary file of our own and swap it in, so an interrupted save never
+        # truncates the corpus and concurrent writers never share a temporary file
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=corpus_dir, prefix='.corpus-',
+                                         suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            json.dump(corpus, f, ensure_ascii=False, indent=2, default=json_default)
+        # Temporary files are private (0600); keep the corpus file's permissions
+        os.chmod(tmp_path, os.stat(CORPUS_PATH).st_mode & 0o777 if os.path.exists(CORPUS_PATH) else 0o644)
+        os.replace(tmp_path, CORPUS_PATH)
         logging.info(f"Saved corpus with {len(corpus)} entries to {CORPUS_PATH}")
     except Exception as e:
         logging.error(f"Failed to save corpus: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 def add_entry(text: str, tokens: List[Dict[str, Any]]) -> None:
     """
     Add a new annotated sentence to the corpus. Logs the operation.
+    Raises if the corpus cannot be saved.
     """
-    corpus = load_corpus()
-    corpus.append({'text': text, 'tokens': tokens})
-    save_corpus(corpus)
+    add_entries([{'text': text, 'tokens': tokens}])
     logging.info(f"Added entry: '{text[:40]}...' with {len(tokens)} tokens.")
 
+def add_entries(entries: List[Dict[str, Any]], corpus: Optional[List[Dict[str, Any]]] = None) -> None:
+    """
+    Append a batch of entries ({'text', 'tokens'}) with a single save and index update.
+    Bulk loaders pass the already loaded corpus list, which is extended in place.
+    Such callers hold corpus_lock() while they use the list, so that no other writer saves in between.
+    If the save fails, corpus is left as it was, the index is not touched and the error is raised.
+    """
+    with file_lock(CORPUS_PATH):
+        if corpus is None:
+            corpus = load_corpus()
+        previous_stamp = corpus_stamp()
+        corpus.extend(entries)
+        try:
+            save_corpus(corpus)
+        except Exception:
+            del corpus[len(corpus) - len(entries):]
+            raise
+        logging.info(f"Added {len(entries)} entries (corpus now has {len(corpus)}).")
+        try:
+            update_index(entries, corpus, previous_stamp)
+        except Exception as e:
+            logging.error(f"Failed to update corpus index: {e}")
+
+def corpus_lock():
+    """
+    Exclusive lock on the corpus store across threads and processes (re-entrant), for callers
+    that load the corpus and write it back later.
+    """
+    return file_lock(CORPUS_PATH)
+
 def get_corpus() -> List[Dict[str, Any]]:
     """
     Retrieve the annotated corpus. (Alias for load_corpus)
@@ -0,0 +1,195 @@
+"""
+db/importers.py
+
+Streaming bulk importers for the formats written by export/exporter.py (CoNLL-U, JSONL, CSV).
+Input is parsed lazily and committed to the corpus store in large batches: the corpus is loaded
+once, each batch is one save (and one incremental index update), and sentences whose text is
+already in the corpus are skipped. Tags are validated against data/tag_vocab.json, and a token's
+first tag (its UPOS) also against the Universal Dependencies UPOS set. If a batch cannot be
+saved, the import stops there and the report says how far it got. Other corpus writers wait
+until an import has finished.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from db.corpus import load_corpus, add_entries, corpus_lock
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TAG_VOCAB_PATH = os.path.join(BASE_DIR, 'data', 'tag_vocab.json')
+DEFAULT_BATCH_SIZE = 5000
+
+# Universal Dependencies part-of-speech tags (the UPOS column of CoNLL-U)
+UD_UPOS = frozenset({
+    'ADJ', 'ADP', 'ADV', 'AUX', 'CCONJ', 'DET', 'INTJ', 'NOUN', 'NUM', 'PART', 'PRON', 'PROPN',
+    'PUNCT', 'SCONJ', 'SYM', 'VERB', 'X'
+})
+
+
+def iter_conllu(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse CoNLL-U sentences as corpus entries. Tags are [UPOS] + FEATS split on '|';
+    'X' with no features is read as an untagged token, as written by the exporter.
+    Multiword-token ranges and empty nodes are skipped.
+    """
+    text, tokens = None, []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                if tokens:
+                    yield {'text': text if text is not None else ' '.join(t['word'] for t in tokens), 'tokens': tokens}
+                text, tokens = None, []
+            elif line.startswith('#'):
+                if line.startswith('# text = '):
+                    text = line[len('# text = '):]
+            else:
+                cols = line.split('\t')
+                if len(cols) < 6 or '-' in cols[0] or '.' in cols[0]:
+                    continue
+                upos, feats = cols[3], cols[5]
+                tags = [] if upos == 'X' and feats == '_' else [upos] + ([] if feats == '_' else feats.split('|'))
+                tokens.append({'word': cols[1], 'lemma': cols[2], 'tags': tags})
+    if tokens:
+        yield {'text': text if text is not None else ' '.join(t['word'] for t in tokens), 'tokens': tokens}
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse one corpus entry per JSON line.
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse the exporter's CSV (sentence, token, lemma, upos, features); consecutive rows with
+    the same sentence form one entry.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for text, rows in itertools.groupby(reader, key=lambda row: row['sentence']):
+            tokens = []
+            for row in rows:
+                upos, feats = row['upos'], row['features']
+                tags = [] if upos == 'X' and feats == '_' else [upos] + ([] if feats == '_' else feats.split('|'))
+                tokens.append({'word': row['token'], 'lemma': row['lemma'], 'tags': tags})
+            yield {'text': text, 'tokens': tokens}
+
+
+PARSERS = {'conllu': iter_conllu, 'jsonl': iter_jsonl, 'csv': iter_csv}
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext not in PARSERS:
+        raise ValueError(f"Cannot infer import format from '{path}'; use one of {sorted(PARSERS)}")
+    return ext
+
+
+def text_hash(text: str) -> bytes:
+    """
+    Hash used to deduplicate sentences by text (whitespace-normalized).
+    """
+    return hashlib.blake2b(' '.join(text.split()).encode('utf-8'), digest_size=16).digest()
+
+
+def load_tag_vocab(path: str = TAG_VOCAB_PATH) -> Set[str]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return set(json.load(f))
+    except Exception as e:
+        logging.error(f"Failed to load tag vocab from {path}: {e}")
+        return set()
+
+
+def unknown_tags(entry: Dict[str, Any], vocab: Set[str], allow_features: bool = True) -> Set[str]:
+    """
+    Tags of an entry missing from the vocabulary. A token's first tag may also be any UD UPOS
+    tag. With allow_features, 'Name=Value' feature tags (UD FEATS, lexical tagger output) are
+    accepted.
+    """
+    return {
+        tag for tok in entry.get('tokens', []) for i, tag in enumerate(tok.get('tags', []))
+        if tag not in vocab and not (i == 0 and tag in UD_UPOS) and not (allow_features and '=' in tag)
+    }
+
+
+def import_corpus(path: str, fmt: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                  strict: bool = False, allow_features: bool = True,
+                  progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Stream-import a CoNLL-U, JSONL or CSV file into the corpus store.
+    With strict, sentences with tags outside the tag vocabulary are rejected; otherwise they
+    are imported and the unknown tags are reported. progress is called after every batch with
+    the running report. Returns the final report; if a batch fails to save, the import stops,
+    'failed' counts the batch's sentences and 'error' holds the reason.
+    """
+    fmt = fmt or detect_format(path)
+    parser = PARSERS[fmt]
+    vocab = load_tag_vocab()
+    # Hold the corpus lock for the whole import: batches extend the corpus loaded here, so no
+    # other writer may save in between (they wait until the import is done)
+    with corpus_lock():
+        corpus = load_corpus()
+        seen = {text_hash(entry['text']) for entry in corpus if 'text' in entry}
+        report = {'format': fmt, 'path': path, 'read': 0, 'imported': 0, 'duplicates': 0,
+                  'invalid': 0, 'failed': 0, 'error': None, 'unknown_tags': set(), 'batches': 0,
+                  'seconds': 0.0, 'sentences_per_sec': 0.0}
+        start = time.perf_counter()
+        entries = parser(path)
+        while True:
+            chunk = list(itertools.islice(entries, batch_size))
+            if not chunk:
+                break
+            batch: List[Dict[str, Any]] = []
+            for entry in chunk:
+                report['read'] += 1
+                if 'text' not in entry or 'tokens' not in entry:
+                    report['invalid'] += 1
+                    continue
+                key = text_hash(entry['text'])
+                if key in seen:
+                    report['duplicates'] += 1
+                    continue
+                unknown = unknown_tags(entry, vocab, allow_features) if vocab else set()
+                if unknown:
+                    report['unknown_tags'] |= unknown
+                    if strict:
+                        report['invalid'] += 1
+                        continue
+                seen.add(key)
+                batch.append(entry)
+            if batch:
+                try:
+                    add_entries(batch, corpus=corpus)
+                except Exception as e:
+                    report['failed'] += len(batch)
+                    report['error'] = str(e)
+                    logging.error(f"Import of {path} stopped: failed to save a batch of {len(batch)} sentences: {e}")
+                else:
+                    report['imported'] += len(batch)
+                    report['batches'] += 1
+            report['seconds'] = time.perf_counter() - start
+            report['sentences_per_sec'] = report['read'] / report['seconds'] if report['seconds'] else 0.0
+            logging.info(f"Import progress: {report['read']} read, {report['imported']} imported, "
+                         f"{report['duplicates']} duplicates, {report['invalid']} invalid "
+                         f"({report['sentences_per_sec']:.0f} sentences/s)")
+            if progress:
+                progress(report)
+            if report['error'] is not None:
+                break
+    report['unknown_tags'] = sorted(report['unknown_tags'])
+    if report['unknown_tags']:
+        logging.warning(f"Tags not in tag vocab: {report['unknown_tags']}")
+    logging.info(f"Imported {report['imported']} of {report['read']} sentences from {path} "
+                 f"in {report['seconds']:.2f}s")
+    return report
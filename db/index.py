@@ -0,0 +1,474 @@
+"""
+db/index.py
+
+Persistent inverted index and concordance (KWIC) queries over the annotated corpus.
+
+Every token in the corpus gets a global id (corpus order). Postings lists map terms to sorted
+token ids for four fields:
+    word:<lowercased form>   lemma:<lemma>   upos:<first tag>   tag:<any tag>
+The index is a sorted string table (core.sstable) whose postings are gap-encoded with the
+narrowest integer width that fits, plus forward arrays (sentence offsets, token -> word/tag
+sequence) for sequence checks and KWIC output. Sentences added through db.corpus.add_entry are
+appended to a journal next to the table and folded in by compact(); both are written under a
+file lock (db.locking) so several processes can append.
+The index records a content fingerprint of the sentences it covers (a hash chained over them,
+extended as sentences are appended), so an index whose corpus was edited or replaced behind its
+back is detected and rebuilt rather than served stale.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.analysis import json_default
+from core.sstable import SSTable, write_sstable
+from db.locking import file_lock
+from loaders.dictionary_loader import ROOTS_PATH, load_roots
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+INDEX_PATH = os.path.join(BASE_DIR, 'corpus', 'corpus.idx')
+FIELDS = ('word', 'lemma', 'upos', 'tag')
+# Journal entries kept before add_entries folds them into the table
+COMPACT_THRESHOLD = 5000
+
+_GAP_DTYPES = (np.uint8, np.uint16, np.uint32)
+_ARRAY_KEYS = (b'~sent_offsets', b'~token_words', b'~token_tags')
+
+
+_roots_cache: Dict[str, Any] = {'stat': None, 'roots': {}}
+
+
+def _current_roots() -> Dict[str, Dict[str, Any]]:
+    # data/roots.json, reloaded when it changes
+    try:
+        st = os.stat(ROOTS_PATH)
+        stat = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stat = None
+    if stat != _roots_cache['stat']:
+        _roots_cache['roots'] = load_roots() if stat is not None else {}
+        _roots_cache['stat'] = stat
+    return _roots_cache['roots']
+
+
+def entry_tokens(entry: Dict[str, Any], roots: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Tokens of a corpus entry. Legacy {"word", "analysis": "lemma+TAG+..."} entries are read as
+    one-token sentences in the analyzer's format, with the POS of the lemma in roots (default:
+    data/roots.json) as first tag; when the lemma is not a known root the token is left untagged.
+    """
+    if 'tokens' in entry:
+        return entry['tokens']
+    if 'word' in entry:
+        lemma, *tags = entry.get('analysis', entry['word']).split('+')
+        pos = (roots if roots is not None else _current_roots()).get(lemma, {}).get('pos')
+        if pos is None:
+            tags = []
+        elif tags[:1] != [pos]:
+            tags = [pos] + tags
+        return [{'word': entry['word'], 'lemma': lemma, 'tags': tags}]
+    return []
+
+
+def chain_fingerprint(fingerprint: str, entry: Dict[str, Any]) -> str:
+    """
+    Extend a corpus fingerprint with one entry (its text and tokens).
+    """
+    data = json.dumps([entry.get('text', ''), entry_tokens(entry)], ensure_ascii=False, sort_keys=True,
+                      default=json_default)
+    return hashlib.blake2b((fingerprint + data).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def corpus_fingerprint(corpus: Iterable[Dict[str, Any]]) -> str:
+    """
+    Content fingerprint of a corpus ('' when empty), as recorded by CorpusIndex.
+    """
+    fingerprint = ''
+    for entry in corpus:
+        fingerprint = chain_fingerprint(fingerprint, entry)
+    return fingerprint
+
+
+def token_terms(tok: Dict[str, Any]) -> List[str]:
+    """
+    Index terms of one token (lemma defaults to the lowercased word, as in the exporters).
+    """
+    word = tok.get('word', '')
+    tags = tok.get('tags') or []
+    terms = [f"word:{word.lower()}", f"lemma:{tok.get('lemma') or word.lower()}",
+             f"upos:{tags[0] if tags else 'X'}"]
+    terms.extend(f"tag:{t}" for t in dict.fromkeys(tags))
+    return terms
+
+
+def _encode_postings(ids: np.ndarray) -> bytes:
+    gaps = np.diff(ids, prepend=np.uint32(0)).astype(np.uint32)
+    width = next(i for i, dt in enumerate(_GAP_DTYPES) if gaps.max() <= np.iinfo(dt).max)
+    return bytes([width]) + gaps.astype(_GAP_DTYPES[width]).tobytes()
+
+
+def _decode_postings(value: bytes) -> np.ndarray:
+    gaps = np.frombuffer(value, dtype=_GAP_DTYPES[value[0]], offset=1)
+    return np.cumsum(gaps, dtype=np.uint32)
+
+
+# Set operations on sorted token id arrays. Token ids are dense, so table lookups and boolean
+# masks over the token range are much faster than numpy's sort-based set routines.
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if not len(a) or not len(b):
+        return np.zeros(0, dtype=np.uint32)
+    return a[np.isin(a, b, assume_unique=True, kind='table')]
+
+
+def _difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if not len(a) or not len(b):
+        return a
+    return a[~np.isin(a, b, assume_unique=True, kind='table')]
+
+
+def _union(arrays: List[np.ndarray], size: int) -> np.ndarray:
+    mask = np.zeros(size, dtype=bool)
+    for ids in arrays:
+        mask[ids] = True
+    return np.flatnonzero(mask).astype(np.uint32)
+
+
+class CorpusIndex:
+    """
+    Inverted index over a corpus with boolean, tag-sequence and phrase queries.
+    """
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self.journal_path = path + '.log'
+        self._base: Optional[SSTable] = None
+        self._delta: Dict[str, List[int]] = {}
+        self.sent_offsets = np.zeros(1, dtype=np.uint32)
+        self.token_words = np.zeros(0, dtype=np.uint32)
+        self.token_tags = np.zeros(0, dtype=np.uint32)
+        self.words: List[str] = []
+        self.tagseqs: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._tagseq_ids: Dict[str, int] = {}
+        self.journal_size = 0
+        self.fingerprint: Optional[str] = ''  # corpus_fingerprint of the indexed sentences
+
+    # ----- loading and building -----
+
+    @classmethod
+    def open(cls, path: str = INDEX_PATH) -> 'CorpusIndex':
+        """
+        Map an existing index and replay its journal.
+        """
+        index = cls(path)
+        with file_lock(path):
+            index._base = SSTable(path)
+            meta = json.loads(index._base.meta)
+            index.words, index.tagseqs = meta['words'], meta['tagseqs']
+            # Indexes written before fingerprints were recorded never match, so they get rebuilt
+            index.fingerprint = meta.get('fingerprint')
+            index._word_ids = {w: i for i, w in enumerate(index.words)}
+            index._tagseq_ids = {t: i for i, t in enumerate(index.tagseqs)}
+            index.sent_offsets, index.token_words, index.token_tags = (
+                np.frombuffer(index._base.get(key), dtype=np.uint32).copy() for key in _ARRAY_KEYS
+            )
+            if os.path.exists(index.journal_path):
+                with open(index.journal_path, encoding='utf-8') as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+                index._add(entries)
+                index.journal_size = len(entries)
+        logging.info(f"Opened corpus index {path}: {index.num_sentences} sentences, "
+                     f"{index.num_tokens} tokens ({index.journal_size} journaled)")
+        return index
+
+    @classmethod
+    def build(cls, corpus: Iterable[Dict[str, Any]], path: str = INDEX_PATH) -> 'CorpusIndex':
+        """
+        Index a whole corpus from scratch and write it to path.
+        """
+        index = cls(path)
+        index._add(corpus)
+        index.compact()
+        return index
+
+    @property
+    def num_sentences(self) -> int:
+        return len(self.sent_offsets) - 1
+
+    @property
+    def num_tokens(self) -> int:
+        return int(self.sent_offsets[-1])
+
+    def _intern(self, value: str, table: List[str], ids: Dict[str, int]) -> int:
+        i = ids.get(value)
+        if i is None:
+            i = ids[value] = len(table)
+            table.append(value)
+        return i
+
+    def _add(self, entries: Iterable[Dict[str, Any]]) -> int:
+        next_id = self.num_tokens
+        offsets, words, tagseqs = [], [], []
+        for entry in entries:
+            if self.fingerprint is not None:
+                self.fingerprint = chain_fingerprint(self.fingerprint, entry)
+            for tok in entry_tokens(entry):
+                for term in token_terms(tok):
+                    self._delta.setdefault(term, []).append(next_id)
+                words.append(self._intern(tok.get('word', ''), self.words, self._word_ids))
+                tagseqs.append(self._intern('+'.join(tok.get('tags') or []), self.tagseqs, self._tagseq_ids))
+                next_id += 1
+            offsets.append(next_id)
+        self.sent_offsets = np.concatenate([self.sent_offsets, np.array(offsets, dtype=np.uint32)])
+        self.token_words = np.concatenate([self.token_words, np.array(words, dtype=np.uint32)])
+        self.token_tags = np.concatenate([self.token_tags, np.array(tagseqs, dtype=np.uint32)])
+        return len(offsets)
+
+    def add_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Incrementally index sentences appended to the corpus and journal them to disk.
+        The table is rewritten only once the journal exceeds COMPACT_THRESHOLD entries.
+        """
+        self._add(entries)
+        self.journal_size += len(entries)
+        with file_lock(self.path):
+            if self.journal_size > COMPACT_THRESHOLD or self._base is None:
+                self._compact()
+                return
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    record = {'text': entry.get('text', ''), 'tokens': entry_tokens(entry)}
+                    f.write(json.dumps(record, ensure_ascii=False, default=json_default) + '\n')
+
+    def compact(self) -> None:
+        """
+        Write base table + journal into a new table and clear the journal.
+        """
+        with file_lock(self.path):
+            self._compact()
+
+    def _compact(self) -> None:
+        terms = set(self._delta)
+        if self._base is not None:
+            terms.update(key[2:].decode('utf-8') for key, _ in self._base.items() if key.startswith(b'p:'))
+        items = [(b'p:' + term.encode('utf-8'), _encode_postings(self.postings(term))) for term in terms]
+        items += [(key, array.tobytes()) for key, array in
+                  zip(_ARRAY_KEYS, (self.sent_offsets, self.token_words, self.token_tags))]
+        meta = {'words': self.words, 'tagseqs': self.tagseqs, 'fingerprint': self.fingerprint,
+                'sentences': self.num_sentences, 'tokens': self.num_tokens}
+        write_sstable(self.path, items, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        if self._base is not None:
+            self._base.close()
+        self._base = SSTable(self.path)
+        self._delta = {}
+        self.journal_size = 0
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        logging.info(f"Compacted corpus index {self.path}: {len(terms)} terms, {self.num_tokens} tokens")
+
+    def close(self) -> None:
+        if self._base is not None:
+            self._base.close()
+
+    # ----- queries -----
+
+    def postings(self, term: str) -> np.ndarray:
+        """
+        Sorted token ids for a term such as 'lemma:yaz' or 'tag:PAST'.
+        """
+        parts = []
+        if self._base is not None:
+            value = self._base.get(b'p:' + term.encode('utf-8'))
+            if value is not None:
+                parts.append(_decode_postings(value))
+        if term in self._delta:
+            parts.append(np.array(self._delta[term], dtype=np.uint32))
+        if not parts:
+            return np.zeros(0, dtype=np.uint32)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def match(self, term: str) -> np.ndarray:
+        """
+        Token ids matching one query term:
+            field:value      word, lemma, upos or tag
+            A+B+C            tokens whose tag sequence contains A, B, C contiguously (e.g. VERB+NEG+PAST)
+            value            shorthand for word:value
+        """
+        if ':' in term and term.split(':', 1)[0] in FIELDS:
+            field, value = term.split(':', 1)
+            return self.postings(f"{field}:{value.lower() if field == 'word' else value}")
+        if '+' in term:
+            tags = term.split('+')
+            ids = self.postings(f"tag:{tags[0]}")
+            for tag in tags[1:]:
+                ids = _intersect(ids, self.postings(f"tag:{tag}"))
+            needle = f"+{term}+"
+            ok = np.array([needle in f"+{seq}+" for seq in self.tagseqs], dtype=bool)
+            return ids[ok[self.token_tags[ids]]] if len(ids) else ids
+        return self.postings(f"word:{term.lower()}")
+
+    def search(self, query: str) -> np.ndarray:
+        """
+        Boolean query over terms, e.g. 'lemma:yaz AND tag:PAST', 'upos:NOUN AND NOT tag:PLUR',
+        'word:ev OR word:evdə'. AND binds tighter than OR. Returns sorted token ids.
+        """
+        clauses = []
+        for clause in query.split(' OR '):
+            ids, negate = None, False
+            for word in clause.split():
+                if word == 'AND':
+                    continue
+                if word == 'NOT':
+                    negate = True
+                    continue
+                hits = self.match(word)
+                if negate:
+                    base = ids if ids is not None else np.arange(self.num_tokens, dtype=np.uint32)
+                    ids = _difference(base, hits)
+                else:
+                    ids = hits if ids is None else _intersect(ids, hits)
+                negate = False
+            if ids is not None:
+                clauses.append(ids)
+        if len(clauses) == 1:
+            return clauses[0]
+        return _union(clauses, self.num_tokens)
+
+    def sentence_of(self, token_ids: np.ndarray) -> np.ndarray:
+        """
+        Sentence (corpus entry) index of each token id.
+        """
+        return np.searchsorted(self.sent_offsets, token_ids, side='right') - 1
+
+    def sequence(self, queries: List[str]) -> np.ndarray:
+        """
+        Token ids where consecutive tokens within one sentence match queries[0], queries[1], ...
+        Returns the id of the first token of each match.
+        """
+        starts = self.search(queries[0])
+        for k, query in enumerate(queries[1:], start=1):
+            following = self.search(query)
+            starts = _intersect(starts, following[following >= k] - np.uint32(k))
+        if len(queries) > 1 and len(starts):
+            ends = starts + len(queries) - 1
+            starts = starts[self.sentence_of(starts) == self.sentence_of(ends)]
+        return starts
+
+    def sentences(self, token_ids: np.ndarray) -> List[int]:
+        """
+        Sorted unique sentence indices (positions in db.corpus.get_corpus()) containing the tokens.
+        """
+        return np.unique(self.sentence_of(token_ids)).tolist()
+
+    def kwic(self, token_ids: np.ndarray, width: int = 5, span: int = 1) -> List[Dict[str, Any]]:
+        """
+        Keyword-in-context lines for matches starting at token_ids (span tokens long),
+        with up to width tokens of context on each side, clipped to the sentence.
+        """
+        lines = []
+        sent_ids = self.sentence_of(token_ids)
+        for tid, sid in zip(token_ids.tolist(), sent_ids.tolist()):
+            start, end = int(self.sent_offsets[sid]), int(self.sent_offsets[sid + 1])
+            words = [self.words[w] for w in self.token_words[max(start, tid - width):min(end, tid + span + width)]]
+            left = tid - max(start, tid - width)
+            lines.append({
+                'sentence': sid,
+                'token': tid - start,
+                'left': ' '.join(words[:left]),
+                'keyword': ' '.join(words[left:left + span]),
+                'right': ' '.join(words[left + span:]),
+                'tags': self.tagseqs[self.token_tags[tid]]
+            })
+        return lines
+
+    def concordance(self, query: str, width: int = 5, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        KWIC lines for a boolean query, or for a token sequence given as terms joined by ' >> '
+        (e.g. 'lemma:kitab >> upos:VERB').
+        """
+        parts = [q.strip() for q in query.split('>>')]
+        ids = self.sequence(parts) if len(parts) > 1 else self.search(parts[0])
+        if limit is not None:
+            ids = ids[:limit]
+        return self.kwic(ids, width=width, span=len(parts))
+
+
+_index: Optional[CorpusIndex] = None
+# corpus_stamp() of the corpus file when _index was last known to match it
+_index_stamp: Optional[Tuple[int, int, int]] = None
+
+
+def corpus_stamp() -> Optional[Tuple[int, int, int]]:
+    """
+    (mtime_ns, size, inode) of the corpus store file, or None if it does not exist.
+    Saves replace the file, so the inode changes even when mtime and size do not.
+    """
+    from db.corpus import CORPUS_PATH
+    try:
+        st = os.stat(CORPUS_PATH)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _open_matching(corpus: List[Dict[str, Any]], path: str) -> CorpusIndex:
+    """
+    Open the index at path if it covers exactly corpus (by fingerprint), else rebuild it.
+    """
+    index = None
+    if os.path.exists(path):
+        try:
+            index = CorpusIndex.open(path)
+        except Exception as e:
+            logging.error(f"Failed to open corpus index {path}: {e}")
+    if index is None or index.num_sentences != len(corpus) or index.fingerprint != corpus_fingerprint(corpus):
+        if index is not None:
+            logging.warning(f"Corpus index {path} is out of sync with the corpus; rebuilding.")
+            index.close()
+        index = CorpusIndex.build(corpus, path)
+    return index
+
+
+def get_index(corpus: Optional[List[Dict[str, Any]]] = None, path: str = INDEX_PATH) -> CorpusIndex:
+    """
+    Return the process-wide corpus index, opening it from disk or building it if it is missing
+    or out of sync with the corpus store. Once verified, the index is reused until the corpus
+    file changes by other means than db.corpus appends from this process.
+    """
+    global _index, _index_stamp
+    stamp = corpus_stamp()
+    if _index is not None and _index.path == path and stamp == _index_stamp:
+        return _index
+    if corpus is None:
+        from db.corpus import get_corpus
+        corpus = get_corpus()
+    if _index is not None:
+        _index.close()
+    _index, _index_stamp = _open_matching(corpus, path), stamp
+    return _index
+
+
+def update_index(entries: List[Dict[str, Any]], corpus: List[Dict[str, Any]],
+                 previous_stamp: Optional[Tuple[int, int, int]] = None, path: str = INDEX_PATH) -> None:
+    """
+    Hook for db.corpus: index entries just appended to corpus (which now ends with them);
+    previous_stamp is the corpus file's corpus_stamp() before the save.
+    Does nothing until an index has been built. If the index is not known to match the corpus
+    as it was before the append, it is checked by fingerprint and rebuilt if it has drifted.
+    """
+    global _index, _index_stamp
+    if (_index is None or _index.path != path) and not os.path.exists(path):
+        return
+    if _index is None or _index.path != path or previous_stamp is None or previous_stamp != _index_stamp:
+        # Another process (or an edit) may have changed the corpus or the index: check the prefix
+        if _index is not None:
+            _index.close()
+        _index = None
+        prefix = corpus[:len(corpus) - len(entries)]
+        index = _open_matching(prefix, path)
+        _index = index
+    _index.add_entries(entries)
+    _index_stamp = corpus_stamp()
@@ -0,0 +1,55 @@
+"""
+db/locking.py
+
+Advisory file locks serializing writers of the corpus store and its index across threads and
+processes. The lock is taken on a sidecar '<path>.lock' file with flock (POSIX); where fcntl is
+unavailable only threads of the same process are serialized.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_thread_locks: Dict[str, threading.RLock] = {}
+_registry_lock = threading.Lock()
+_held = threading.local()
+
+
+def _thread_lock(path: str) -> threading.RLock:
+    with _registry_lock:
+        return _thread_locks.setdefault(path, threading.RLock())
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock for path (re-entrant within a thread).
+    """
+    lock_path = os.path.abspath(path) + '.lock'
+    held = getattr(_held, 'counts', None)
+    if held is None:
+        held = _held.counts = {}
+    with _thread_lock(lock_path):
+        if held.get(lock_path):
+            held[lock_path] += 1
+            try:
+                yield
+            finally:
+                held[lock_path] -= 1
+            return
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            held[lock_path] = 1
+            try:
+                yield
+            finally:
+                held[lock_path] = 0
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
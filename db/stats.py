@@ -0,0 +1,147 @@
+"""
+db/stats.py
+
+Vectorized corpus statistics over a columnar snapshot (db.columnar).
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from db.columnar import ColumnarSnapshot
+
+
+def _ranked(counts: np.ndarray, vocab: List[str], top: Optional[int]) -> List[Tuple[str, int]]:
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    if top is not None:
+        order = order[:top]
+    return [(vocab[i], int(counts[i])) for i in order]
+
+
+def tag_frequencies(snapshot: ColumnarSnapshot, top: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Frequency of every tag over all token tag lists, most frequent first.
+    """
+    counts = np.bincount(snapshot.tag_ids, minlength=len(snapshot.tags))
+    return _ranked(counts, snapshot.tags, top)
+
+
+def upos_frequencies(snapshot: ColumnarSnapshot, top: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Frequency of the first tag (UPOS) of each token.
+    """
+    counts = np.bincount(snapshot.upos_ids, minlength=len(snapshot.tags))
+    return _ranked(counts, snapshot.tags, top)
+
+
+def lemma_frequencies(snapshot: ColumnarSnapshot, top: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Token frequency of every lemma, most frequent first.
+    """
+    counts = np.bincount(snapshot.lemma_ids, minlength=len(snapshot.lemmas))
+    return _ranked(counts, snapshot.lemmas, top)
+
+
+def ambiguity_rate(snapshot: ColumnarSnapshot) -> Dict[str, float]:
+    """
+    Share of word types annotated with more than one tag sequence, and share of tokens
+    whose word type is ambiguous in that sense.
+    """
+    if snapshot.num_tokens == 0:
+        return {'type_ambiguity': 0.0, 'token_ambiguity': 0.0}
+    pairs = np.unique(snapshot.word_ids.astype(np.int64) * len(snapshot.tagseqs) + snapshot.tagseq_ids)
+    readings = np.bincount(pairs // len(snapshot.tagseqs), minlength=len(snapshot.words))
+    ambiguous = readings > 1
+    seen = readings > 0
+    return {
+        'type_ambiguity': float(ambiguous.sum() / seen.sum()),
+        'token_ambiguity': float(ambiguous[snapshot.word_ids].mean())
+    }
+
+
+def ngram_counts(snapshot: ColumnarSnapshot, n: int = 2, field: str = 'upos',
+                 top: Optional[int] = 20) -> List[Tuple[Tuple[str, ...], int]]:
+    """
+    Counts of n-grams of a token field ('word', 'lemma', 'upos' or 'tagseq') within sentences.
+    """
+    ids = getattr(snapshot, f"{field}_ids").astype(np.int64)
+    vocab = {'word': snapshot.words, 'lemma': snapshot.lemmas,
+             'upos': snapshot.tags, 'tagseq': snapshot.tagseqs}[field]
+    size = max(len(vocab), 1)
+    if size ** n >= 2 ** 63:
+        raise ValueError(f"n-gram keys for n={n} over {size} {field} values do not fit in 64 bits")
+    sent = snapshot.sentence_ids()
+    starts = np.arange(max(len(ids) - n + 1, 0))
+    starts = starts[sent[starts] == sent[starts + n - 1]]
+    keys = np.zeros(len(starts), dtype=np.int64)
+    for k in range(n):
+        keys = keys * size + ids[starts + k]
+    grams, counts = np.unique(keys, return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top]
+    result = []
+    for key, count in zip(grams[order].tolist(), counts[order].tolist()):
+        gram = []
+        for _ in range(n):
+            key, i = divmod(key, size)
+            gram.append(vocab[i])
+        result.append((tuple(reversed(gram)), count))
+    return result
+
+
+def annotator_diff(a: ColumnarSnapshot, b: ColumnarSnapshot, top: int = 20) -> Dict[str, Any]:
+    """
+    Compare two annotations of the same sentences (aligned by text, same token count).
+    Reports token-level agreement on UPOS and full tag sequence, and the most frequent
+    disagreements as (tags in a, tags in b).
+    """
+    b_index = {text: i for i, text in enumerate(b.texts)}
+    a_tok, b_tok = [], []
+    for i, text in enumerate(a.texts):
+        j = b_index.get(text)
+        if j is None:
+            continue
+        a_start, a_end = int(a.sent_offsets[i]), int(a.sent_offsets[i + 1])
+        b_start, b_end = int(b.sent_offsets[j]), int(b.sent_offsets[j + 1])
+        if a_end - a_start != b_end - b_start:
+            logging.warning(f"Token count differs for sentence '{text[:40]}'; skipped in diff.")
+            continue
+        a_tok.append(np.arange(a_start, a_end))
+        b_tok.append(np.arange(b_start, b_end))
+    if not a_tok:
+        return {'sentences': 0, 'tokens': 0, 'upos_agreement': None, 'tag_agreement': None, 'disagreements': []}
+    a_tok, b_tok = np.concatenate(a_tok), np.concatenate(b_tok)
+    # Re-encode b's vocabularies into a's id space (unseen strings get fresh ids)
+    tag_map = {t: i for i, t in enumerate(a.tags)}
+    seq_map = {t: i for i, t in enumerate(a.tagseqs)}
+    b_tags = np.array([tag_map.setdefault(t, len(tag_map)) for t in b.tags], dtype=np.int64)
+    b_seqs = np.array([seq_map.setdefault(t, len(seq_map)) for t in b.tagseqs], dtype=np.int64)
+    a_upos, b_upos = a.upos_ids[a_tok], b_tags[b.upos_ids[b_tok]]
+    a_seq, b_seq = a.tagseq_ids[a_tok].astype(np.int64), b_seqs[b.tagseq_ids[b_tok]]
+    differs = a_seq != b_seq
+    seqs = list(seq_map)
+    pairs, counts = np.unique(np.stack([a_seq[differs], b_seq[differs]], axis=1), axis=0, return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top]
+    return {
+        'sentences': len(set(a.sentence_ids()[a_tok].tolist())),
+        'tokens': int(len(a_tok)),
+        'upos_agreement': float((a_upos == b_upos).mean()),
+        'tag_agreement': float((~differs).mean()),
+        'disagreements': [((seqs[pairs[i][0]], seqs[pairs[i][1]]), int(counts[i])) for i in order]
+    }
+
+
+def summary(snapshot: ColumnarSnapshot, top: int = 10) -> Dict[str, Any]:
+    """
+    Overview of a snapshot: sizes, top tags/lemmas, ambiguity and UPOS bigrams.
+    """
+    return {
+        'sentences': snapshot.num_sentences,
+        'tokens': snapshot.num_tokens,
+        'word_types': len(snapshot.words),
+        'lemmas': len(snapshot.lemmas),
+        'top_tags': tag_frequencies(snapshot, top),
+        'top_lemmas': lemma_frequencies(snapshot, top),
+        'ambiguity': ambiguity_rate(snapshot),
+        'upos_bigrams': ngram_counts(snapshot, 2, 'upos', top)
+    }
@@ -1,39 +1,51 @@
 # export/exporter.py
 """
-Corpus exporters: CoNLL-U, Excel, JSONL, CSV.
+Corpus exporters: CoNLL-U, Excel, JSONL, CSV, columnar (NumPy) snapshot.
 """
 import os
+import io
 import json
 import csv
+import logging
 import pandas as pd
+from core.analysis import json_default
 from db.corpus import get_corpus
+from db.index import corpus_stamp
+from db.columnar import build_snapshot, write_snapshot
+from export.incremental import write_export
 
 # Paths
 CONLLU_PATH = "corpus/corpus.conllu"
 EXCEL_PATH = "corpus/corpus.xlsx"
 JSONL_PATH = "corpus/corpus.jsonl"
 CSV_PATH = "corpus/corpus.csv"
+COLUMNAR_PATH = "corpus/columns"
 
 
-def export_to_conllu(path: str = CONLLU_PATH) -> str:
+def _render_conllu(sent_id: int, entry: dict) -> str:
+    lines = [f"# sent_id = {sent_id}\n", f"# text = {entry['text']}\n"]
+    for idx, tok in enumerate(entry["tokens"], start=1):
+        word = tok["word"]
+        lemma = tok.get("lemma", word.lower())
+        tags = tok.get("tags", [])
+        upos = tags[0] if tags else "X"
+        feats = "|".join(tags[1:]) if len(tags) > 1 else "_"
+        lines.append(f"{idx}\t{word}\t{lemma}\t{upos}\t_\t{feats}\t_\t_\t_\t_\n")
+    lines.append("\n")
+    return "".join(lines)
+
+
+def export_to_conllu(path: str = CONLLU_PATH, incremental: bool = False) -> str:
     """
     Export corpus to CoNLL-U format. Logs success and errors.
+    With incremental=True only sentences added or edited since the last export are written
+    (see export/incremental.py).
     """
+    stamp = corpus_stamp()
     corpus = get_corpus()
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            for i, entry in enumerate(corpus, start=1):
-                f.write(f"# sent_id = {i}\n")
-                f.write(f"# text = {entry['text']}\n")
-                for idx, tok in enumerate(entry["tokens"], start=1):
-                    word = tok["word"]
-                    lemma = tok.get("lemma", word.lower())
-                    tags = tok.get("tags", [])
-                    upos = tags[0] if tags else "X"
-                    feats = "|".join(tags[1:]) if len(tags) > 1 else "_"
-                    f.write(f"{idx}\t{word}\t{lemma}\t{upos}\t_\t{feats}\t_\t_\t_\t_\n")
-                f.write("\n")
+        write_export(path, corpus, "conllu", _render_conllu, incremental=incremental,
+                     source_stamp=stamp)
         logging.info(f"Exported corpus to CoNLL-U format at {path}")
         return path
     except Exception as e:
@@ -61,31 +73,60 @@ def export_to_excel(path: str = EXCEL_PATH) -> str:
         return ""
 
 
-def export_to_jsonl(path: str = JSONL_PATH) -> str:
+def _render_jsonl(sent_id: int, entry: dict) -> str:
+    return json.dumps(entry, ensure_ascii=False, default=json_default) + "\n"
+
+
+def export_to_jsonl(path: str = JSONL_PATH, incremental: bool = False) -> str:
     """
     Export corpus to JSONL format. Logs success and errors.
+    With incremental=True only sentences added or edited since the last export are written.
     """
+    stamp = corpus_stamp()
     corpus = get_corpus()
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        for entry in corpus:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    write_export(path, corpus, "jsonl", _render_jsonl, incremental=incremental,
+                 source_stamp=stamp)
     return path
 
 
-def export_to_csv(path: str = CSV_PATH) -> str:
-    """Export corpus to simple CSV format."""
+def _csv_rows(rows) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+def _render_csv(sent_id: int, entry: dict) -> str:
+    rows = []
+    for token in entry["tokens"]:
+        word = token["word"]
+        lemma = token.get("lemma", word.lower())
+        tags = token.get("tags", [])
+        upos = tags[0] if tags else "X"
+        feats = "|".join(tags[1:]) if len(tags) > 1 else "_"
+        rows.append([entry["text"], word, lemma, upos, feats])
+    return _csv_rows(rows)
+
+
+def export_to_csv(path: str = CSV_PATH, incremental: bool = False) -> str:
+    """Export corpus to simple CSV format.
+    With incremental=True only sentences added or edited since the last export are written."""
+    stamp = corpus_stamp()
     corpus = get_corpus()
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["sentence", "token", "lemma", "upos", "features"])
-        for entry in corpus:
-            for token in entry["tokens"]:
-                word = token["word"]
-                lemma = token.get("lemma", word.lower())
-                tags = token.get("tags", [])
-                upos = tags[0] if tags else "X"
-                feats = "|".join(tags[1:]) if len(tags) > 1 else "_"
-                writer.writerow([entry["text"], word, lemma, upos, feats])
+    header = _csv_rows([["sentence", "token", "lemma", "upos", "features"]])
+    write_export(path, corpus, "csv", _render_csv, header=header, incremental=incremental,
+                 source_stamp=stamp)
     return path
+
+
+def export_to_columnar(path: str = COLUMNAR_PATH) -> str:
+    """
+    Export corpus as a columnar snapshot (dictionary-encoded .npy columns, see db/columnar.py).
+    Logs success and errors.
+    """
+    try:
+        write_snapshot(build_snapshot(get_corpus()), path)
+        logging.info(f"Exported corpus to columnar snapshot at {path}")
+        return path
+    except Exception as e:
+        logging.error(f"Failed to export columnar snapshot: {e}")
+        return ""
@@ -0,0 +1,135 @@
+"""
+Watermarked, incremental writing of line-oriented exports (CoNLL-U, JSONL, CSV).
+
+Next to each export file a watermark (<path>.watermark) records, per exported sentence,
+a content hash and the byte offset where its rendering starts. An incremental run compares
+the current corpus against the watermark, truncates the file at the first sentence that was
+edited or removed, and renders only from there on; when sentences were only appended, the
+existing file is left untouched and the new ones are appended. Callers exporting the corpus
+store also pass its stamp (mtime, size); when the store has not changed since the watermark
+was written, the export is known to be current and no sentence is hashed or rendered.
+
+Watermark layout: one JSON line (format, header, count, last_sent_id, end, source_stamp), then
+the offsets as uint64 and the concatenated per-sentence hash digests.
+"""
+import hashlib
+import json
+import logging
+import marshal
+import os
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Renders one corpus entry (with its 1-based sentence id) as export text
+Renderer = Callable[[int, Dict[str, Any]], str]
+
+
+_DIGEST_SIZE = 12
+
+
+def watermark_path(path: str) -> str:
+    return f"{path}.watermark"
+
+
+def entry_hash(entry: Dict[str, Any]) -> bytes:
+    """
+    Content hash of a corpus entry. Hashes the marshal encoding (version 2, which writes no
+    back-references, so equal entries always encode equally); it is several times cheaper than
+    JSON encoding. Entries loaded from the same JSON store keep their key order.
+    """
+    return hashlib.blake2b(marshal.dumps(entry, 2), digest_size=_DIGEST_SIZE).digest()
+
+
+def load_watermark(path: str, fmt: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the watermark of an export, or None if it is missing or no longer matches the file.
+    """
+    wm_path = watermark_path(path)
+    if not os.path.exists(wm_path) or not os.path.exists(path):
+        return None
+    try:
+        with open(wm_path, 'rb') as f:
+            wm = json.loads(f.readline())
+            offsets = array('Q')
+            offsets.frombytes(f.read(8 * wm['count']))
+            wm['offsets'] = offsets
+            wm['hashes'] = f.read()
+    except Exception as e:
+        logging.warning(f"Unreadable export watermark {wm_path}: {e}")
+        return None
+    if wm.get('format') != fmt or os.path.getsize(path) != wm.get('end'):
+        logging.warning(f"Export {path} changed since its watermark; doing a full export.")
+        return None
+    return wm
+
+
+def _save_watermark(path: str, meta: Dict[str, Any], offsets: array, hashes: bytes) -> None:
+    tmp_path = watermark_path(path) + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n')
+        f.write(offsets.tobytes())
+        f.write(hashes)
+    os.replace(tmp_path, watermark_path(path))
+
+
+def _first_change(old: bytes, new: bytes) -> int:
+    """
+    Index of the first entry whose hash differs between two digest blobs.
+    """
+    limit = min(len(old), len(new))
+    if old[:limit] == new[:limit]:
+        return limit // _DIGEST_SIZE
+    for i in range(0, limit, _DIGEST_SIZE):
+        if old[i:i + _DIGEST_SIZE] != new[i:i + _DIGEST_SIZE]:
+            return i // _DIGEST_SIZE
+    return limit // _DIGEST_SIZE
+
+
+def write_export(path: str, corpus: List[Dict[str, Any]], fmt: str, render: Renderer,
+                 header: str = '', incremental: bool = False,
+                 source_stamp: Optional[Sequence[int]] = None) -> Dict[str, int]:
+    """
+    Write corpus to path with render, fully or incrementally against the watermark.
+    source_stamp identifies the state of the store corpus was loaded from (taken before
+    loading it); an incremental export of an unchanged store is a no-op.
+    Returns {'kept': sentences left in place, 'written': sentences rendered}.
+    """
+    wm = load_watermark(path, fmt) if incremental else None
+    if wm is not None and wm.get('header') != header:
+        wm = None
+    source_stamp = list(source_stamp) if source_stamp is not None else None
+    if wm is not None and source_stamp is not None and wm.get('source_stamp') == source_stamp \
+            and wm['count'] == len(corpus):
+        logging.info(f"Export {path} is up to date with the corpus store")
+        return {'kept': len(corpus), 'written': 0}
+    hashes = b''.join(entry_hash(entry) for entry in corpus)
+    if wm is not None:
+        start = _first_change(wm['hashes'], hashes)
+        offsets = wm['offsets'][:start]
+        cut = wm['offsets'][start] if start < wm['count'] else wm['end']
+        mode = 'r+b'
+    else:
+        start, offsets, cut, mode = 0, array('Q'), 0, 'wb'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, mode) as f:
+        if mode == 'wb':
+            f.write(header.encode('utf-8'))
+        else:
+            f.seek(cut)
+            f.truncate()
+        pos = f.tell()
+        for i in range(start, len(corpus)):
+            offsets.append(pos)
+            pos += f.write(render(i + 1, corpus[i]).encode('utf-8'))
+    meta = {
+        'format': fmt,
+        'header': header,
+        'count': len(corpus),
+        'last_sent_id': len(corpus),
+        'end': pos,
+        'source_stamp': source_stamp
+    }
+    _save_watermark(path, meta, offsets, hashes)
+    stats = {'kept': start, 'written': len(corpus) - start}
+    logging.info(f"Exported {fmt} to {path}: {stats['kept']} sentences kept, {stats['written']} written")
+    return stats
@@ -0,0 +1,74 @@
+"""
+scripts/benchmark_analysis_memory.py
+
+Compare the memory held by a large in-memory analysis set as per-result dicts (the former
+analyzer output: a fresh dict, tag list and strings per token) and as shared Analysis objects
+(core/analysis.py). Tokens are drawn with Zipfian frequencies from the generated paradigms.
+"""
+import gc
+import logging
+import random
+import time
+import tracemalloc
+
+from core.analysis import Analysis, cache_size, clear_cache
+from core.generator import MorphGenerator
+
+
+def _token_sample(n_tokens: int, max_depth: int, seed: int):
+    rows = [row for _, paradigm in MorphGenerator(max_depth=max_depth).iter_paradigms() for row in paradigm]
+    random.Random(seed).shuffle(rows)
+    weights = [1.0 / rank for rank in range(1, len(rows) + 1)]
+    sample = random.Random(seed).choices(rows, weights=weights, k=n_tokens)
+    # Raw analyzer lines, so that both variants build their strings from scratch
+    return [row['lemma'] + '\t' + '+'.join(row['tags']) + '\t' + row['analysis'] for row in sample]
+
+
+def _as_dicts(lines):
+    results = []
+    for line in lines:
+        lemma, tags, analysis = line.split('\t')
+        results.append({'root': lemma, 'gloss': '', 'analysis': analysis, 'tags': tags.split('+')})
+    return results
+
+
+def _as_analyses(lines):
+    results = []
+    for line in lines:
+        lemma, tags, analysis = line.split('\t')
+        results.append(Analysis.make(lemma, tags.split('+'), analysis))
+    return results
+
+
+def _measure(build, lines):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = build(lines)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return current, elapsed
+
+
+def main(n_tokens: int, max_depth: int, seed: int) -> None:
+    lines = _token_sample(n_tokens, max_depth, seed)
+    clear_cache()
+    dict_bytes, dict_time = _measure(_as_dicts, lines)
+    analysis_bytes, analysis_time = _measure(_as_analyses, lines)
+    print(f"{n_tokens} tokens, {cache_size()} distinct analyses")
+    print(f"dicts:    {dict_bytes / 2 ** 20:8.1f} MiB  {dict_time:6.2f}s")
+    print(f"Analysis: {analysis_bytes / 2 ** 20:8.1f} MiB  {analysis_time:6.2f}s  "
+          f"({dict_bytes / max(analysis_bytes, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tokens', type=int, default=1_000_000, help='Number of token analyses to hold')
+    parser.add_argument('--max_depth', type=int, default=2, help='Maximum affixes per generated form')
+    parser.add_argument('--seed', type=int, default=13)
+    args = parser.parse_args()
+    main(args.tokens, args.max_depth, args.seed)
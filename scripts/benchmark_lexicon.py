@@ -0,0 +1,119 @@
+"""
+scripts/benchmark_lexicon.py
+
+Compare a word dictionary loaded from JSON (core.lexical_tagger.load_dictionary) with its
+compiled, memory-mapped form (core.binary_lexicon): file size, resident memory added by loading,
+load time and lookup time. A synthetic dictionary with the shape of dictionaries/az.json is
+written to a temporary directory; each variant is measured in a fresh interpreter so one does not
+inflate the resident size of the other.
+"""
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ALPHABET = 'abcçdeəfgğhxıijkqlmnoöprsştuüvyz'
+POS_FEATURES = {
+    'NOUN': {'Case': ['Nom', 'Gen', 'Dat', 'Acc', 'Loc', 'Abl'], 'Number': ['Sing', 'Plur']},
+    'VERB': {'Tense': ['Past', 'Pres', 'Fut'], 'Person': ['1', '2', '3'], 'Number': ['Sing', 'Plur']},
+    'ADJ': {'Degree': ['Pos', 'Cmp']},
+    'ADV': {},
+}
+
+
+def _write_dictionary(path: str, n_entries: int, seed: int) -> list:
+    rng = random.Random(seed)
+    dictionary = {}
+    while len(dictionary) < n_entries:
+        word = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 12)))
+        pos = rng.choice(list(POS_FEATURES))
+        dictionary[word] = {'POS': pos, 'Features': {name: rng.choice(values)
+                                                     for name, values in POS_FEATURES[pos].items()}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dictionary, f, ensure_ascii=False, indent=2)
+    return list(dictionary)
+
+
+def _rss() -> int:
+    # Current resident set size in bytes (peak size where /proc is not available)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _measure(variant: str, directory: str, n_lookups: int, seed: int) -> dict:
+    """
+    Load one variant in this process and return its figures.
+    """
+    import gc
+    import core.lexical_tagger as lexical_tagger
+    from core.binary_lexicon import BinaryLexicon, binary_path
+
+    with open(os.path.join(directory, 'words.json'), encoding='utf-8') as f:
+        words = json.load(f)
+    rng = random.Random(seed)
+    # Half hits, half misses
+    queries = [rng.choice(words) if i % 2 else rng.choice(words) + 'q' for i in range(n_lookups)]
+    gc.collect()
+    before = _rss()
+    start = time.perf_counter()
+    if variant == 'json':
+        lexical_tagger.DICTIONARY_DIR = directory
+        lexicon = lexical_tagger.load_dictionary('az')
+    else:
+        lexicon = BinaryLexicon(binary_path('az', directory))
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    found = sum(lexicon.get(word) is not None for word in queries)
+    lookup_time = time.perf_counter() - start
+    gc.collect()
+    return {'rss': _rss() - before, 'load': load_time, 'lookup_us': lookup_time * 1e6 / n_lookups,
+            'found': found}
+
+
+def main(n_entries: int, n_lookups: int, seed: int) -> None:
+    from core.binary_lexicon import binary_path, compile_dictionary, json_path
+    with tempfile.TemporaryDirectory() as directory:
+        words = _write_dictionary(json_path('az', directory), n_entries, seed)
+        with open(os.path.join(directory, 'words.json'), 'w', encoding='utf-8') as f:
+            json.dump(words, f, ensure_ascii=False)
+        start = time.perf_counter()
+        compile_dictionary('az', directory)
+        compile_time = time.perf_counter() - start
+        sizes = {'json': os.path.getsize(json_path('az', directory)),
+                 'binary': os.path.getsize(binary_path('az', directory))}
+        results = {}
+        for variant in ('json', 'binary'):
+            out = subprocess.run([sys.executable, '-m', 'scripts.benchmark_lexicon', '--measure', variant,
+                                  '--dir', directory, '--lookups', str(n_lookups), '--seed', str(seed)],
+                                 check=True, capture_output=True, text=True, cwd=BASE_DIR).stdout
+            results[variant] = json.loads(out.strip().splitlines()[-1])
+    print(f"{n_entries} entries, {n_lookups} lookups (half misses); compile {compile_time:.2f}s")
+    for variant in ('json', 'binary'):
+        r = results[variant]
+        print(f"{variant:6}  file {sizes[variant] / 2 ** 20:7.1f} MiB  resident +{r['rss'] / 2 ** 20:7.1f} MiB  "
+              f"load {r['load'] * 1000:8.1f} ms  lookup {r['lookup_us']:6.2f} us")
+
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=200_000, help='Number of dictionary entries')
+    parser.add_argument('--lookups', type=int, default=200_000, help='Number of lookups to time')
+    parser.add_argument('--seed', type=int, default=13)
+    parser.add_argument('--measure', choices=('json', 'binary'), help=argparse.SUPPRESS)
+    parser.add_argument('--dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        print(json.dumps(_measure(args.measure, args.dir, args.lookups, args.seed)))
+    else:
+        main(args.entries, args.lookups, args.seed)
@@ -0,0 +1,29 @@
+"""
+scripts/build_fullform_index.py
+
+Build the memory-mapped full-form analysis index (surface -> analyses) consulted by FSTEngine.
+"""
+import logging
+
+from core.fullform_index import build_fullform_index, FULLFORM_INDEX_PATH, LEXC_PATH
+from core.generator import DEFAULT_MAX_DEPTH
+from core.resources import fullform_inputs_key
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', default=FULLFORM_INDEX_PATH, help='Output index path')
+    parser.add_argument('--max_depth', type=int, default=DEFAULT_MAX_DEPTH, help='Maximum affixes per form')
+    parser.add_argument('--lexc', default=LEXC_PATH, help='lexc lexicon to enumerate')
+    parser.add_argument('--no_lexc', action='store_true', help='Only index forms generated from data/*.json')
+    args = parser.parse_args()
+    try:
+        # Key the inputs before reading them, so an edit during the build makes the index stale
+        input_key = fullform_inputs_key(args.lexc)
+        count = build_fullform_index(args.out, args.max_depth, include_lexc=not args.no_lexc, lexc_path=args.lexc,
+                                     input_key=input_key)
+        print(f"Indexed {count} surface forms -> {args.out}")
+    except Exception as e:
+        logging.error(f"Failed to build full-form index: {e}")
+        raise
@@ -0,0 +1,24 @@
+"""
+scripts/compile_dictionaries.py
+
+Compile dictionaries/*.json into memory-mapped binary dictionaries (dictionaries/*.bin).
+"""
+import logging
+import os
+
+from core.binary_lexicon import DICTIONARY_DIR, compile_dictionary
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lang', nargs='*', help='Language codes to compile (default: all)')
+    parser.add_argument('--dir', default=DICTIONARY_DIR, help='Dictionary directory')
+    args = parser.parse_args()
+    langs = args.lang or sorted(name[:-5] for name in os.listdir(args.dir) if name.endswith('.json'))
+    for lang in langs:
+        try:
+            path = compile_dictionary(lang, args.dir)
+            print(f"{lang}: {path}")
+        except Exception as e:
+            logging.error(f"Failed to compile dictionary '{lang}': {e}")
@@ -0,0 +1,31 @@
+"""
+scripts/evaluate.py
+
+Evaluate the analysis pipeline against the corpus store or a CoNLL-U gold file, in parallel,
+with per-stage accuracy and latency (see core/evaluation.py).
+"""
+import json
+import logging
+
+from core.evaluation import evaluate, load_gold
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--gold', help='CoNLL-U gold file (default: the corpus store)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count; 1 runs in-process)')
+    parser.add_argument('--no_tagger', action='store_true', help='Skip the standalone ML tagger evaluation')
+    parser.add_argument('--out', help='Write the JSON report here')
+    args = parser.parse_args()
+    sentences = load_gold(args.gold)
+    if not sentences:
+        logging.error("No gold sentences to evaluate.")
+        raise SystemExit(1)
+    report = evaluate(sentences, workers=args.workers, include_tagger=not args.no_tagger)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+        logging.info(f"Evaluation report written to {args.out}")
+    print(text)
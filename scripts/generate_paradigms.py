@@ -0,0 +1,41 @@
+"""
+scripts/generate_paradigms.py
+
+Generate full paradigm tables for every root in the lexicon and write them as JSONL.
+Each line: {"lemma": ..., "paradigm": [{"surface", "lemma", "tags", "analysis"}, ...]}
+"""
+import json
+import logging
+import time
+
+from core.generator import MorphGenerator, DEFAULT_MAX_DEPTH
+
+
+def main(out_path: str, max_depth: int) -> None:
+    """
+    Stream paradigms for all roots to out_path. Logs throughput.
+    """
+    generator = MorphGenerator(max_depth=max_depth)
+    start = time.perf_counter()
+    roots = forms = 0
+    try:
+        with open(out_path, 'w', encoding='utf-8') as f:
+            for lemma, paradigm in generator.iter_paradigms():
+                f.write(json.dumps({'lemma': lemma, 'paradigm': paradigm}, ensure_ascii=False) + '\n')
+                roots += 1
+                forms += len(paradigm)
+    except Exception as e:
+        logging.error(f"Failed to generate paradigms: {e}")
+        raise
+    elapsed = time.perf_counter() - start
+    logging.info(f"Generated {forms} forms for {roots} roots in {elapsed:.2f}s -> {out_path}")
+
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', required=True, help='Output JSONL with one paradigm per root')
+    parser.add_argument('--max_depth', type=int, default=DEFAULT_MAX_DEPTH, help='Maximum affixes per form')
+    args = parser.parse_args()
+    main(args.out, args.max_depth)
@@ -0,0 +1,28 @@
+"""
+scripts/import_corpus.py
+
+Bulk-import a CoNLL-U, JSONL or CSV file into the corpus store (see db/importers.py).
+"""
+import logging
+
+from db.importers import import_corpus, PARSERS, DEFAULT_BATCH_SIZE
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path', help='File to import')
+    parser.add_argument('--format', choices=sorted(PARSERS), help='Input format (default: from the file extension)')
+    parser.add_argument('--batch_size', type=int, default=DEFAULT_BATCH_SIZE, help='Sentences per committed batch')
+    parser.add_argument('--strict', action='store_true', help='Reject sentences with tags outside data/tag_vocab.json')
+    args = parser.parse_args()
+    try:
+        report = import_corpus(args.path, args.format, args.batch_size, strict=args.strict)
+        print(f"Read {report['read']} sentences: {report['imported']} imported, "
+              f"{report['duplicates']} duplicates, {report['invalid']} invalid "
+              f"({report['sentences_per_sec']:.0f} sentences/s)")
+        if report['unknown_tags']:
+            print(f"Unknown tags: {', '.join(report['unknown_tags'])}")
+    except Exception as e:
+        logging.error(f"Import failed: {e}")
+        raise
@@ -5,7 +5,8 @@ Utility to convert a corpus with gold analyses into GNN training format (JSONL).
 Each line: {"analyses": [...], "gold_idx": int}
 """
 import json, os
-from typing import List, Dict
+import logging
+from typing import List, Dict, Iterator, Tuple, Callable
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,6 +28,9 @@ def load_corpus(path: str) -> Dict:
         logging.error(f"Failed to load corpus from {path}: {e}")
         raise
 
+_fst = None  # simulated FSTEngine shared by all lookups
+
+
 def load_fst_candidates(word: str) -> List[Dict]:
     """
     Load FST candidates for a given word.
@@ -37,36 +41,59 @@ def load_fst_candidates(word: str) -> List[Dict]:
     Returns:
         List[Dict]: The FST candidates.
     """
+    global _fst
     try:
-        from core.fst_engine import FSTEngine
-        fst = FSTEngine(fst_bin_path=None)
-        return fst.analyze(word)
+        if _fst is None:
+            from core.fst_engine import FSTEngine
+            _fst = FSTEngine(fst_bin_path=None)
+        return _fst.analyze(word)
     except Exception as e:
         logging.error(f"Failed to load FST candidates for {word}: {e}")
         raise
 
-def main(corpus_path: str, out_path: str) -> None:
+def iter_gold(corpus_path: str = None, columns: str = None) -> Iterator[Tuple[str, Callable[[Dict], bool]]]:
+    """
+    Yield (word, is_gold) pairs, where is_gold tells whether an FST candidate is the gold analysis.
+
+    Args:
+        corpus_path (str): Corpus JSON with {"word", "analysis"} entries (matched on analysis).
+        columns (str): Columnar snapshot directory (db/columnar.py); matched on lemma and tags.
+    """
+    if columns:
+        from db.columnar import load_snapshot
+        snap = load_snapshot(columns)
+        words = snap.decode('words', snap.word_ids)
+        lemmas = snap.decode('lemmas', snap.lemma_ids)
+        tagseqs = snap.decode('tagseqs', snap.tagseq_ids)
+        for word, lemma, tagseq in zip(words, lemmas, tagseqs):
+            tags = tagseq.split('+') if tagseq else []
+            yield word, lambda c, lemma=lemma, tags=tags: c['lemma'] == lemma and c['tags'] == tags
+        return
+    for entry in load_corpus(corpus_path):
+        gold_analysis = entry['analysis']
+        yield entry['word'], lambda c, gold_analysis=gold_analysis: c['analysis'] == gold_analysis
+
+
+def main(corpus_path: str, out_path: str, columns: str = None) -> None:
     """
     Prepare GNN data from a corpus.
 
     Args:
         corpus_path (str): Path to the corpus JSON file.
         out_path (str): Path to the output JSONL file.
+        columns (str): Optional columnar snapshot directory to read instead of the corpus JSON.
     """
     try:
-        corpus = load_corpus(corpus_path)
         count = 0
         with open(out_path, 'w', encoding='utf-8') as f:
-            for entry in corpus:
-                word = entry['word']
-                gold_analysis = entry['analysis']
+            for word, is_gold in iter_gold(corpus_path, columns):
                 candidates = load_fst_candidates(word)
                 if not candidates:
                     continue
-                gold_idx = next((i for i, c in enumerate(candidates) if c['analysis'] == gold_analysis), -1)
+                gold_idx = next((i for i, c in enumerate(candidates) if is_gold(c)), -1)
                 if gold_idx == -1:
                     continue  # skip if gold not in candidates
-                item = {'analyses': candidates, 'gold_idx': gold_idx}
+                item = {'analyses': [c.to_dict() for c in candidates], 'gold_idx': gold_idx}
                 f.write(json.dumps(item, ensure_ascii=False) + '\n')
                 count += 1
         logging.info(f"Prepared GNN data: {count} examples written to {out_path}")
@@ -76,7 +103,10 @@ def main(corpus_path: str, out_path: str) -> None:
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument('--corpus', required=True, help='Path to corpus JSON')
+    parser.add_argument('--corpus', help='Path to corpus JSON')
+    parser.add_argument('--columns', help='Columnar snapshot directory (alternative to --corpus)')
     parser.add_argument('--out', required=True, help='Output JSONL for GNN training')
     args = parser.parse_args()
-    main(args.corpus, args.out)
+    if not (args.corpus or args.columns):
+        parser.error('one of --corpus or --columns is required')
+    main(args.corpus, args.out, args.columns)
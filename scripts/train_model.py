@@ -1,14 +1,24 @@
 # scripts/train_model.py — script to train the morphological tagger
 from core.models import train_tag_predictor
+from core.training_scheduler import run_scheduler, DEFAULT_MIN_NEW_ENTRIES, DEFAULT_INTERVAL_MINUTES
 
 import logging
 
 if __name__ == "__main__":
+    import argparse
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    model = train_tag_predictor()
-    if model:
-        logging.info("Model training complete.")
-        print("Model training complete.")
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--watch', action='store_true', help='Keep retraining incrementally as the corpus grows')
+    parser.add_argument('--min_new_entries', type=int, default=DEFAULT_MIN_NEW_ENTRIES, help='Retrain after this many new entries')
+    parser.add_argument('--interval_minutes', type=float, default=DEFAULT_INTERVAL_MINUTES, help='...or after this long with any new entry')
+    args = parser.parse_args()
+    if args.watch:
+        run_scheduler(min_new_entries=args.min_new_entries, interval_minutes=args.interval_minutes)
     else:
-        logging.warning("Model training failed. Is the corpus populated?")
-        print("Model training failed. Is the corpus populated?")
+        model = train_tag_predictor()
+        if model:
+            logging.info("Model training complete.")
+            print("Model training complete.")
+        else:
+            logging.warning("Model training failed. Is the corpus populated?")
+            print("Model training failed. Is the corpus populated?")
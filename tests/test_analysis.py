@@ -0,0 +1,54 @@
+"""
+tests/test_analysis.py
+
+Tests for the interned, immutable Analysis type.
+"""
+import sys
+import os
+import json
+import pickle
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from core.analysis import Analysis, json_default, tag_id
+
+
+def test_flyweight_and_dict_view():
+    a = Analysis.make('yaz', ['VERB', 'PAST'], 'yaz+dı')
+    assert Analysis.make('yaz', ('VERB', 'PAST'), 'yaz+dı') is a
+    assert a.tag_ids == (tag_id('VERB'), tag_id('PAST')) == (0, 4)  # ids from data/tag_vocab.json
+    assert (a['root'], a['lemma'], a['gloss'], a.get('tags')) == ('yaz', 'yaz', '', ['VERB', 'PAST'])
+    assert a == {'lemma': 'yaz', 'tags': ['VERB', 'PAST'], 'analysis': 'yaz+dı'}
+    assert a == {'root': 'yaz', 'gloss': '', 'analysis': 'yaz+dı', 'tags': ['VERB', 'PAST']}
+    assert a != {'lemma': 'yaz', 'tags': ['VERB'], 'analysis': 'yaz+dı'}
+    assert json.loads(json.dumps(a.to_dict())) == a
+    assert set(dict(a)) == {'lemma', 'root', 'gloss', 'analysis', 'tags'}
+    assert a.to_dict() == {'lemma': 'yaz', 'tags': ['VERB', 'PAST'], 'analysis': 'yaz+dı'}
+    with pytest.raises(TypeError):
+        a['tags'] = ['VERB']
+    edited = a.to_dict()
+    edited['tags'].append('PLUR')
+    assert a.tags == ['VERB', 'PAST']
+    assert pickle.loads(pickle.dumps(a)) is a
+    with pytest.raises(AttributeError):
+        a.lemma = 'oxu'
+
+
+def test_unknown_tags_and_confidence():
+    guess = Analysis.make('qələm', ['NOUN', 'Case=Nom'], confidence=0.5)
+    assert guess['tags'] == ['NOUN', 'Case=Nom'] and guess['analysis'] == 'qələm'
+    assert guess['confidence'] == 0.5 and 'confidence' in dict(guess)
+    assert guess != Analysis.make('qələm', ['NOUN', 'Case=Nom'])
+
+
+def test_json_default(tmp_path, monkeypatch):
+    import db.corpus
+    a = Analysis.make('yaz', ['VERB', 'PAST'], 'yaz+dı')
+    token = {'word': 'yazdı', 'analyses': [a]}
+    assert json.loads(json.dumps(token, default=json_default))['analyses'] == [a.to_dict()]
+    with pytest.raises(TypeError):
+        json.dumps(token)
+    # The corpus store writes tokens holding analyses as plain dicts
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    db.corpus.add_entry('Yazdı.', [token])
+    assert db.corpus.load_corpus()[0]['tokens'][0]['analyses'] == [a.to_dict()]
@@ -0,0 +1,106 @@
+"""
+tests/test_annotation_queue.py
+
+Tests for the background pre-annotation queue (ui/annotation_queue.py).
+"""
+import sys
+import os
+import multiprocessing
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import db.corpus
+from ui.annotation_queue import AnnotationQueue
+
+UNCERTAINTY = {'kitab': 0.0, 'yazdı': 0.2, 'qələmlər': 1.0}
+
+
+def fake_analyze(word):
+    return [{'tags': ['NOUN']}], UNCERTAINTY.get(word.lower(), 0.5)
+
+
+def test_serves_most_uncertain_first_and_saves_in_background():
+    saved = []
+    queue = AnnotationQueue(workers=2, analyze=fake_analyze, save=lambda text, tokens: saved.append(text),
+                            use_tagger=False)
+    assert queue.load(['kitab', 'kitab yazdı', '', 'qələmlər']) == 3
+    while queue.stats()['analyzing']:
+        time.sleep(0.01)
+    items = [queue.next(timeout=1) for _ in range(3)]
+    assert [item['text'] for item in items] == ['qələmlər', 'kitab yazdı', 'kitab']
+    assert items[1]['rows'] == [['kitab', 'NOUN'], ['yazdı', 'NOUN']]
+    assert queue.next(timeout=1) is None
+
+    for future in [queue.save(item['text'], []) for item in items]:
+        future.result()
+    assert saved == ['qələmlər', 'kitab yazdı', 'kitab']
+    assert queue.stats()['saved'] == 3
+    queue.close()
+
+
+def test_failed_saves_are_counted():
+    def save(text, tokens):
+        if text == 'bad':
+            raise OSError('disk full')
+    queue = AnnotationQueue(workers=1, analyze=fake_analyze, save=save, use_tagger=False)
+    futures = [queue.save(text, []) for text in ('good', 'bad', 'good')]
+    for future in futures:
+        future.result()
+    stats = queue.stats()
+    assert (stats['pending'], stats['saved'], stats['failed']) == (0, 2, 1)
+    queue.close()
+
+
+def test_word_cache_is_dropped_on_new_resources():
+    calls, version = [], [1]
+
+    def analyze(word):
+        calls.append(word)
+        return fake_analyze(word)
+    queue = AnnotationQueue(workers=1, analyze=analyze, use_tagger=False, version=lambda: version[0])
+
+    def drain():
+        while queue.stats()['analyzing']:
+            time.sleep(0.01)
+        while queue.next(timeout=1) is not None:
+            pass
+    queue.load(['kitab kitab', 'kitab'])
+    drain()
+    assert calls == ['kitab']
+    version[0] = 2  # a new resource snapshot was published
+    queue.load(['kitab'])
+    drain()
+    assert calls == ['kitab', 'kitab']
+    queue.close()
+
+
+def _add_entries(prefix, count):
+    for i in range(count):
+        db.corpus.add_entry(f'{prefix} {i}', [])
+
+
+def test_concurrent_corpus_writers(tmp_path, monkeypatch):
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    # Forked processes inherit the patched store path; threads include the queue's writer
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_add_entries, args=(f'process {p}', 10)) for p in range(2)]
+    for proc in procs:
+        proc.start()
+    queue = AnnotationQueue(workers=1, analyze=fake_analyze, save=db.corpus.add_entry, use_tagger=False)
+    futures = [queue.save(f'queue {i}', []) for i in range(10)]
+    threads = [threading.Thread(target=_add_entries, args=(f'thread {t}', 10)) for t in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for proc in procs:
+        proc.join()
+        assert proc.exitcode == 0
+    for future in futures:
+        future.result()
+    queue.close()
+    texts = [entry['text'] for entry in db.corpus.load_corpus()]
+    assert len(texts) == 50 and len(set(texts)) == 50
+    assert queue.stats()['saved'] == 10
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
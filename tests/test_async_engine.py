@@ -0,0 +1,121 @@
+"""
+tests/test_async_engine.py
+
+Async FST lookups through persistent workers (a stand-in lookup script speaking the hfst-lookup
+protocol), timeouts with worker replacement, and the executor fallback.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+import core.async_engine
+from core.async_engine import AsyncFSTEngine
+from core.fst_engine import FSTEngine
+
+FAKE_LOOKUP = '''
+import sys, time
+for line in sys.stdin:
+    word = line.strip()
+    if word == 'slow':
+        time.sleep(30)
+    print(word + '\\t' + word + '+NOUN+PL')
+    print(word + '\\t' + word + 'lar+NOUN')
+    print(flush=True)
+'''
+
+
+@pytest.fixture
+def fake_fst(tmp_path):
+    script = tmp_path / 'fake_lookup.py'
+    script.write_text(FAKE_LOOKUP)
+    # FST binary path is passed as the script's argument and ignored
+    engine = FSTEngine(fst_bin_path=str(tmp_path / 'az.hfst'))
+    return AsyncFSTEngine(engine, workers=2, timeout=1.0, command=(sys.executable, str(script)))
+
+
+def test_persistent_workers(fake_fst):
+    async def run():
+        results = await fake_fst.batch_analyze(['kitab', 'ev', 'kitab', 'qələm'])
+        await fake_fst.close()
+        return results
+    results = asyncio.run(run())
+    assert [r[0]['lemma'] for r in results] == ['kitab', 'ev', 'kitab', 'qələm']
+    assert list(results[1][0]['tags']) == ['NOUN', 'PL'] and len(results[1]) == 2
+    assert fake_fst.restarts == 0
+
+
+def test_timeout_replaces_worker(fake_fst):
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await fake_fst.analyze('slow', timeout=0.5)
+        result = await fake_fst.analyze('ev')
+        await fake_fst.close()
+        return result
+    result = asyncio.run(run())
+    assert result[0]['lemma'] == 'ev'
+    assert fake_fst.restarts == 1
+
+
+def test_executor_fallback_matches_engine():
+    engine = FSTEngine(fst_bin_path=None)
+    async_engine = AsyncFSTEngine(engine)
+    assert not async_engine.use_workers
+    assert asyncio.run(async_engine.analyze('kitab')) == engine.analyze('kitab')
+
+
+def test_cancellation_replaces_worker(tmp_path):
+    script = tmp_path / 'fake_lookup.py'
+    script.write_text(FAKE_LOOKUP)
+    fst = AsyncFSTEngine(FSTEngine(fst_bin_path=str(tmp_path / 'az.hfst')), workers=1, timeout=None,
+                         command=(sys.executable, str(script)))
+
+    async def run():
+        await fst.analyze('kitab')  # the worker is running
+        task = asyncio.ensure_future(fst.analyze('slow'))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert fst.restarts == 1
+        result = await fst.analyze('ev')
+        await fst.close()
+        return result
+    assert asyncio.run(run())[0]['lemma'] == 'ev'
+    assert fst.restarts == 1
+
+
+def test_one_engine_per_loop(monkeypatch):
+    import core.engine
+    snapshot = SimpleNamespace(fst_engine=FSTEngine(fst_bin_path=None), gnn_disamb=None)
+    monkeypatch.setattr(core.engine, 'resources', SimpleNamespace(current=lambda: snapshot))
+
+    async def replace_snapshot():
+        first = core.async_engine._fst_for(snapshot)
+        assert core.async_engine._fst_for(snapshot) is first
+        # A new snapshot replaces the loop's engine and closes the old one in the background
+        snapshot.fst_engine = FSTEngine(fst_bin_path=None)
+        second = core.async_engine._fst_for(snapshot)
+        assert second is not first and not first._closed
+        await asyncio.sleep(0)
+        assert first._closed
+        assert (await core.async_engine.analyze_word('kitab'))[0]['lemma'] == 'kitab'
+        await core.async_engine.close()
+        assert second._closed
+    asyncio.run(replace_snapshot())
+
+    # Loops running at the same time keep their own engines instead of replacing each other's
+    async def engine_of_loop():
+        fst = core.async_engine._fst_for(snapshot)
+        await asyncio.sleep(0.1)
+        assert core.async_engine._fst_for(snapshot) is fst and not fst._closed
+        await core.async_engine.close()
+        return fst
+    other = {}
+    thread = threading.Thread(target=lambda: other.update(fst=asyncio.run(engine_of_loop())))
+    thread.start()
+    mine = asyncio.run(engine_of_loop())
+    thread.join()
+    assert other['fst'] is not mine
@@ -0,0 +1,60 @@
+"""
+tests/test_binary_lexicon.py
+
+Tests for compiled binary dictionaries: lookup parity with the JSON source, the staleness
+check and reloading in core.lexical_tagger.get_lexicon.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import core.lexical_tagger as lexical_tagger
+from core.binary_lexicon import BinaryLexicon, compile_dictionary, load_binary_lexicon
+
+DICTIONARY = {
+    'kitab': {'POS': 'NOUN', 'Features': {'Number': 'Sing'}},
+    'gözəl': {'POS': 'ADJ', 'Features': {}},
+    'yazdı': {'POS': 'VERB', 'Features': {'Tense': 'Past', 'Person': '3'}},
+    'və': {'POS': 'CCONJ'},
+}
+
+
+def _write(directory, dictionary):
+    with open(os.path.join(directory, 'xx.json'), 'w', encoding='utf-8') as f:
+        json.dump(dictionary, f, ensure_ascii=False)
+
+
+def test_lookup_parity(tmp_path):
+    _write(tmp_path, DICTIONARY)
+    lexicon = BinaryLexicon(compile_dictionary('xx', str(tmp_path)))
+    assert len(lexicon) == len(DICTIONARY)
+    for word, entry in DICTIONARY.items():
+        assert word in lexicon
+        assert lexicon.get(word) == {'POS': entry['POS'], 'Features': entry.get('Features', {})}
+    assert lexicon.get('yoxdur') is None and lexicon.get('yoxdur', {}) == {}
+    assert dict(lexicon.items()).keys() == DICTIONARY.keys()
+    lexicon.close()
+
+
+def test_stale_when_source_changes(tmp_path):
+    _write(tmp_path, DICTIONARY)
+    compile_dictionary('xx', str(tmp_path))
+    lexicon = load_binary_lexicon('xx', str(tmp_path))
+    assert lexicon is not None and not lexicon.is_stale(str(tmp_path))
+    _write(tmp_path, {**DICTIONARY, 'ev': {'POS': 'NOUN'}})
+    assert lexicon.is_stale(str(tmp_path))
+    assert load_binary_lexicon('xx', str(tmp_path)) is None
+    lexicon.close()
+
+
+def test_get_lexicon_reloads_changed_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexical_tagger, 'DICTIONARY_DIR', str(tmp_path))
+    lexical_tagger.reset_lexicons()
+    _write(tmp_path, DICTIONARY)
+    compile_dictionary('xx', str(tmp_path))
+    first = lexical_tagger.get_lexicon('xx')
+    assert isinstance(first, BinaryLexicon) and lexical_tagger.get_lexicon('xx') is first
+    _write(tmp_path, {**DICTIONARY, 'ev': {'POS': 'NOUN'}})
+    # The compiled file is now stale: the edited JSON is used without restarting
+    assert lexical_tagger.analyze_word_lexical('ev', 'xx')['POS'] == 'NOUN'
+    lexical_tagger.reset_lexicons()
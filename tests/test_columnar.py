@@ -0,0 +1,89 @@
+"""
+tests/test_columnar.py
+
+Tests for the columnar corpus snapshot (round trip to the original tokens) and the vectorized
+statistics over it, checked against hand-computed values.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import copy
+from db.columnar import build_snapshot, write_snapshot, load_snapshot
+from db import stats
+
+CORPUS = [
+    {'text': 'Mən kitab yazdım', 'tokens': [
+        {'word': 'Mən', 'lemma': 'mən', 'tags': ['PRON']},
+        {'word': 'kitab', 'lemma': 'kitab', 'tags': ['NOUN']},
+        {'word': 'yazdım', 'lemma': 'yaz', 'tags': ['VERB', 'PAST', 'POSS1SG']}]},
+    {'text': 'O yazmadı', 'tokens': [
+        {'word': 'O', 'lemma': 'o', 'tags': ['PRON']},
+        {'word': 'yazmadı', 'lemma': 'yaz', 'tags': ['VERB', 'NEG', 'PAST']}]},
+    {'text': 'O kitab', 'tokens': [
+        {'word': 'O', 'lemma': 'o', 'tags': ['DET']},
+        {'word': 'kitab', 'lemma': 'kitab', 'tags': ['NOUN']}]},
+]
+
+
+def _tokens(snapshot):
+    sentences = []
+    for s in range(snapshot.num_sentences):
+        tokens = []
+        for t in range(int(snapshot.sent_offsets[s]), int(snapshot.sent_offsets[s + 1])):
+            tag_ids = snapshot.tag_ids[snapshot.tag_offsets[t]:snapshot.tag_offsets[t + 1]]
+            tokens.append({'word': snapshot.words[snapshot.word_ids[t]],
+                           'lemma': snapshot.lemmas[snapshot.lemma_ids[t]],
+                           'tags': [snapshot.tags[i] for i in tag_ids]})
+        sentences.append(tokens)
+    return sentences
+
+
+def test_round_trip(tmp_path):
+    path = write_snapshot(build_snapshot(CORPUS), str(tmp_path / 'columns'))
+    snapshot = load_snapshot(path)
+    assert _tokens(snapshot) == [e['tokens'] for e in CORPUS]
+    assert snapshot.texts == [e['text'] for e in CORPUS]
+    assert snapshot.decode('tagseqs', snapshot.tagseq_ids).tolist() == [
+        '+'.join(t['tags']) for e in CORPUS for t in e['tokens']]
+
+
+def test_export_and_prepare_dataset(tmp_path, monkeypatch):
+    import core.models
+    import export.exporter
+    monkeypatch.setattr(export.exporter, 'get_corpus', lambda: CORPUS)
+    monkeypatch.setattr(core.models, 'get_corpus', lambda: CORPUS)
+    path = export.exporter.export_to_columnar(str(tmp_path / 'columns'))
+    assert core.models.prepare_dataset(load_snapshot(path)) == core.models.prepare_dataset()
+
+
+def test_stats():
+    snapshot = build_snapshot(CORPUS)
+    assert stats.tag_frequencies(snapshot) == [('PRON', 2), ('NOUN', 2), ('VERB', 2), ('PAST', 2),
+                                               ('POSS1SG', 1), ('NEG', 1), ('DET', 1)]
+    assert stats.upos_frequencies(snapshot) == [('PRON', 2), ('NOUN', 2), ('VERB', 2), ('DET', 1)]
+    assert stats.lemma_frequencies(snapshot, top=3) == [('kitab', 2), ('yaz', 2), ('o', 2)]
+    # 'O' is the only word type with two readings (PRON, DET): 1 of 5 types, 2 of 7 tokens
+    assert stats.ambiguity_rate(snapshot) == {'type_ambiguity': 0.2, 'token_ambiguity': 2 / 7}
+    # Bigrams do not cross sentence boundaries (no VERB PRON)
+    assert sorted(stats.ngram_counts(snapshot, 2, 'upos', top=None)) == [
+        (('DET', 'NOUN'), 1), (('NOUN', 'VERB'), 1), (('PRON', 'NOUN'), 1), (('PRON', 'VERB'), 1)]
+
+
+def test_annotator_diff():
+    other = copy.deepcopy(CORPUS)
+    other[2]['tokens'][0]['tags'] = ['PRON']
+    diff = stats.annotator_diff(build_snapshot(CORPUS), build_snapshot(other))
+    assert (diff['sentences'], diff['tokens']) == (3, 7)
+    assert diff['upos_agreement'] == diff['tag_agreement'] == 6 / 7
+    assert diff['disagreements'] == [(('DET', 'PRON'), 1)]
+
+
+def test_empty_corpus(tmp_path):
+    snapshot = load_snapshot(write_snapshot(build_snapshot([]), str(tmp_path / 'columns')))
+    assert (snapshot.num_sentences, snapshot.num_tokens) == (0, 0)
+    assert stats.tag_frequencies(snapshot) == [] and stats.lemma_frequencies(snapshot) == []
+    assert stats.ambiguity_rate(snapshot) == {'type_ambiguity': 0.0, 'token_ambiguity': 0.0}
+    assert stats.ngram_counts(snapshot, 2) == []
+    summary = stats.summary(snapshot)
+    assert (summary['sentences'], summary['tokens'], summary['top_tags']) == (0, 0, [])
+    assert stats.annotator_diff(snapshot, snapshot)['tokens'] == 0
@@ -0,0 +1,78 @@
+"""
+tests/test_corpus_index.py
+
+Tests for the corpus inverted index, its incremental updates and KWIC queries.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.index import CorpusIndex
+
+CORPUS = [
+    {'text': 'Mən kitab yazdım', 'tokens': [
+        {'word': 'Mən', 'lemma': 'mən', 'tags': ['PRON']},
+        {'word': 'kitab', 'lemma': 'kitab', 'tags': ['NOUN']},
+        {'word': 'yazdım', 'lemma': 'yaz', 'tags': ['VERB', 'PAST', 'POSS1SG']}]},
+    {'text': 'O yazmadı', 'tokens': [
+        {'word': 'O', 'lemma': 'o', 'tags': ['PRON']},
+        {'word': 'yazmadı', 'lemma': 'yaz', 'tags': ['VERB', 'NEG', 'PAST']}]},
+]
+
+
+def test_queries_and_kwic(tmp_path):
+    index = CorpusIndex.build(CORPUS, str(tmp_path / 'corpus.idx'))
+    assert index.search('lemma:yaz').tolist() == [2, 4]
+    assert index.search('lemma:yaz AND NOT tag:NEG').tolist() == [2]
+    assert index.search('word:mən OR word:o').tolist() == [0, 3]
+    assert index.match('VERB+NEG+PAST').tolist() == [4]
+    assert index.match('VERB+PAST+NEG').tolist() == []
+    assert index.sequence(['upos:NOUN', 'lemma:yaz']).tolist() == [1]
+    assert index.sequence(['lemma:yaz', 'upos:PRON']).tolist() == []  # crosses a sentence boundary
+    line = index.concordance('lemma:kitab >> upos:VERB', width=1)[0]
+    assert (line['left'], line['keyword'], line['right']) == ('Mən', 'kitab yazdım', '')
+
+
+def test_incremental_journal(tmp_path):
+    path = str(tmp_path / 'corpus.idx')
+    CorpusIndex.build(CORPUS[:1], path).close()
+    index = CorpusIndex.open(path)
+    index.add_entries(CORPUS[1:])
+    reopened = CorpusIndex.open(path)
+    assert reopened.journal_size == 1
+    assert reopened.search('tag:NEG').tolist() == [4]
+    assert reopened.sentences(reopened.search('lemma:yaz')) == [0, 1]
+    reopened.compact()
+    assert CorpusIndex.open(path).search('upos:PRON').tolist() == [0, 3]
+
+
+def test_edited_corpus_is_reindexed(tmp_path, monkeypatch):
+    import db.corpus
+    import db.index
+    from db.index import get_index, update_index
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    monkeypatch.setattr(db.index, '_index', None)
+    path = str(tmp_path / 'corpus.idx')
+    corpus = [dict(e) for e in CORPUS]
+    db.corpus.save_corpus(corpus)
+    assert get_index(path=path).search('lemma:kitab').tolist() == [1]
+
+    # Append through the hook: journaled, no rebuild
+    stamp = db.index.corpus_stamp()
+    corpus.append({'text': 'Ev', 'tokens': [{'word': 'Ev', 'lemma': 'ev', 'tags': ['NOUN']}]})
+    db.corpus.save_corpus(corpus)
+    update_index(corpus[-1:], corpus, stamp, path=path)
+    index = get_index(path=path)
+    assert index.journal_size == 1 and index.search('lemma:ev').tolist() == [5]
+
+    # Replace a sentence in place (same number of sentences): the index must not serve it stale
+    corpus[1] = {'text': 'O qaçmadı', 'tokens': [
+        {'word': 'O', 'lemma': 'o', 'tags': ['PRON']},
+        {'word': 'qaçmadı', 'lemma': 'qaç', 'tags': ['VERB', 'NEG', 'PAST']}]}
+    db.corpus.save_corpus(corpus)
+    index = get_index(path=path)
+    assert index.search('lemma:yaz').tolist() == [2]
+    assert index.search('lemma:qaç').tolist() == [4]
+
+    # A fresh process opening the index finds it in sync
+    monkeypatch.setattr(db.index, '_index', None)
+    assert get_index(path=path).fingerprint == db.index.corpus_fingerprint(corpus)
@@ -0,0 +1,70 @@
+"""
+tests/test_evaluation.py
+
+Evaluation harness report on a tiny gold set, against hand-checked pipeline answers.
+"""
+import sys
+import os
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+import core.engine
+import core.evaluation
+import core.resources
+import db.corpus
+from core.evaluation import evaluate
+
+# Answers of the simulated analyzer over data/ (no FST binary), an empty corpus and no tag model:
+# fst: kitab, gəldi right; alma -> al+NEG wrong. lexical: və right. guesser: qələmlər right,
+# qwzxv -> NOUN+Case=Nom+Number=Sing (right lemma and UPOS, plain NOUN only as second candidate)
+GOLD = [
+    [{'word': 'kitab', 'lemma': 'kitab', 'tags': ['NOUN']},
+     {'word': 'alma', 'lemma': 'alma', 'tags': ['NOUN']},
+     {'word': 'və', 'lemma': 'və', 'tags': ['CONJ']}],
+    [{'word': 'gəldi', 'lemma': 'gəl', 'tags': ['VERB', 'PAST']},
+     {'word': 'qələmlər', 'lemma': 'qələm', 'tags': ['NOUN', 'PLUR']},
+     {'word': 'qwzxv', 'lemma': 'qwzxv', 'tags': ['NOUN']}],
+]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # no trained tag predictor
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    monkeypatch.setattr(core.resources, 'FST_PATH', str(tmp_path / 'az.hfst'))
+    monkeypatch.setattr(core.engine, 'resources',
+                        core.resources.ResourceManager(artifact_dir=str(tmp_path / 'cache'), fullform=False))
+
+
+def test_report_accuracy(pipeline):
+    level = logging.getLogger().level
+    report = evaluate(GOLD, workers=1, include_tagger=False)
+    assert (report['sentences'], report['tokens']) == (2, 6)
+    assert report['accuracy'] == {'lemma': 0.8333, 'upos': 0.8333, 'tags': 0.6667, 'tags_in_candidates': 0.8333}
+    stages = report['stages']
+    assert {stage: s['tokens'] for stage, s in stages.items()} == {'fst': 3, 'lexical': 1, 'guesser': 2}
+    assert stages['fst']['accuracy'] == {'lemma': 0.6667, 'upos': 0.6667, 'tags': 0.6667}
+    assert stages['lexical']['accuracy'] == {'lemma': 1.0, 'upos': 1.0, 'tags': 1.0}
+    assert stages['guesser']['accuracy'] == {'lemma': 1.0, 'upos': 1.0, 'tags': 0.5}
+    assert report['unk_rate'] == 0.0
+    assert set(report['latency_ms']) == {'p50', 'p90', 'p95', 'p99', 'mean'}
+    assert set(report['stage_latency_ms']) == {'fst', 'lexical', 'guesser'}
+    assert 'tagger' not in report
+    # In-process evaluation leaves the caller's logging alone
+    assert logging.getLogger().level == level
+
+
+def _worker_state():
+    return (logging.getLogger().level,
+            any(t.name == 'resource-watcher' for t in threading.enumerate()))
+
+
+def test_pool_workers(pipeline):
+    # Workers are forked, so they see the same patched resources
+    assert evaluate(GOLD, workers=2, include_tagger=False)['accuracy'] == \
+        evaluate(GOLD, workers=1, include_tagger=False)['accuracy']
+    # Pool workers are quiet and do not start the resource watcher
+    with ProcessPoolExecutor(max_workers=1, initializer=core.evaluation._init_worker) as pool:
+        assert pool.submit(_worker_state).result() == (logging.WARNING, False)
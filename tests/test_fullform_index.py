@@ -0,0 +1,29 @@
+"""
+tests/test_fullform_index.py
+
+Tests for the generator-backed full-form index and its use by FSTEngine.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.fst_engine import FSTEngine
+from core.fullform_index import FullFormIndex, build_fullform_index
+
+
+def test_index_lookup(tmp_path):
+    path = str(tmp_path / 'fullform.idx')
+    count = build_fullform_index(path, max_depth=2)
+    index = FullFormIndex(path)
+    assert len(index) == count
+    analyses = index.lookup('yazdı')
+    # Generator and lexc agree on yazdı: one analysis, in the analyzer's format
+    assert analyses == [{'lemma': 'yaz', 'tags': ['VERB', 'PAST'], 'analysis': 'yaz+dı'}]
+    # Forms only the lexc lexicon produces are normalized the same way
+    assert index.lookup('kitablardə') == [{'lemma': 'kitab', 'tags': ['NOUN', 'PLUR', 'LOC'], 'analysis': 'kitab+lar+də'}]
+    for surface in ('kitablar', 'gözəldir', 'evdə'):
+        keys = [(a['lemma'], tuple(a['tags'])) for a in index.lookup(surface)]
+        assert len(keys) == len(set(keys)) and all(k[1][0] in ('VERB', 'NOUN', 'ADJ') for k in keys)
+    assert index.lookup('qqq') is None
+    engine = FSTEngine(fst_bin_path=None, fullform_index=index)
+    assert engine.analyze('yazdı') == analyses
+    index.close()
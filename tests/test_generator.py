@@ -0,0 +1,47 @@
+"""
+tests/test_generator.py
+
+Tests for the morphological generator: per-POS affix chains, tag validation and its agreement
+with the simulated analyzer.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.fst_engine import FSTEngine
+from core.generator import MorphGenerator
+
+
+def test_generate_and_validate():
+    gen = MorphGenerator()
+    assert gen.generate('kitab', ['NOUN', 'PLUR', 'LOC']) == ['kitablarda']
+    assert gen.generate('yaz', ['VERB', 'PAST', 'PLUR']) == ['yazdılar']
+    assert gen.validate('gəlmədi', 'gəl', ['VERB', 'NEG', 'PAST'])
+    assert not gen.validate('gəldimə', 'gəl', ['VERB', 'PAST'])
+
+
+def test_invalid_tag_sequences():
+    gen = MorphGenerator()
+    assert gen.generate('kitab', ['NOUN', 'PAST']) == []          # nouns take no tense
+    assert gen.generate('yaz', ['VERB', 'PLUR', 'LOC']) == []     # verbs take no case
+    assert gen.generate('yaz', ['VERB', 'PLUR']) == []            # verb plural needs a tense
+    assert gen.generate('kitab', ['NOUN', 'LOC', 'PLUR']) == []   # wrong affix order
+    assert gen.generate('kitab', ['VERB', 'PAST']) == []          # POS mismatch
+
+
+def test_paradigms_follow_pos():
+    gen = MorphGenerator()
+    verb_tags = {tag for row in gen.paradigm('yaz') for tag in row['tags'][1:]}
+    noun_tags = {tag for row in gen.paradigm('kitab') for tag in row['tags'][1:]}
+    assert 'PAST' in verb_tags and not verb_tags & {'LOC', 'GEN', 'ACC', 'POSS3PL'}
+    assert 'LOC' in noun_tags and not noun_tags & {'PAST', 'FUT', 'NEG', 'CAUS'}
+    assert all(row['tags'][1:] in ([], ['CAUS']) for row in gen.paradigm('gözəl'))
+    assert gen.paradigm('yaz') is gen.paradigm('yaz')
+
+
+def test_paradigm_rows_analyze_back():
+    gen = MorphGenerator()
+    engine = FSTEngine(fst_bin_path=None)
+    for lemma in ('gəl', 'ev', 'böyük'):
+        for row in gen.paradigm(lemma):
+            analyses = [(a['lemma'], list(a['tags'])) for a in engine.analyze(row['surface'])]
+            assert (row['lemma'], row['tags']) in analyses, row
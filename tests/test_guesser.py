@@ -0,0 +1,96 @@
+"""
+tests/test_guesser.py
+
+Tests for the suffix-trie unknown-word guesser and the pipeline's per-stage counters.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from core.guesser import SuffixGuesser, build_guesser, build_lexicon_guesser
+
+
+def _plural_guesser(**kwargs):
+    guesser = SuffixGuesser(**kwargs)
+    for lemma in ('kitab', 'adam', 'uşaq', 'qapı', 'dost', 'bağ'):
+        guesser.add(lemma + 'lar', lemma, ['NOUN', 'PLUR'], f"{lemma}+lar")
+        guesser.add(lemma, lemma, ['NOUN'], lemma)
+    guesser.add('yazdılar', 'yaz', ['VERB', 'PAST', 'PLUR'], 'yaz+dı+lar')
+    return guesser
+
+
+def test_ranking_on_known_suffix():
+    guesses = _plural_guesser().guess('masalar')
+    assert guesses[0]['lemma'] == 'masa' and guesses[0]['tags'] == ['NOUN', 'PLUR']
+    assert guesses[0]['analysis'] == 'masa+lar'
+    assert guesses[0]['confidence'] >= 0.5
+    assert [g['confidence'] for g in guesses] == sorted((g['confidence'] for g in guesses), reverse=True)
+
+
+def test_low_confidence_without_evidence():
+    guesser = _plural_guesser()
+    assert guesser.guess('qwzx') == []
+    # A single known word sharing the last letter is weak evidence
+    weak = guesser.guess('xyzb')
+    assert weak and weak[0]['confidence'] < 0.2
+    assert all(g['confidence'] < 0.3 for g in build_guesser(use_model=False).guess('xyz'))
+
+
+class _FixedModel:
+    def __init__(self, label):
+        self.classes_ = np.array([label, 'X'])
+
+    def predict_proba(self, words):
+        return np.array([[0.9, 0.1] for _ in words])
+
+
+def test_model_looked_up_per_call():
+    current = {'model': _FixedModel('ADJ')}
+    guesser = _plural_guesser(model_loader=lambda: current['model'])
+    assert guesser.guess('qwzx', top_k=1)[0]['tags'] == ['ADJ']
+    current['model'] = _FixedModel('ADV')  # a retrained model is picked up without rebuilding
+    assert guesser.guess('qwzx', top_k=1)[0]['tags'] == ['ADV']
+    current['model'] = None
+    assert guesser.guess('qwzx') == []
+
+
+def test_stage_stats():
+    from core.engine import analyze_word, get_stage_stats
+    before = get_stage_stats()
+    analyze_word('qwzxvq')
+    after = get_stage_stats()
+    assert sum(after.values()) == sum(before.values()) + 1
+    fallback = lambda stats: stats.get('guesser', 0) + stats.get('unk', 0)
+    assert fallback(after) == fallback(before) + 1
+    assert set(after) <= {'fst', 'gnn', 'lexical', 'guesser', 'unk'}
+
+
+def test_legacy_corpus_entries():
+    from core.guesser import _corpus_forms
+    from db.index import entry_tokens
+    corpus = [{'word': 'yazdı', 'analysis': 'yaz+PAST'}, {'word': 'qələmlər', 'analysis': 'qələm+PLUR'},
+              {'word': 'kitablar', 'analysis': 'kitab+NOUN+PLUR'}]
+    # Converted to the analyzer's format with the root's POS; unknown roots are left out
+    assert list(_corpus_forms(corpus)) == [('yazdı', [{'lemma': 'yaz', 'tags': ['VERB', 'PAST']}]),
+                                           ('kitablar', [{'lemma': 'kitab', 'tags': ['NOUN', 'PLUR']}])]
+    assert entry_tokens(corpus[1]) == [{'word': 'qələmlər', 'lemma': 'qələm', 'tags': []}]
+    assert entry_tokens(corpus[1], {'qələm': {'pos': 'NOUN'}})[0]['tags'] == ['NOUN', 'PLUR']
+
+
+def test_guesser_over_base_matches_flat_guesser():
+    base = SuffixGuesser()
+    for lemma in ('kitab', 'adam', 'uşaq'):
+        base.add(lemma + 'lar', lemma, ['NOUN', 'PLUR'], f"{lemma}+lar")
+    layered = SuffixGuesser(base=base)
+    flat = SuffixGuesser()
+    for guesser in (layered, flat):
+        guesser.add('yazdılar', 'yaz', ['VERB', 'PAST', 'PLUR'], 'yaz+dı+lar')
+        guesser.add('qapılar', 'qapı', ['NOUN', 'PLUR'], 'qapı+lar')
+    for lemma in ('kitab', 'adam', 'uşaq'):
+        flat.add(lemma + 'lar', lemma, ['NOUN', 'PLUR'], f"{lemma}+lar")
+    assert layered.size == flat.size == 5
+    for word in ('masalar', 'gəldilər', 'qwzx', 'lar'):
+        assert layered.guess(word) == flat.guess(word)
+    # build_guesser reuses a base instead of indexing the dictionary and paradigms again
+    lexicon = build_lexicon_guesser()
+    assert build_guesser(use_model=False, base=lexicon).base is lexicon
@@ -0,0 +1,97 @@
+"""
+tests/test_importers.py
+
+Round-trip tests: corpus -> exporter -> bulk importer -> identical corpus.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import pytest
+import db.corpus
+from db.importers import import_corpus, unknown_tags
+from export.exporter import export_to_conllu, export_to_jsonl, export_to_csv
+
+CORPUS = [
+    {'text': 'Mən kitab yazdım', 'tokens': [
+        {'word': 'Mən', 'lemma': 'mən', 'tags': ['PRON']},
+        {'word': 'kitab', 'lemma': 'kitab', 'tags': ['NOUN']},
+        {'word': 'yazdım', 'lemma': 'yaz', 'tags': ['VERB', 'PAST', 'Person=1']}]},
+    {'text': 'O, "gəlmədi"', 'tokens': [
+        {'word': 'O', 'lemma': 'o', 'tags': ['PRON']},
+        {'word': ',', 'lemma': ',', 'tags': []},
+        {'word': 'gəlmədi', 'lemma': 'gəl', 'tags': ['VERB', 'NEG', 'PAST']}]},
+    {'text': 'Kitablar', 'tokens': [
+        {'word': 'Kitablar', 'lemma': 'kitab', 'tags': ['NOUN', 'PL']}]},
+]
+
+
+@pytest.mark.parametrize('export, ext', [(export_to_conllu, 'conllu'), (export_to_jsonl, 'jsonl'), (export_to_csv, 'csv')])
+def test_round_trip(tmp_path, monkeypatch, export, ext):
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'source.json'))
+    db.corpus.save_corpus(CORPUS)
+    path = export(str(tmp_path / f'corpus.{ext}'))
+
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'imported.json'))
+    report = import_corpus(path, batch_size=2)
+    assert report['imported'] == 3 and report['batches'] == 2
+    assert db.corpus.load_corpus() == CORPUS
+
+    # Re-importing the same file only finds duplicates
+    report = import_corpus(path)
+    assert (report['imported'], report['duplicates']) == (0, 3)
+
+
+def test_strict_rejects_unknown_tags(tmp_path, monkeypatch):
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'imported.json'))
+    path = tmp_path / 'bad.jsonl'
+    path.write_text('{"text": "x", "tokens": [{"word": "x", "lemma": "x", "tags": ["BOGUS"]}]}\n', encoding='utf-8')
+    report = import_corpus(str(path), strict=True)
+    assert (report['imported'], report['invalid'], report['unknown_tags']) == (0, 1, ['BOGUS'])
+
+
+def test_strict_accepts_ud_upos(tmp_path, monkeypatch):
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'imported.json'))
+    path = tmp_path / 'punct.conllu'
+    path.write_text('# text = O, gəlmədi.\n'
+                    '1\tO\to\tPRON\t_\t_\t_\t_\t_\t_\n'
+                    '2\t,\t,\tPUNCT\t_\t_\t_\t_\t_\t_\n'
+                    '3\tgəlmədi\tgəl\tVERB\t_\tNEG|PAST\t_\t_\t_\t_\n'
+                    '4\t.\t.\tPUNCT\t_\t_\t_\t_\t_\t_\n\n', encoding='utf-8')
+    report = import_corpus(str(path), strict=True)
+    assert (report['imported'], report['invalid'], report['unknown_tags']) == (1, 0, [])
+    assert [t['tags'] for t in db.corpus.load_corpus()[0]['tokens']] == [['PRON'], ['PUNCT'], ['VERB', 'NEG', 'PAST'], ['PUNCT']]
+    # UPOS tags are only accepted in the UPOS position
+    assert unknown_tags({'tokens': [{'word': 'x', 'tags': ['NOUN', 'PUNCT']}]}, {'NOUN'}) == {'PUNCT'}
+
+
+def test_failed_batch_stops_import(tmp_path, monkeypatch):
+    indexed = []
+    monkeypatch.setattr(db.corpus, 'update_index', lambda entries, *args, **kwargs: indexed.append(len(entries)))
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'imported.json'))
+    path = tmp_path / 'corpus.jsonl'
+    path.write_text(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in CORPUS), encoding='utf-8')
+    save = db.corpus.save_corpus
+
+    def save_once(corpus):
+        if os.path.exists(db.corpus.CORPUS_PATH):
+            raise OSError('disk full')
+        save(corpus)
+    monkeypatch.setattr(db.corpus, 'save_corpus', save_once)
+
+    report = import_corpus(str(path), batch_size=1)
+    assert (report['imported'], report['failed'], report['batches'], report['read']) == (1, 1, 1, 2)
+    assert report['error'] == 'disk full'
+    # The index only saw the batch that was saved
+    assert indexed == [1] and db.corpus.load_corpus() == CORPUS[:1]
+
+
+def test_save_corpus_raises(tmp_path, monkeypatch):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(blocker / 'corpus.json'))
+    with pytest.raises(OSError):
+        db.corpus.add_entry('x', [])
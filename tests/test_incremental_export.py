@@ -0,0 +1,80 @@
+"""
+tests/test_incremental_export.py
+
+Incremental (watermarked) exports must be byte-identical to a full export after appends,
+in-place edits and deletions.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import copy
+import pytest
+import db.corpus
+import export.exporter
+from export.exporter import (export_to_conllu, export_to_jsonl, export_to_csv,
+                             _render_conllu, _render_jsonl, _render_csv, _csv_rows)
+from export.incremental import load_watermark
+
+CSV_HEADER = _csv_rows([["sentence", "token", "lemma", "upos", "features"]])
+FORMATS = [(export_to_conllu, _render_conllu, 'conllu', ''),
+           (export_to_jsonl, _render_jsonl, 'jsonl', ''),
+           (export_to_csv, _render_csv, 'csv', CSV_HEADER)]
+
+
+def _sentence(i):
+    return {'text': f'Mən {i} kitab yazdım', 'tokens': [
+        {'word': 'Mən', 'lemma': 'mən', 'tags': ['PRON']},
+        {'word': str(i), 'lemma': str(i), 'tags': ['NUM']},
+        {'word': 'kitab', 'lemma': 'kitab', 'tags': ['NOUN']},
+        {'word': 'yazdım', 'lemma': 'yaz', 'tags': ['VERB', 'PAST', 'POSS1SG']}]}
+
+
+def _full(corpus, render, header):
+    return header + ''.join(render(i + 1, entry) for i, entry in enumerate(corpus))
+
+
+@pytest.mark.parametrize('export, render, fmt, header', FORMATS)
+def test_incremental_matches_full_export(tmp_path, monkeypatch, export, render, fmt, header):
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    path = str(tmp_path / f'corpus.{fmt}')
+    corpus = [_sentence(i) for i in range(5)]
+
+    def run():
+        db.corpus.save_corpus(corpus)
+        export(path, incremental=True)
+        with open(path, encoding='utf-8', newline='') as f:
+            assert f.read() == _full(corpus, render, header)
+        wm = load_watermark(path, fmt)
+        assert wm['count'] == len(corpus) and len(wm['hashes']) == 12 * len(corpus)
+
+    run()
+    corpus += [_sentence(5), _sentence(6)]  # append
+    run()
+    corpus[3] = copy.deepcopy(corpus[3])
+    corpus[3]['tokens'][2]['tags'] = ['NOUN', 'ACC']  # in-place edit
+    run()
+    del corpus[1]  # delete
+    run()
+    del corpus[-2:]  # truncate at the end
+    run()
+
+
+def test_incremental_keeps_prefix(tmp_path, monkeypatch):
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    path = str(tmp_path / 'corpus.conllu')
+    corpus = [_sentence(i) for i in range(4)]
+    db.corpus.save_corpus(corpus)
+    export_to_conllu(path)
+    calls = []
+    monkeypatch.setattr(export.exporter, '_render_conllu', lambda i, e: calls.append(i) or _render_conllu(i, e))
+
+    # Unchanged store: nothing is hashed or rendered
+    export_to_conllu(path, incremental=True)
+    assert calls == []
+
+    corpus[2] = _sentence(9)
+    db.corpus.save_corpus(corpus + [_sentence(4)])
+    export_to_conllu(path, incremental=True)
+    assert calls == [3, 4, 5]
@@ -0,0 +1,32 @@
+"""
+tests/test_morphotactics.py
+
+Tests for vowel-harmony template expansion and the harmony-aware simulated analyzer.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.fst_engine import FSTEngine
+from core.generator import MorphGenerator
+from core.morphotactics import harmony_context, realize
+
+
+def test_template_variants():
+    assert [realize('DI', harmony_context(stem)) for stem in ('yaz', 'gəl', 'qu', 'gör')] == ['dı', 'di', 'du', 'dü']
+    assert realize('(y)AcAQ', harmony_context('oxu')) == 'yacaq'
+    assert realize('(y)AcAQ', harmony_context('gəl')) == 'əcək'
+    assert realize('(I)m', harmony_context('kitab')) == 'ım'
+    assert realize('(I)m', harmony_context('qapı')) == 'm'
+
+
+def test_harmonic_analyses():
+    engine = FSTEngine(fst_bin_path=None)
+    for word, analysis in [("gəldi", "gəl+di"), ("evlər", "ev+lər"), ("gələcək", "gəl+əcək"),
+                           ("oxuyacaq", "oxu+yacaq"), ("gördüm", "gör+dü+m")]:
+        assert analysis in [r['analysis'] for r in engine.analyze(word)]
+
+
+def test_generator_harmony():
+    gen = MorphGenerator()
+    assert gen.generate('ev', ['NOUN', 'PLUR', 'LOC']) == ['evlərdə']
+    assert gen.generate('gəl', ['VERB', 'NEG', 'PAST']) == ['gəlmədi']
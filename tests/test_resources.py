@@ -0,0 +1,136 @@
+"""
+tests/test_resources.py
+
+Tests for hot reloading of analyzer resources (core/resources.py).
+"""
+import sys
+import os
+import gc
+import json
+import shutil
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import core.resources as resources
+import db.corpus
+from core.fullform_index import build_fullform_index
+from core.resources import ResourceManager
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _setup(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(BASE_DIR, 'data'), tmp_path / 'data', ignore=shutil.ignore_patterns('__pycache__'))
+    (tmp_path / 'dictionaries').mkdir()
+    shutil.copy(os.path.join(BASE_DIR, 'dictionaries', 'az.json'), tmp_path / 'dictionaries')
+    for name, path in [('ROOTS_PATH', 'data/roots.json'), ('AFFIXES_PATH', 'data/affixes.json'),
+                       ('RULES_PATH', 'data/rules.json'), ('TAG_VOCAB_PATH', 'data/tag_vocab.json'),
+                       ('FST_PATH', 'fst/az.hfst'), ('LEXC_PATH', 'fst/az.lexc'), ('GNN_MODEL_PATH', 'models/gnn.pt'),
+                       ('DICTIONARY_DIR', 'dictionaries')]:
+        monkeypatch.setattr(resources, name, str(tmp_path / path))
+    monkeypatch.setattr(resources, 'set_lexicons', lambda lexicons: None)
+    return ResourceManager(artifact_dir=str(tmp_path / 'cache'), fullform=False)
+
+
+def test_reload_swaps_snapshot(tmp_path, monkeypatch):
+    manager = _setup(tmp_path, monkeypatch)
+    old = manager.current()
+    assert old.fst_engine.analyze('qələmlər')[0]['tags'] == ['UNK']
+    assert not manager.check()  # nothing changed
+
+    roots_path = tmp_path / 'data' / 'roots.json'
+    roots = json.loads(roots_path.read_text(encoding='utf-8'))
+    roots['qələm'] = {'pos': 'NOUN', 'gloss': 'pen'}
+    roots_path.write_text(json.dumps(roots, ensure_ascii=False), encoding='utf-8')
+    assert manager.check()
+    new = manager.current()
+    assert new.version == old.version + 1
+    assert new.fst_engine.analyze('qələmlər')[0]['analysis'] == 'qələm+lər'
+    # The old snapshot is untouched; unchanged inputs reuse their artifacts
+    assert old.fst_engine.analyze('qələmlər')[0]['tags'] == ['UNK']
+    assert new.lexicons['az'] is old.lexicons['az'] and new.gnn_disamb is old.gnn_disamb
+
+
+def test_failed_rebuild_keeps_snapshot(tmp_path, monkeypatch):
+    manager = _setup(tmp_path, monkeypatch)
+    old = manager.current()
+    (tmp_path / 'data' / 'rules.json').write_text('{broken', encoding='utf-8')
+    assert not manager.check()
+    assert manager.current() is old
+
+
+def test_prune_keeps_live_artifacts(tmp_path, monkeypatch):
+    manager = _setup(tmp_path, monkeypatch)
+    manager.artifact_grace = 0
+    old = manager.current()
+    old_file = old.lexicons['az'].path
+    dict_path = tmp_path / 'dictionaries' / 'az.json'
+    dictionary = json.loads(dict_path.read_text(encoding='utf-8'))
+    dictionary['qələm'] = {'POS': 'NOUN', 'Features': {}}
+    dict_path.write_text(json.dumps(dictionary, ensure_ascii=False), encoding='utf-8')
+    assert manager.check()
+    new = manager.current()
+    assert new.lexicons['az'].path != old_file and old_file in old.files
+
+    # Files of a snapshot still in use survive; once it is dropped they are pruned
+    assert manager.prune() == []
+    del old
+    gc.collect()
+    assert manager.prune() == [old_file]
+    assert not os.path.exists(old_file) and os.path.exists(new.lexicons['az'].path)
+
+    # Files used recently (e.g. by another process) are kept for the grace period
+    stray = tmp_path / 'cache' / 'lexicon-az-other.bin'
+    stray.write_bytes(b'')
+    manager.artifact_grace = 3600
+    assert manager.prune() == [] and stray.exists()
+
+
+def test_stale_fullform_index_is_not_used(tmp_path, monkeypatch):
+    manager = _setup(tmp_path, monkeypatch)
+    index_path = str(tmp_path / 'data' / 'fullform.idx')
+    monkeypatch.setattr(resources, 'FULLFORM_INDEX_PATH', index_path)
+    build_fullform_index(index_path, max_depth=1, include_lexc=False, input_key='stale')
+    manager = ResourceManager(artifact_dir=str(tmp_path / 'cache'), fullform=True)
+    # Served without the index while an up-to-date one is built in the background
+    first = manager.current()
+    assert first.fullform_index is None and first.fst_engine.analyze('yazdı')
+    manager.wait_fullform()
+    index = manager.current().fullform_index
+    # Rebuilt under cache/ with the settings of the built index, and published
+    assert manager.current().version == first.version + 1
+    assert index.path.startswith(str(tmp_path / 'cache')) and index.meta['max_depth'] == 1
+    # Another process finds the cached build
+    manager = ResourceManager(artifact_dir=str(tmp_path / 'cache'), fullform=True)
+    assert manager.current().fullform_index.path == index.path
+
+    build_fullform_index(index_path, max_depth=1, include_lexc=False,
+                         input_key=resources.fullform_inputs_key(resources.LEXC_PATH))
+    manager = ResourceManager(artifact_dir=str(tmp_path / 'cache'), fullform=True)
+    assert manager.current().fullform_index.path == index_path
+
+
+def test_guesser_follows_snapshot_and_corpus(tmp_path, monkeypatch):
+    manager = _setup(tmp_path, monkeypatch)
+    monkeypatch.setattr(db.corpus, 'CORPUS_PATH', str(tmp_path / 'corpus.json'))
+    monkeypatch.setattr(db.corpus, 'update_index', lambda *args, **kwargs: None)
+    old = manager.current()
+    guesser = old.get_guesser()
+    assert old.get_guesser() is guesser
+
+    # Built from the snapshot's own roots: a new root adds its paradigm
+    roots_path = tmp_path / 'data' / 'roots.json'
+    roots = json.loads(roots_path.read_text(encoding='utf-8'))
+    roots['qələm'] = {'pos': 'NOUN', 'gloss': 'pen'}
+    roots_path.write_text(json.dumps(roots, ensure_ascii=False), encoding='utf-8')
+    assert manager.check()
+    new = manager.current()
+    assert new.get_guesser().size > guesser.size
+    assert old.get_guesser() is guesser
+
+    # The corpus layer is rebuilt in the background when the corpus store changes, over the
+    # same dictionary and paradigm forms; the previous guesser answers meanwhile
+    before = new.get_guesser()
+    db.corpus.add_entry('Dəftərlər', [{'word': 'Dəftərlər', 'lemma': 'dəftər', 'tags': ['NOUN', 'PLUR']}])
+    assert new.get_guesser() is before
+    new.wait_guesser()
+    after = new.get_guesser()
+    assert after.size == before.size + 1 and after.base is before.base
@@ -0,0 +1,114 @@
+"""
+tests/test_training_scheduler.py
+
+Tests for incremental retraining and gated publishing of the tag predictor.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import numpy as np
+import core.models as models
+from core.training_scheduler import DEV_PATH, load_dev_set, publish, retrain, is_incremental
+from db.columnar import build_snapshot
+
+WORDS = [('kitab', 'NOUN'), ('kitablar', 'NOUN+PLUR'), ('yazdı', 'VERB+PAST'), ('oxudu', 'VERB+PAST'),
+         ('evdə', 'NOUN+LOC'), ('gəldi', 'VERB+PAST'), ('evlər', 'NOUN+PLUR'), ('masada', 'NOUN+LOC')]
+
+
+def make_corpus(n, words=WORDS):
+    return [{'text': ' '.join(w for w, _ in words),
+             'tokens': [{'word': w, 'tags': t.split('+')} for w, t in words]} for _ in range(n)]
+
+
+def test_full_then_delta_then_replay(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # model, dev set and status paths are relative
+    corpus = make_corpus(30)
+    dev = load_dev_set(corpus)
+    assert len(dev['indices']) == 3 and load_dev_set(corpus + make_corpus(10)) == dev  # frozen
+
+    result = retrain(corpus, 0, dev, epochs=3)
+    assert (result['mode'], result['published']) == ('full', True)
+    assert is_incremental(models.load_tag_predictor())
+
+    corpus += make_corpus(5)
+    result = retrain(corpus, 30, dev, epochs=3)
+    assert (result['mode'], result['new_examples'], result['published']) == ('delta', 5 * len(WORDS), True)
+    assert result['trained_entries'] == 35
+
+    corpus += make_corpus(5, [('kitabda', 'NOUN+LOC+POSS3PL')])
+    result = retrain(corpus, 35, dev, replay_size=20, epochs=3)
+    assert (result['mode'], result['new_classes'], result['published']) == ('replay', 1, True)
+    assert 'NOUN+LOC+POSS3PL' in models.load_tag_predictor().classes_
+
+
+class _ConstantModel:
+    """A fixed bad published model: tags every word NOUN."""
+    classes_ = np.array(['NOUN'])
+
+    def predict(self, X):
+        return np.array(['NOUN'] * len(X))
+
+
+def test_gate_publishes_better_and_rejects_worse(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    corpus = make_corpus(30)
+    dev = load_dev_set(corpus)
+
+    # Better candidate: a model trained on the corpus beats the constant model (1/8 on dev)
+    publish(_ConstantModel())
+    result = retrain(corpus, 0, dev, epochs=3)
+    assert result['previous_accuracy'] == 1 / len(WORDS) and result['dev_accuracy'] == 1.0
+    assert result['published'] and is_incremental(models.load_tag_predictor())
+    good = models.load_tag_predictor()
+
+    # Worse candidate: new entries that mislabel every word as NOUN+LOC drag it below the published model
+    corpus += make_corpus(40, [(w, 'NOUN+LOC') for w, _ in WORDS])
+    result = retrain(corpus, 30, dev, epochs=5)
+    assert result['mode'] == 'delta' and result['dev_accuracy'] < result['previous_accuracy'] == 1.0
+    assert not result['published'] and result['trained_entries'] == 30
+    published = models.load_tag_predictor()
+    assert list(published.predict(dev['X'])) == list(good.predict(dev['X'])) == dev['y']
+
+
+def test_blocking_training_holds_out_dev_set(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    held_out = [('qələmdə', 'NOUN+LOC'), ('qələmlər', 'NOUN+PLUR'), ('qələm', 'NOUN')]
+    corpus = make_corpus(30) + [{'text': 'dev', 'tokens': [{'word': w, 'tags': t.split('+')}]} for w, t in held_out]
+    monkeypatch.setattr(models, 'get_corpus', lambda: corpus)
+    os.makedirs(os.path.dirname(DEV_PATH))
+    with open(DEV_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'indices': [30, 31, 32], 'X': [w for w, _ in held_out], 'y': [t for _, t in held_out]}, f)
+    X, _ = models.prepare_dataset(exclude=[30, 31, 32])
+    assert not set(X) & {w for w, _ in held_out} and len(X) == 30 * len(WORDS)
+    trained = []
+    fit = models.Pipeline.fit
+    monkeypatch.setattr(models.Pipeline, 'fit', lambda self, X, y: trained.append(list(X)) or fit(self, X, y))
+    assert models.train_tag_predictor() is not None
+    assert trained == [X]
+    X_snap, _ = models.prepare_dataset(build_snapshot(corpus), exclude=[30, 31, 32])
+    assert X_snap == X
+
+
+def test_no_dev_set_or_publish_until_corpus_is_large_enough(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    corpus = make_corpus(8)
+    dev = load_dev_set(corpus)
+    assert dev == {'indices': [], 'X': [], 'y': []} and not os.path.exists(DEV_PATH)
+    result = retrain(corpus, 0, dev, epochs=3)
+    assert not result['published'] and result['trained_entries'] == 0
+    assert models.load_tag_predictor() is None
+
+    # Blocking training still trains on everything, without freezing a dev set
+    monkeypatch.setattr(models, 'get_corpus', lambda: corpus)
+    assert models.train_tag_predictor() is not None and not os.path.exists(DEV_PATH)
+    os.remove(models.MODEL_PATH)
+
+    # An empty dev set frozen by an earlier version is drawn again once the corpus has grown
+    with open(DEV_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'indices': [], 'X': [], 'y': []}, f)
+    corpus += make_corpus(22)
+    dev = load_dev_set(corpus)
+    assert len(dev['indices']) == 3 and dev['X'] and load_dev_set(corpus + make_corpus(10)) == dev
+    result = retrain(corpus, 0, dev, epochs=3)
+    assert result['published'] and result['dev_accuracy'] == 1.0
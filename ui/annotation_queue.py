@@ -0,0 +1,189 @@
+# ui/annotation_queue.py
+"""
+Annotation queue: a batch of raw sentences pre-analyzed in a background worker pool.
+Sentences are served from the cache of finished analyses, most uncertain first (GNN score margin,
+guesser confidence and, when a model is trained, tag predictor probability), so annotation effort
+goes where it helps the models most. Word analyses are cached per resource generation, so a
+published change to the analyzer resources is used for the words analyzed after it. Saves to the
+corpus run on a single background writer, in order, without blocking the caller; a save that
+fails is counted as failed.
+"""
+import heapq
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.tokenizer import prepare_input
+
+# word -> (analyses, uncertainty)
+Analyzer = Callable[[str], Tuple[List[Any], float]]
+
+
+def _default_analyzer() -> Analyzer:
+    from core.engine import analyze_word_with_uncertainty
+    return analyze_word_with_uncertainty
+
+
+def _default_version() -> Callable[[], Any]:
+    from core.engine import resources
+    return lambda: resources.current().version
+
+
+def _default_saver() -> Callable[[str, List[Dict[str, Any]]], None]:
+    from db.corpus import add_entry
+    return add_entry
+
+
+def tagger_uncertainty(words: List[str]) -> Optional[List[float]]:
+    """
+    1 - top class probability of the trained tag predictor for each word, or None without a model.
+    """
+    from core.models import load_tag_predictor
+    model = load_tag_predictor()
+    if model is None or not words:
+        return None
+    try:
+        return (1.0 - model.predict_proba(words).max(axis=1)).tolist()
+    except Exception as e:
+        logging.error(f"Tag predictor scoring failed: {e}")
+        return None
+
+
+class AnnotationQueue:
+    """
+    Pre-analyzes loaded sentences in the background and serves them by uncertainty.
+    """
+    def __init__(self, workers: int = 4, analyze: Optional[Analyzer] = None,
+                 save: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None, use_tagger: bool = True,
+                 version: Optional[Callable[[], Any]] = None):
+        self._analyze = analyze
+        # Returns the current resource generation; cached analyses of other generations are dropped.
+        # Defaults to the core.engine resource version with the default analyzer
+        self._version = version if version is not None or analyze is not None else _default_version()
+        self._save = save
+        self.use_tagger = use_tagger
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preannotate')
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='corpus-writer')
+        self._lock = threading.Condition()
+        self._loaded = 0
+        self._ready: List[Tuple[float, int]] = []  # heap of (-uncertainty, sentence id)
+        self._items: Dict[int, Dict[str, Any]] = {}  # finished analyses (the cache)
+        self._word_cache: Dict[str, Tuple[List[Any], float]] = {}
+        self._cache_version: Any = None
+        self._in_flight = 0
+        self._served = 0
+        self._saves = {'pending': 0, 'saved': 0, 'failed': 0}
+
+    def load(self, sentences: List[str]) -> int:
+        """
+        Add raw sentences to the queue and start pre-analyzing them. Returns the number added.
+        """
+        sentences = [s.strip() for s in sentences if s and s.strip()]
+        with self._lock:
+            start = self._loaded
+            self._loaded += len(sentences)
+            self._in_flight += len(sentences)
+        for i, sentence in enumerate(sentences, start=start):
+            self._pool.submit(self._preannotate, i, sentence).add_done_callback(self._log_failure)
+        logging.info(f"Queued {len(sentences)} sentences for pre-annotation")
+        return len(sentences)
+
+    def _analyze_word(self, word: str) -> Tuple[List[Any], float]:
+        version = self._version() if self._version is not None else None
+        with self._lock:
+            if version != self._cache_version:
+                self._word_cache = {}
+                self._cache_version = version
+            cache = self._word_cache
+        cached = cache.get(word)
+        if cached is None:
+            if self._analyze is None:
+                self._analyze = _default_analyzer()
+            # Stored in the cache of the generation read above, which is dropped if it has changed
+            cached = cache[word] = self._analyze(word)
+        return cached
+
+    def _preannotate(self, sentence_id: int, sentence: str) -> None:
+        rows, scores = [], []
+        try:
+            words = prepare_input(sentence)
+            for word in words:
+                analyses, uncertainty = self._analyze_word(word)
+                tags = analyses[0].get('tags', []) if analyses else []
+                rows.append([word, '+'.join(tags)])
+                scores.append(uncertainty)
+            tagger = tagger_uncertainty(words) if self.use_tagger else None
+            if tagger is not None:
+                scores = [max(a, b) for a, b in zip(scores, tagger)]
+        except Exception as e:
+            logging.error(f"Pre-annotation failed for '{sentence[:40]}': {e}")
+            scores = [1.0]
+        uncertainty = sum(scores) / len(scores) if scores else 0.0
+        item = {'id': sentence_id, 'text': sentence, 'rows': rows, 'uncertainty': uncertainty}
+        with self._lock:
+            self._items[sentence_id] = item
+            heapq.heappush(self._ready, (-uncertainty, sentence_id))
+            self._in_flight -= 1
+            self._lock.notify_all()
+
+    @staticmethod
+    def _log_failure(future: Future) -> None:
+        if future.exception() is not None:
+            logging.error(f"Pre-annotation worker failed: {future.exception()}")
+
+    def next(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        The most uncertain pre-analyzed sentence not served yet, as {'id', 'text', 'rows',
+        'uncertainty'}; rows are [word, tags] for the annotation table. Waits (up to timeout)
+        only if no analysis has finished yet; returns None when the queue is exhausted.
+        """
+        with self._lock:
+            if not self._lock.wait_for(lambda: self._ready or not self._in_flight, timeout):
+                return None
+            if not self._ready:
+                return None
+            _, sentence_id = heapq.heappop(self._ready)
+            self._served += 1
+            return self._items.pop(sentence_id)
+
+    def save(self, sentence: str, tokens: List[Dict[str, Any]]) -> Future:
+        """
+        Write an annotated sentence to the corpus on the background writer. Returns its future.
+        """
+        if self._save is None:
+            self._save = _default_saver()
+        with self._lock:
+            self._saves['pending'] += 1
+        return self._writer.submit(self._write, sentence, tokens)
+
+    def _write(self, sentence: str, tokens: List[Dict[str, Any]]) -> None:
+        try:
+            self._save(sentence, tokens)
+            outcome = 'saved'
+        except Exception as e:
+            logging.error(f"Failed to save annotation for '{sentence[:40]}': {e}")
+            outcome = 'failed'
+        with self._lock:
+            self._saves['pending'] -= 1
+            self._saves[outcome] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'loaded': self._loaded,
+                'analyzing': self._in_flight,
+                'ready': len(self._ready),
+                'served': self._served,
+                **self._saves
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop pre-annotation and flush pending saves (if wait).
+        """
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._in_flight = 0
+            self._lock.notify_all()
+        self._writer.shutdown(wait=wait)
@@ -4,11 +4,13 @@ Annotator UI for Azerbaijani morphological annotation.
 """
 import gradio as gr
 from core.tokenizer import prepare_input
-from core.engine import analyze_word
+from core.engine import analyze_word, resources
 from db.corpus import add_entry
+from ui.annotation_queue import AnnotationQueue
 
 
 import logging
+import threading
 
 def analyze_text(sentence: str):
     """
@@ -20,10 +22,7 @@ def analyze_text(sentence: str):
         table = []
         for tok in tokens:
             analyses = analyze_word(tok)
-            if analyses and "error" not in analyses[0]:
-                tags = analyses[0].get("tags", [])
-            else:
-                tags = []
+            tags = analyses[0].to_dict()["tags"] if analyses else []
             table.append([tok, "+".join(tags)])
         logging.info(f"Analyzed sentence: '{sentence[:40]}...' -> {table}")
         return table
@@ -32,16 +31,21 @@ def analyze_text(sentence: str):
         return []
 
 
+def _rows_to_tokens(data):
+    tokens = []
+    for row in data:
+        word, tag_str = row
+        tags = tag_str.split("+") if tag_str else []
+        tokens.append({"word": word, "tags": tags})
+    return tokens
+
+
 def save_to_corpus(sentence: str, data):
     """
     Save edited annotations to corpus. Logs the operation and errors.
     """
     try:
-        tokens = []
-        for row in data:
-            word, tag_str = row
-            tags = tag_str.split("+") if tag_str else []
-            tokens.append({"word": word, "tags": tags})
+        tokens = _rows_to_tokens(data)
         add_entry(sentence, tokens)
         logging.info(f"Saved annotation for: '{sentence[:40]}...' with {len(tokens)} tokens.")
         return "Annotation saved to corpus."
@@ -50,21 +54,117 @@ def save_to_corpus(sentence: str, data):
         return "Failed to save annotation."
 
 
+# Annotation queue mode: sentences pre-analyzed in the background, most uncertain first.
+# Created on first use, so importing this module starts no threads.
+_queue = None
+_queue_lock = threading.Lock()
+# Seconds a request waits for the next pre-analyzed sentence
+NEXT_TIMEOUT = 1.0
+
+
+def get_queue() -> AnnotationQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = AnnotationQueue()
+        return _queue
+
+
+def close_queue() -> None:
+    """
+    Stop the annotation queue, if it was started, after flushing its pending saves.
+    """
+    global _queue
+    with _queue_lock:
+        queue, _queue = _queue, None
+    if queue is not None:
+        queue.close()
+
+
+def _queue_status(note: str = "") -> str:
+    stats = get_queue().stats()
+    summary = (f"{stats['ready']} ready, {stats['analyzing']} analyzing, {stats['served']} served; "
+               f"saves: {stats['pending']} pending, {stats['saved']} saved, {stats['failed']} failed")
+    return f"{note} {summary}".strip()
+
+
+def next_queued():
+    """
+    Show the next queued sentence with its pre-computed analysis. Waits at most NEXT_TIMEOUT
+    seconds for one to finish; if none has, says the queue is still analyzing.
+    """
+    queue = get_queue()
+    item = queue.next(timeout=NEXT_TIMEOUT)
+    if item is None:
+        if queue.stats()["analyzing"]:
+            return "", [], _queue_status("Still analyzing; click Skip to check again.")
+        return "", [], _queue_status("Queue is empty.")
+    return item["text"], item["rows"], _queue_status(f"Uncertainty {item['uncertainty']:.2f}.")
+
+
+def load_queue(text: str):
+    """
+    Queue one sentence per line and show the first one ready.
+    """
+    try:
+        count = get_queue().load(text.splitlines())
+        logging.info(f"Loaded {count} sentences into the annotation queue.")
+        return next_queued()
+    except Exception as e:
+        logging.error(f"Failed to load annotation queue: {e}")
+        return "", [], f"Failed to load queue: {e}"
+
+
+def save_and_next(sentence: str, data):
+    """
+    Save the current annotation in the background and show the next queued sentence.
+    """
+    if sentence:
+        get_queue().save(sentence, _rows_to_tokens(data))
+    return next_queued()
+
+
 with gr.Blocks() as app:
     gr.Markdown("## Azerbaijani Morphological Annotator")
-    sentence_input = gr.Textbox(label="Enter sentence", placeholder="Type Azerbaijani text here...")
-    analyze_btn = gr.Button("Analyze")
-    token_table = gr.Dataframe(
-        headers=["Word", "Tags"],
-        row_count=(1, "dynamic"),
-        col_count=2,
-        interactive=True
-    )
-    save_btn = gr.Button("Save to Corpus")
-    status = gr.Textbox(label="Status", interactive=False)
-
-    analyze_btn.click(analyze_text, inputs=sentence_input, outputs=token_table)
-    save_btn.click(save_to_corpus, inputs=[sentence_input, token_table], outputs=status)
+    with gr.Tab("Single sentence"):
+        sentence_input = gr.Textbox(label="Enter sentence", placeholder="Type Azerbaijani text here...")
+        analyze_btn = gr.Button("Analyze")
+        token_table = gr.Dataframe(
+            headers=["Word", "Tags"],
+            row_count=(1, "dynamic"),
+            col_count=2,
+            interactive=True
+        )
+        save_btn = gr.Button("Save to Corpus")
+        status = gr.Textbox(label="Status", interactive=False)
+
+        analyze_btn.click(analyze_text, inputs=sentence_input, outputs=token_table)
+        save_btn.click(save_to_corpus, inputs=[sentence_input, token_table], outputs=status)
+
+    with gr.Tab("Annotation queue"):
+        batch_input = gr.Textbox(label="Sentences (one per line)", lines=8)
+        load_btn = gr.Button("Load batch")
+        queue_sentence = gr.Textbox(label="Sentence", interactive=False)
+        queue_table = gr.Dataframe(
+            headers=["Word", "Tags"],
+            row_count=(1, "dynamic"),
+            col_count=2,
+            interactive=True
+        )
+        with gr.Row():
+            save_next_btn = gr.Button("Save & Next")
+            skip_btn = gr.Button("Skip")
+        queue_status = gr.Textbox(label="Queue status", interactive=False)
+
+        queue_outputs = [queue_sentence, queue_table, queue_status]
+        load_btn.click(load_queue, inputs=batch_input, outputs=queue_outputs)
+        save_next_btn.click(save_and_next, inputs=[queue_sentence, queue_table], outputs=queue_outputs)
+        skip_btn.click(next_queued, inputs=None, outputs=queue_outputs)
 
 if __name__ == "__main__":
-    app.launch()
+    # Pick up edits to data/, dictionaries/, fst/ and models/ while the annotator runs
+    resources.start()
+    try:
+        app.launch()
+    finally:
+        close_queue()
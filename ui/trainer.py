@@ -5,6 +5,7 @@ Train UI for the morphological tagger.
 
 import gradio as gr
 from core.models import train_tag_predictor
+from core.training_scheduler import TrainingScheduler
 
 import logging
 
@@ -23,13 +24,51 @@ def train_model_interface() -> str:
         logging.error(f"Training failed: {e}")
         return f"Training failed: {e}"
 
-iface = gr.Interface(
-    fn=train_model_interface,
-    inputs=[],
-    outputs="text",
-    title="Train Morphological Tagger",
-    description="Click to train the ML tagger on the current corpus."
-)
+# Background retraining in a separate process (core/training_scheduler.py)
+scheduler = TrainingScheduler()
+
+
+def scheduler_status() -> str:
+    """
+    Report the background trainer's status without waiting for it.
+    """
+    status = scheduler.status()
+    if not status:
+        return "Scheduler has not run yet."
+    lines = [f"Running: {status['running']}, state: {status.get('state')}"]
+    if status.get("progress") is not None:
+        lines.append(f"Progress: {status['progress']:.0%}")
+    if status.get("message"):
+        lines.append(status["message"])
+    lines.append(f"Trained on {status.get('trained_entries', 0)} entries, {status.get('new_entries', 0)} new.")
+    return "\n".join(lines)
+
+
+def start_scheduler() -> str:
+    scheduler.start()
+    return scheduler_status()
+
+
+def retrain_now() -> str:
+    scheduler.start()
+    scheduler.trigger()
+    return "Retraining requested.\n" + scheduler_status()
+
+
+with gr.Blocks(title="Train Morphological Tagger") as iface:
+    gr.Markdown("## Train Morphological Tagger")
+    with gr.Row():
+        start_btn = gr.Button("Start background training")
+        retrain_btn = gr.Button("Retrain now")
+        refresh_btn = gr.Button("Refresh status")
+    status_box = gr.Textbox(label="Background training", lines=4, interactive=False)
+    full_btn = gr.Button("Train from scratch (blocking)")
+    full_status = gr.Textbox(label="Full training", interactive=False)
+
+    start_btn.click(start_scheduler, inputs=None, outputs=status_box)
+    retrain_btn.click(retrain_now, inputs=None, outputs=status_box)
+    refresh_btn.click(scheduler_status, inputs=None, outputs=status_box)
+    full_btn.click(train_model_interface, inputs=None, outputs=full_status)
 
 if __name__ == "__main__":
     iface.launch()